@@ -2,7 +2,7 @@ from django.contrib import admin
 from .models import (
     Room, Instructor, Course, Class, ClassInstructor, 
     ClassRoom, TimeSlot, Student, StudentClass, 
-    Schedule, ScheduleAssignment
+    Schedule, ScheduleAssignment, InstructorTimeSlot, GenerationJob
 )
 
 
@@ -38,6 +38,12 @@ class ClassInstructorAdmin(admin.ModelAdmin):
     search_fields = ('class_obj__xml_id', 'instructor__name')
 
 
+@admin.register(InstructorTimeSlot)
+class InstructorTimeSlotAdmin(admin.ModelAdmin):
+    list_display = ('instructor', 'time_slot', 'preference')
+    search_fields = ('instructor__name', 'instructor__xml_id')
+
+
 @admin.register(ClassRoom)
 class ClassRoomAdmin(admin.ModelAdmin):
     list_display = ('class_obj', 'room', 'preference')
@@ -73,3 +79,10 @@ class ScheduleAdmin(admin.ModelAdmin):
 class ScheduleAssignmentAdmin(admin.ModelAdmin):
     list_display = ('schedule', 'class_obj', 'room', 'time_slot')
     search_fields = ('schedule__name', 'class_obj__xml_id')
+
+
+@admin.register(GenerationJob)
+class GenerationJobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'time_budget', 'schedule', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('name',)
@@ -3,13 +3,42 @@ Sistema de análisis de carga de trabajo y recomendaciones.
 Detecta profesores sobrecargados y genera alertas.
 """
 
+import math
 from typing import Dict, List
 from collections import defaultdict
-from django.db.models import Count
+from django.db.models import Count, Q
 from .models import (
     Class, Instructor, ClassInstructor, Schedule, 
     ScheduleAssignment, Room, TimeSlot
 )
+from .solution_storage import ensure_materialized
+from .solver.intervals import overlapping_pairs, conflicting_payloads
+from .room_utilization import RoomOccupancy
+
+
+def _room_intervals(assignments):
+    # (aula, días, inicio, fin, asignación) para el barrido de intervalos.
+    # Requiere time_slot cargado (select_related)
+    for assignment in assignments:
+        ts = assignment.time_slot
+        if assignment.room_id and ts is not None:
+            yield (assignment.room_id, ts.days, ts.start_time, ts.start_time + ts.length, assignment)
+
+
+def room_conflict_pairs(assignments) -> List[tuple]:
+    """
+    Parejas de asignaciones que ocupan la misma aula al mismo tiempo
+    (al menos un día común y horarios solapados), en O(n log n).
+    """
+    return overlapping_pairs(_room_intervals(assignments))
+
+
+def room_conflict_ids(assignments) -> set:
+    """Ids de las asignaciones que tienen algún conflicto de aula"""
+    return {
+        assignment.id
+        for assignment in conflicting_payloads(_room_intervals(assignments))
+    }
 
 
 class WorkloadAnalyzer:
@@ -42,6 +71,10 @@ class WorkloadAnalyzer:
         ).annotate(
             class_count=Count('class_obj')
         ).order_by('-class_count')
+        instructor_classes = list(instructor_classes)
+        
+        # Cursos con sus conteos de secciones e instructores (una consulta)
+        courses = self._course_instructor_counts()
         
         result = {
             'optimal': [],
@@ -50,7 +83,7 @@ class WorkloadAnalyzer:
             'synthetic': [],
             'missing_instructors': [],
             'total_instructors': 0,
-            'total_classes': Class.objects.count(),
+            'total_classes': sum(course['section_count'] for course in courses),
             'avg_load': 0
         }
         
@@ -84,7 +117,7 @@ class WorkloadAnalyzer:
         result['avg_load'] = total_classes / len(instructor_classes) if instructor_classes else 0
         
         # Analizar cursos sin profesor
-        result['missing_instructors'] = self._analyze_missing_instructors()
+        result['missing_instructors'] = self._analyze_missing_instructors(courses)
         
         return result
     
@@ -102,12 +135,21 @@ class WorkloadAnalyzer:
             remaining = self.OPTIMAL_LOAD - class_count
             return f"✅ Óptimo: Puede tomar {remaining} clases más"
     
-    def _analyze_missing_instructors(self) -> List[Dict]:
+    def _course_instructor_counts(self) -> List[Dict]:
+        """
+        Secciones por curso con sus filas ClassInstructor (totales y con
+        instructor sintético) mediante agregación condicional.
+        """
+        return list(Class.objects.values('offering_id', 'offering__name', 'offering__code').annotate(
+            section_count=Count('id', distinct=True),
+            with_instructor=Count('instructors'),
+            with_synthetic=Count('instructors', filter=Q(instructors__instructor__xml_id__gte=900000))
+        ).order_by('-section_count'))
+    
+    def _analyze_missing_instructors(self, courses: List[Dict] = None) -> List[Dict]:
         """Analiza cursos que necesitan más profesores"""
-        # Obtener clases agrupadas por offering (curso)
-        courses = Class.objects.values('offering_id', 'offering__name', 'offering__code').annotate(
-            section_count=Count('id')
-        ).order_by('-section_count')
+        if courses is None:
+            courses = self._course_instructor_counts()
         
         missing = []
         
@@ -115,16 +157,8 @@ class WorkloadAnalyzer:
             if not course['offering_id']:
                 continue
             
-            # Contar clases del curso con instructor
-            classes_with_instructor = ClassInstructor.objects.filter(
-                class_obj__offering_id=course['offering_id']
-            ).count()
-            
-            # Contar clases del curso con instructor sintético
-            classes_with_synthetic = ClassInstructor.objects.filter(
-                class_obj__offering_id=course['offering_id'],
-                instructor__xml_id__gte=900000
-            ).count()
+            classes_with_instructor = course['with_instructor']
+            classes_with_synthetic = course['with_synthetic']
             
             # Contar clases del curso sin instructor
             classes_without = course['section_count'] - classes_with_instructor
@@ -165,6 +199,8 @@ class WorkloadAnalyzer:
                 return {'error': 'No hay horarios generados'}
             schedule_id = schedule.id
         
+        ensure_materialized(Schedule.objects.get(id=schedule_id))
+        
         # Obtener clases del instructor en este horario
         assignments = ScheduleAssignment.objects.filter(
             schedule_id=schedule_id,
@@ -223,6 +259,7 @@ class ConflictAnalyzer:
             Dict con conflictos detectados
         """
         schedule = Schedule.objects.get(id=schedule_id)
+        ensure_materialized(schedule)
         assignments = ScheduleAssignment.objects.filter(
             schedule=schedule
         ).select_related('class_obj', 'room', 'time_slot')
@@ -234,21 +271,17 @@ class ConflictAnalyzer:
             'total_conflicts': 0
         }
         
-        # Detectar conflictos de aula
-        room_schedule = defaultdict(list)
-        for assignment in assignments:
-            if assignment.room and assignment.time_slot:
-                key = (assignment.room.id, assignment.time_slot.id)
-                room_schedule[key].append(assignment)
-        
-        for (room_id, timeslot_id), classes in room_schedule.items():
-            if len(classes) > 1:
-                conflicts['room_conflicts'].append({
-                    'room_id': room_id,
-                    'timeslot_id': timeslot_id,
-                    'conflicting_classes': [c.class_obj.id for c in classes],
-                    'severity': 'high'
-                })
+        # Detectar conflictos de aula: parejas de clases que se solapan en la
+        # misma aula (no sólo las que comparten exactamente el mismo slot)
+        assignments = list(assignments)
+        for first, second in room_conflict_pairs(assignments):
+            conflicts['room_conflicts'].append({
+                'room_id': first.room_id,
+                'timeslot_id': first.time_slot_id,
+                'timeslot_ids': [first.time_slot_id, second.time_slot_id],
+                'conflicting_classes': [first.class_obj_id, second.class_obj_id],
+                'severity': 'high'
+            })
         
         # Detectar problemas de capacidad
         for assignment in assignments:
@@ -284,21 +317,16 @@ class RoomUtilizationAnalyzer:
             Dict con estadísticas de utilización
         """
         schedule = Schedule.objects.get(id=schedule_id)
-        assignments = ScheduleAssignment.objects.filter(
-            schedule=schedule
-        ).select_related('room', 'time_slot')
         
-        # Contar asignaciones por aula
-        room_usage = defaultdict(list)
-        for assignment in assignments:
-            if assignment.room:
-                room_usage[assignment.room.id].append(assignment)
+        # Tensor de ocupación (una consulta de asignaciones, ver room_utilization.py)
+        occupancy = RoomOccupancy.from_schedule(schedule)
+        metrics = occupancy.room_metrics()
         
         rooms_data = []
-        all_rooms = Room.objects.all()
         
-        for room in all_rooms:
-            usage_count = len(room_usage.get(room.id, []))
+        for i, room_id in enumerate(occupancy.room_ids.tolist()):
+            usage_count = int(occupancy.assignments[i])
+            capacity = int(occupancy.capacities[i])
             
             # Calcular utilización (asumiendo ~50 slots útiles por semana)
             total_available_slots = 50
@@ -312,20 +340,26 @@ class RoomUtilizationAnalyzer:
             elif utilization_percentage > 0:
                 status = 'underused'
             
+            seat_fill = metrics['seat_fill'][i]
             rooms_data.append({
-                'room_id': room.id,
-                'capacity': room.capacity,
+                'room_id': room_id,
+                'capacity': capacity,
                 'assignments': usage_count,
                 'utilization_percentage': round(utilization_percentage, 1),
+                # Métricas ponderadas por tiempo (ventana de operación)
+                'occupied_hours': round(float(metrics['occupied_hours'][i]), 2),
+                'occupied_percentage': round(float(metrics['occupied_percentage'][i]), 1),
+                'seat_fill': None if math.isnan(seat_fill) else round(float(seat_fill), 3),
+                'peak_concurrency': int(metrics['peak_concurrency'][i]),
                 'status': status,
-                'recommendation': self._get_room_recommendation(status, usage_count, room.capacity)
+                'recommendation': self._get_room_recommendation(status, usage_count, capacity)
             })
         
         rooms_data.sort(key=lambda x: x['utilization_percentage'], reverse=True)
         
         return {
             'rooms': rooms_data,
-            'total_rooms': len(all_rooms),
+            'total_rooms': len(rooms_data),
             'used_rooms': sum(1 for r in rooms_data if r['assignments'] > 0),
             'unused_rooms': sum(1 for r in rooms_data if r['assignments'] == 0),
             'avg_utilization': sum(r['utilization_percentage'] for r in rooms_data) / len(rooms_data) if rooms_data else 0
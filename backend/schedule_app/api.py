@@ -7,9 +7,16 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
 from datetime import datetime, timedelta
 from .models import Schedule, ScheduleAssignment, Instructor, Room, Class
 from .analysis import WorkloadAnalyzer, ConflictAnalyzer, RoomUtilizationAnalyzer
+from .solution_storage import ensure_materialized, assignment_count, with_assignment_count
+from .schedule_export import EXPORTERS
+from .timetable_cache import get_timetable, DAY_NAMES
+from .http_cache import cached_schedule_view
+from .room_utilization import RoomOccupancy
+from .dashboard_snapshot import get_schedule_dashboard, get_workload_report
 from collections import defaultdict
 
 
@@ -20,7 +27,7 @@ def get_schedules_list(request):
     
     GET /api/schedules/
     """
-    schedules = Schedule.objects.all().order_by('-id')
+    schedules = with_assignment_count(Schedule.objects.defer('genome')).order_by('-id')
     
     data = []
     for schedule in schedules:
@@ -31,13 +38,14 @@ def get_schedules_list(request):
             'fitness_score': schedule.fitness_score,
             'is_active': schedule.is_active,
             'created_at': schedule.created_at.isoformat() if hasattr(schedule, 'created_at') else None,
-            'total_assignments': schedule.assignments.count()
+            'total_assignments': assignment_count(schedule)
         })
     
     return Response(data)
 
 
 @api_view(['GET'])
+@cached_schedule_view
 def get_schedule_calendar(request, schedule_id):
     """
     Retorna horario en formato FullCalendar.
@@ -50,6 +58,7 @@ def get_schedule_calendar(request, schedule_id):
         - offering_id: Filtrar por curso
     """
     schedule = get_object_or_404(Schedule, id=schedule_id)
+    ensure_materialized(schedule)
     assignments = ScheduleAssignment.objects.filter(
         schedule=schedule
     ).select_related('class_obj__offering', 'room', 'time_slot')
@@ -113,8 +122,8 @@ def _convert_assignment_to_event(assignment):
     end_minute = end_minutes % 60
     
     # Obtener información del instructor
-    instructors = assignment.class_obj.instructors.all()
-    instructor_names = [inst.name for inst in instructors]
+    instructors = assignment.class_obj.instructors.all()  # ClassInstructor
+    instructor_names = [ci.instructor.name for ci in instructors]
     
     # Determinar color basado en conflictos
     background_color = '#28a745'  # Verde por defecto
@@ -170,10 +179,8 @@ def get_workload_analysis(request):
     
     GET /api/analysis/workload/
     """
-    analyzer = WorkloadAnalyzer()
-    data = analyzer.analyze_instructor_workload()
-    
-    return Response(data)
+    # Informe guardado; se recalcula sólo si cambiaron instructores o clases
+    return Response(get_workload_report())
 
 
 @api_view(['GET'])
@@ -198,6 +205,7 @@ def get_instructor_schedule(request, instructor_id):
 
 
 @api_view(['GET'])
+@cached_schedule_view
 def get_conflict_analysis(request, schedule_id):
     """
     Análisis de conflictos en un horario.
@@ -211,6 +219,7 @@ def get_conflict_analysis(request, schedule_id):
 
 
 @api_view(['GET'])
+@cached_schedule_view
 def get_room_utilization(request, schedule_id):
     """
     Análisis de utilización de aulas.
@@ -223,6 +232,18 @@ def get_room_utilization(request, schedule_id):
     return Response(data)
 
 
+@api_view(['GET'])
+@cached_schedule_view
+def get_room_heatmap(request, schedule_id):
+    """
+    Ocupación de aulas ponderada por tiempo con heatmaps.
+    
+    GET /api/schedules/<id>/rooms/heatmap/
+    """
+    schedule = get_object_or_404(Schedule, id=schedule_id)
+    return Response(RoomOccupancy.from_schedule(schedule).report())
+
+
 @api_view(['GET'])
 def get_instructors_list(request):
     """
@@ -280,46 +301,12 @@ def get_dashboard_stats(request):
     if not latest_schedule:
         return Response({'error': 'No hay horarios generados'}, status=status.HTTP_404_NOT_FOUND)
     
-    # Análisis de carga
-    workload_analyzer = WorkloadAnalyzer()
-    workload_data = workload_analyzer.analyze_instructor_workload()
-    
-    # Análisis de conflictos
-    conflict_analyzer = ConflictAnalyzer()
-    conflict_data = conflict_analyzer.analyze_schedule_conflicts(latest_schedule.id)
-    
-    # Análisis de aulas
-    room_analyzer = RoomUtilizationAnalyzer()
-    room_data = room_analyzer.analyze_room_utilization(latest_schedule.id)
-    
-    return Response({
-        'schedule': {
-            'id': latest_schedule.id,
-            'name': latest_schedule.name,
-            'fitness_score': latest_schedule.fitness_score,
-            'total_assignments': latest_schedule.assignments.count()
-        },
-        'instructors': {
-            'total': workload_data['total_instructors'],
-            'avg_load': round(workload_data['avg_load'], 1),
-            'overloaded': len(workload_data['overloaded']),
-            'synthetic': len(workload_data['synthetic'])
-        },
-        'conflicts': {
-            'total': conflict_data['total_conflicts'],
-            'room_conflicts': len(conflict_data['room_conflicts']),
-            'capacity_issues': len(conflict_data['capacity_issues'])
-        },
-        'rooms': {
-            'total': room_data['total_rooms'],
-            'used': room_data['used_rooms'],
-            'unused': room_data['unused_rooms'],
-            'avg_utilization': round(room_data['avg_utilization'], 1)
-        }
-    })
+    # Secciones precalculadas (carga, conflictos y aulas), ver dashboard_snapshot.py
+    return Response(get_schedule_dashboard(latest_schedule))
 
 
 @api_view(['GET'])
+@cached_schedule_view
 def get_schedule_timetable(request, schedule_id):
     """
     Retorna horario en formato TABLA (como horario escolar tradicional).
@@ -346,102 +333,10 @@ def get_schedule_timetable(request, schedule_id):
     }
     """
     schedule = get_object_or_404(Schedule, id=schedule_id)
-    assignments = ScheduleAssignment.objects.filter(
-        schedule=schedule
-    ).select_related(
-        'class_obj__offering',
-        'room',
-        'time_slot'
-    ).prefetch_related(
-        'class_obj__instructors'
-    )
     
-    # Nombres de días
-    day_names = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
-    
-    # Estructura: {dia: {hora: [clases]}}
-    timetable = {day: {} for day in day_names}
-    all_hours = set()
-    
-    for assignment in assignments:
-        if not assignment.time_slot:
-            continue
-            
-        ts = assignment.time_slot
-        class_obj = assignment.class_obj
-        room = assignment.room
-        
-        # Decodificar días (bit string: "0101000" = Mar/Jue)
-        days_bits = ts.days[:7] if len(ts.days) >= 7 else ts.days.ljust(7, '0')
-        
-        # Calcular hora de inicio y fin
-        start_minutes = ts.start_time * 5  # slots de 5 minutos
-        duration_minutes = ts.length * 5
-        
-        start_hour = start_minutes // 60
-        start_min = start_minutes % 60
-        start_time = f"{start_hour:02d}:{start_min:02d}"
-        
-        end_minutes = start_minutes + duration_minutes
-        end_hour = end_minutes // 60
-        end_min = end_minutes % 60
-        end_time = f"{end_hour:02d}:{end_min:02d}"
-        
-        time_label = f"{start_time}-{end_time}"
-        all_hours.add(start_time)
-        
-        # Obtener instructores (a través de ClassInstructor - relación many-to-many)
-        class_instructors = class_obj.instructors.all()  # Devuelve ClassInstructor objects
-        instructor_names = [ci.instructor.name for ci in class_instructors] if class_instructors else ["Sin instructor"]
-        
-        # Información de la clase
-        class_info = {
-            'id': class_obj.id,
-            'xml_id': class_obj.xml_id,
-            'name': class_obj.offering.name if class_obj.offering else f"Clase {class_obj.xml_id}",
-            'code': class_obj.offering.code if class_obj.offering else "N/A",
-            'instructors': instructor_names,
-            'room': room.location if room else "Sin aula",
-            'room_capacity': room.capacity if room else 0,
-            'students': class_obj.enrolled_students.count(),
-            'limit': class_obj.class_limit,
-            'time': time_label,
-            'start': start_time,
-            'end': end_time,
-            'duration_min': duration_minutes
-        }
-        
-        # Agregar a cada día activo
-        for day_idx, bit in enumerate(days_bits):
-            if bit == '1' and day_idx < 7:
-                day_name = day_names[day_idx]
-                
-                if time_label not in timetable[day_name]:
-                    timetable[day_name][time_label] = []
-                    
-                timetable[day_name][time_label].append(class_info)
-    
-    # Ordenar horas
-    sorted_hours = sorted(list(all_hours))
-    
-    # Generar rangos de hora completos
-    time_ranges = []
-    for hour_str in sorted_hours:
-        hour = int(hour_str.split(':')[0])
-        for slot in range(0, 60, 30):  # Intervalos de 30 min
-            time_ranges.append(f"{hour:02d}:{slot:02d}")
-    
-    # Estadísticas
-    total_slots = sum(len(times) for day_times in timetable.values() for times in day_times.values())
-    max_concurrent = max(
-        (len(classes) for day in timetable.values() for classes in day.values()),
-        default=0
-    )
-    
-    # Calcular clases por día para stats
-    classes_by_day = {}
-    for day in day_names:
-        classes_by_day[day] = sum(len(classes) for classes in timetable[day].values())
+    # Grilla precalculada; se reconstruye sólo si cambiaron asignaciones,
+    # instructores o matrículas (ver timetable_cache.py)
+    timetable = get_timetable(schedule)
     
     return Response({
         'schedule': {
@@ -449,16 +344,32 @@ def get_schedule_timetable(request, schedule_id):
             'name': schedule.name,
             'description': schedule.description or '',
             'fitness_score': schedule.fitness_score,
-            'total_assignments': assignments.count()
+            'total_assignments': timetable['total_assignments']
         },
-        'grid': timetable,
-        'days': day_names,
-        'time_slots': sorted_hours,
+        'grid': timetable['grid'],
+        'days': DAY_NAMES,
+        'time_slots': timetable['time_slots'],
         'classes': [],  # Lista plana si se necesita
-        'stats': {
-            'total_classes': assignments.count(),
-            'classes_by_day': classes_by_day,
-            'max_concurrent_classes': max_concurrent,
-            'needs_multiple_views': max_concurrent > 10
-        }
+        'stats': timetable['stats']
     })
+
+
+@api_view(['GET'])
+def export_schedule(request, schedule_id, file_format):
+    """
+    Exporta un horario como XML de solución o CSV, en streaming.
+    
+    GET /api/schedules/<id>/export/xml/
+    GET /api/schedules/<id>/export/csv/
+    """
+    schedule = get_object_or_404(Schedule, id=schedule_id)
+    if file_format not in EXPORTERS:
+        return Response(
+            {'error': f'Formato no soportado: {file_format} (xml o csv)'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    writer, content_type = EXPORTERS[file_format]
+    response = StreamingHttpResponse(writer(schedule), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="horario_{schedule.id}.{file_format}"'
+    return response
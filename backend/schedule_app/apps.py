@@ -1,7 +1,27 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class ScheduleAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'schedule_app'
     verbose_name = 'Sistema de Horarios'
+
+    def ready(self):
+        from .db_profile import configure_sqlite
+        connection_created.connect(configure_sqlite, dispatch_uid='schedule_app.configure_sqlite')
+
+        # Las reconstrucciones de tablas de SQLite borran los triggers de
+        # data_versions: se reinstalan al terminar cada migrate
+        from .version_triggers import ensure_triggers
+        post_migrate.connect(ensure_triggers, sender=self, dispatch_uid='schedule_app.ensure_triggers')
+
+        # El despachador de generación arranca con la primera petición del
+        # servidor web (no con los comandos de manage.py) y revisa la cola
+        # periódicamente, aunque nadie encole trabajos nuevos
+        if getattr(settings, 'GENERATION_RUN_IN_PROCESS', True):
+            from .jobs import start_dispatcher
+            request_started.connect(start_dispatcher, dispatch_uid='schedule_app.start_dispatcher')
@@ -0,0 +1,268 @@
+"""
+Estadísticas del dashboard precalculadas.
+
+El dashboard (/api/dashboard/stats/ y /api/dashboard-stats/) es la página de
+inicio y antes corría los tres analizadores completos (o ~15 conteos) en cada
+petición. Ahora las métricas se guardan en StatsSnapshot por secciones:
+
+- 'catalog':        conteos de aulas, instructores, cursos, clases, estudiantes y slots
+- 'workload':       resumen de carga de instructores (WorkloadAnalyzer)
+- 'schedule:<id>':  asignaciones, conflictos y uso de aulas del último horario
+- 'workload_report': informe completo de WorkloadAnalyzer (/api/analysis/workload/)
+
+Cada sección guarda la huella de las versiones de datos (ver data_versions.py)
+de las tablas de las que depende, leídas en UNA consulta; la sección de un
+horario incluye además la versión de sus asignaciones. Al servir
+el dashboard sólo se reconstruyen las secciones cuya huella cambió, así que
+una generación de horario no recalcula el catálogo y una importación no
+recalcula nada que no haya cambiado. Importaciones, generaciones y la
+asignación de instructores llaman a refresh_dashboard() para que la siguiente
+visita ya encuentre las secciones al día.
+
+Uso:
+    from schedule_app.dashboard_snapshot import get_catalog_stats, get_schedule_dashboard
+
+    data = get_catalog_stats()                # /api/dashboard-stats/
+    data = get_schedule_dashboard(schedule)   # /api/dashboard/stats/
+"""
+
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from django.db.models import Avg, Count, Q
+
+from .models import (
+    Room, Instructor, Course, Class, ClassInstructor, TimeSlot,
+    Student, StudentClass, Schedule, ScheduleAssignment, StatsSnapshot
+)
+from .analysis import WorkloadAnalyzer
+from .data_versions import get_versions, schedule_key, versions_fingerprint
+from .solver.intervals import count_overlaps
+from .solution_storage import ensure_materialized
+
+
+SNAPSHOT_FORMAT_VERSION = 2
+
+# Slots útiles por semana y aula (igual que RoomUtilizationAnalyzer)
+ROOM_WEEKLY_SLOTS = 50
+
+# Tablas de las que depende cada sección
+_SECTION_TABLES = {
+    'catalog': ('rooms', 'instructors', 'courses', 'classes', 'class_instructors',
+                'students', 'student_classes', 'time_slots'),
+    'workload': ('instructors', 'classes', 'class_instructors'),
+    'workload_report': ('instructors', 'courses', 'classes', 'class_instructors'),
+    'schedule': ('rooms', 'classes', 'time_slots'),
+}
+_DASHBOARD_TABLES = sorted({table for tables in _SECTION_TABLES.values() for table in tables})
+
+
+def data_versions(schedule: Optional[Schedule] = None) -> Dict[str, int]:
+    """Versión de cada tabla del dashboard (y del horario) en una sola consulta"""
+    keys = list(_DASHBOARD_TABLES)
+    if schedule is not None:
+        keys.append(schedule_key(schedule.pk))
+    return get_versions(*keys)
+
+
+def _fingerprint(section: str, versions: Dict[str, int], *keys: str) -> str:
+    """Huella de una sección: versiones de sus tablas y de las llaves adicionales"""
+    names = _SECTION_TABLES[section] + keys
+    return versions_fingerprint(
+        {name: versions[name] for name in names}, SNAPSHOT_FORMAT_VERSION, section
+    )
+
+
+def _get_section(key: str, fingerprint: str, build: Callable[[], Dict],
+                 snapshots: Dict[str, StatsSnapshot]) -> Dict:
+    """Retorna la sección guardada o la reconstruye si su huella cambió"""
+    snapshot = snapshots.get(key)
+    if snapshot is not None and snapshot.fingerprint == fingerprint:
+        return snapshot.payload
+
+    payload = build()
+    StatsSnapshot.objects.update_or_create(
+        key=key, defaults={'fingerprint': fingerprint, 'payload': payload}
+    )
+    return payload
+
+
+def build_catalog_stats() -> Dict:
+    """Conteos del catálogo con consultas agrupadas (una o dos por entidad)"""
+    rooms = Room.objects.aggregate(
+        total=Count('id'),
+        avg_capacity=Avg('capacity'),
+        with_constraints=Count('id', filter=Q(is_constraint=True))
+    )
+    instructors = Instructor.objects.aggregate(
+        total=Count('id', distinct=True),
+        with_classes=Count('id', filter=Q(classes__isnull=False), distinct=True)
+    )
+    courses = Course.objects.aggregate(
+        total=Count('id', distinct=True),
+        with_classes=Count('id', filter=Q(classes__isnull=False), distinct=True)
+    )
+    classes = Class.objects.aggregate(
+        total=Count('id'),
+        committed=Count('id', filter=Q(committed=True)),
+        avg_limit=Avg('class_limit')
+    )
+    students = Student.objects.aggregate(
+        total=Count('id', distinct=True),
+        enrolled=Count('id', filter=Q(enrolled_classes__isnull=False), distinct=True)
+    )
+
+    return {
+        'rooms': {
+            'total': rooms['total'],
+            'avg_capacity': rooms['avg_capacity'] or 0,
+            'with_constraints': rooms['with_constraints']
+        },
+        'instructors': instructors,
+        'courses': courses,
+        'classes': {
+            'total': classes['total'],
+            'committed': classes['committed'],
+            'with_instructor': ClassInstructor.objects.values('class_obj').distinct().count(),
+            'avg_limit': classes['avg_limit'] or 0
+        },
+        'students': students,
+        'timeslots': {
+            'total': TimeSlot.objects.count()
+        }
+    }
+
+
+def build_workload_stats() -> Dict:
+    """Resumen de WorkloadAnalyzer.analyze_instructor_workload en una consulta"""
+    loads = ClassInstructor.objects.values(
+        'instructor_id', 'instructor__xml_id'
+    ).annotate(class_count=Count('class_obj'))
+
+    total = overloaded = synthetic = classes = 0
+    for item in loads:
+        total += 1
+        classes += item['class_count']
+        if item['instructor__xml_id'] >= 900000:
+            synthetic += 1
+        elif item['class_count'] >= WorkloadAnalyzer.OVERLOAD:
+            overloaded += 1
+
+    return {
+        'total': total,
+        'avg_load': round(classes / total, 1) if total else 0,
+        'overloaded': overloaded,
+        'synthetic': synthetic
+    }
+
+
+def build_schedule_stats(schedule: Schedule) -> Dict:
+    """
+    Asignaciones, conflictos (ConflictAnalyzer) y uso de aulas
+    (RoomUtilizationAnalyzer) de un horario con dos consultas.
+    """
+    rows = list(ScheduleAssignment.objects.filter(schedule=schedule).values_list(
+        'room_id', 'room__capacity', 'class_obj__class_limit',
+        'time_slot__days', 'time_slot__start_time', 'time_slot__length'
+    ))
+
+    room_conflicts = count_overlaps(
+        (room_id, days, start, start + length, index)
+        for index, (room_id, _, _, days, start, length) in enumerate(rows)
+    )
+    capacity_issues = sum(1 for _, capacity, limit, _, _, _ in rows if capacity < limit)
+
+    usage = Counter(row[0] for row in rows)
+    room_ids = list(Room.objects.values_list('id', flat=True))
+    utilizations = [
+        round(usage.get(room_id, 0) / ROOM_WEEKLY_SLOTS * 100, 1)
+        for room_id in room_ids
+    ]
+    used = sum(1 for room_id in room_ids if usage.get(room_id))
+
+    return {
+        'total_assignments': len(rows),
+        'conflicts': {
+            'total': room_conflicts + capacity_issues,
+            'room_conflicts': room_conflicts,
+            'capacity_issues': capacity_issues
+        },
+        'rooms': {
+            'total': len(room_ids),
+            'used': used,
+            'unused': len(room_ids) - used,
+            'avg_utilization': round(sum(utilizations) / len(utilizations), 1) if utilizations else 0
+        }
+    }
+
+
+def get_catalog_stats(versions: Optional[Dict[str, int]] = None) -> Dict:
+    """Sección 'catalog' (reconstruida sólo si cambiaron los datos)"""
+    versions = versions or data_versions()
+    snapshots = {s.key: s for s in StatsSnapshot.objects.filter(key='catalog')}
+    return _get_section('catalog', _fingerprint('catalog', versions), build_catalog_stats, snapshots)
+
+
+def get_workload_report() -> Dict:
+    """WorkloadAnalyzer.analyze_instructor_workload guardado por versión de datos"""
+    versions = data_versions()
+    snapshots = {s.key: s for s in StatsSnapshot.objects.filter(key='workload_report')}
+    return _get_section(
+        'workload_report', _fingerprint('workload_report', versions),
+        lambda: WorkloadAnalyzer().analyze_instructor_workload(), snapshots
+    )
+
+
+def get_schedule_dashboard(schedule: Schedule, versions: Optional[Dict[str, int]] = None) -> Dict:
+    """Respuesta de /api/dashboard/stats/ para un horario"""
+    ensure_materialized(schedule)
+    section_key = schedule_key(schedule.pk)
+    if versions is None or section_key not in versions:
+        versions = data_versions(schedule)
+    snapshots = {
+        s.key: s for s in StatsSnapshot.objects.filter(key__in=['workload', section_key])
+    }
+
+    workload = _get_section(
+        'workload', _fingerprint('workload', versions), build_workload_stats, snapshots
+    )
+    schedule_stats = _get_section(
+        section_key,
+        _fingerprint('schedule', versions, section_key),
+        lambda: build_schedule_stats(schedule),
+        snapshots
+    )
+
+    return {
+        'schedule': {
+            'id': schedule.id,
+            'name': schedule.name,
+            'fitness_score': schedule.fitness_score,
+            'total_assignments': schedule_stats['total_assignments']
+        },
+        'instructors': workload,
+        'conflicts': schedule_stats['conflicts'],
+        'rooms': schedule_stats['rooms']
+    }
+
+
+def refresh_dashboard():
+    """
+    Pone al día las secciones del dashboard tras escribir datos (importación,
+    generación, asignación de instructores) y descarta las de horarios que ya
+    no son el más reciente.
+    """
+    latest = Schedule.objects.order_by('-id').first()
+    keep = ['catalog', 'workload', 'workload_report']
+
+    # Un horario compacto se materializa recién cuando alguien lo abre
+    if latest is not None and not latest.is_materialized:
+        latest = None
+
+    versions = data_versions(latest)
+    get_catalog_stats(versions)
+    if latest is not None:
+        get_schedule_dashboard(latest, versions)
+        keep.append(schedule_key(latest.pk))
+
+    StatsSnapshot.objects.exclude(key__in=keep).delete()
@@ -0,0 +1,42 @@
+"""
+Versiones de datos para invalidar cachés.
+
+Las huellas con agregados (COUNT/MAX/SUM) no cambian si dos filas
+intercambian valores, ni cuando cambia una columna que no entra en la suma.
+En su lugar cada tabla de datos tiene una fila en data_versions (DataVersion)
+que triggers de la base de datos (version_triggers.py) reemplazan por un número
+aleatorio de 64 bits en cada INSERT, UPDATE o DELETE. Así cubren también
+bulk_create, bulk_update, QuerySet.update/delete y el SQL directo de los
+importadores. Las asignaciones y la fila de cada horario además versionan
+la llave 'schedule:<id>'.
+
+Como la versión es aleatoria y no un contador, dos estados distintos no
+comparten versión aunque la base de datos se restaure desde una copia.
+
+Uso:
+    versions = get_versions('rooms', 'classes', schedule_key(schedule.pk))
+    fingerprint = versions_fingerprint(versions)
+"""
+
+import hashlib
+from typing import Dict
+
+from .models import DataVersion
+
+
+def schedule_key(schedule_id: int) -> str:
+    """Llave de la versión de las asignaciones (y la fila) de un horario"""
+    return f'schedule:{schedule_id}'
+
+
+def get_versions(*keys: str) -> Dict[str, int]:
+    """Versión de cada llave en una consulta (0 si nunca se escribió)"""
+    found = dict(DataVersion.objects.filter(key__in=keys).values_list('key', 'version'))
+    return {key: found.get(key, 0) for key in keys}
+
+
+def versions_fingerprint(versions: Dict[str, int], *extra) -> str:
+    """Huella SHA-1 de un conjunto de versiones y valores adicionales (formato, fecha, ...)"""
+    parts = [str(part) for part in extra]
+    parts.extend(f'{key}={versions[key]}' for key in sorted(versions))
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
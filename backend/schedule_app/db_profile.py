@@ -0,0 +1,60 @@
+"""
+Perfil de rendimiento de la base de datos.
+
+Con SQLite cada conexión nueva recibe (señal connection_created, conectada
+en ScheduleAppConfig.ready):
+
+- journal_mode=WAL: los lectores (dashboard, API) no esperan a una escritura
+  larga (generación, importación) y viceversa
+- synchronous=NORMAL: seguro con WAL y sin fsync en cada commit
+- mmap_size / cache_size: lecturas desde memoria (SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE)
+- busy_timeout: espera al bloqueo de escritura en vez de fallar (SQLITE_BUSY_TIMEOUT)
+
+PostgreSQL no necesita ajustes por conexión: la persistencia y el pool se
+configuran en settings (DATABASE_ENGINE=postgresql).
+"""
+
+from typing import Dict
+
+from django.conf import settings
+
+
+SQLITE_PRAGMAS = ('journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'busy_timeout')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Aplica los PRAGMA del perfil al abrir una conexión SQLite"""
+    if connection.vendor != 'sqlite':
+        return
+
+    busy_timeout_ms = int(getattr(settings, 'SQLITE_BUSY_TIMEOUT', 20) * 1000)
+    mmap_size = int(getattr(settings, 'SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    cache_size = int(getattr(settings, 'SQLITE_CACHE_SIZE', -64000))
+
+    with connection.cursor() as cursor:
+        # WAL queda guardado en el archivo; en bases en memoria no aplica
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f'PRAGMA mmap_size={mmap_size}')
+        cursor.execute(f'PRAGMA cache_size={cache_size}')
+        cursor.execute(f'PRAGMA busy_timeout={busy_timeout_ms}')
+
+
+def describe(connection) -> Dict:
+    """Motor y parámetros efectivos de una conexión (para diagnóstico)"""
+    info = {
+        'vendor': connection.vendor,
+        'name': str(connection.settings_dict['NAME']),
+        'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+    }
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for pragma in SQLITE_PRAGMAS:
+                cursor.execute(f'PRAGMA {pragma}')
+                info[pragma] = cursor.fetchone()[0]
+            info['transaction_mode'] = connection.settings_dict['OPTIONS'].get('transaction_mode', 'DEFERRED')
+        elif connection.vendor == 'postgresql':
+            cursor.execute('SHOW server_version')
+            info['server_version'] = cursor.fetchone()[0]
+            info['pool'] = bool(connection.settings_dict['OPTIONS'].get('pool'))
+    return info
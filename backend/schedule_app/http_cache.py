@@ -0,0 +1,108 @@
+"""
+Caché HTTP para las vistas de solo lectura de un horario.
+
+Cada respuesta se guarda en la caché 'schedules' (locmem o archivos, ver
+settings.CACHES) con una llave formada por la vista, el id del horario, la
+versión de su contenido y los parámetros de la petición. La versión también
+se envía como ETag, de modo que los clientes que repiten la consulta reciben
+304 sin que se recalcule nada.
+
+La versión combina (ver data_versions.py):
+- la versión del horario y sus asignaciones ('schedule:<id>')
+- las versiones de todas las tablas que las vistas serializan (aulas,
+  cursos, clases, slots, instructores, matrículas, restricciones)
+- la fecha actual (el calendario ubica los eventos en la semana en curso)
+
+Una re-importación o edición cambia la versión, así que las entradas viejas
+de la caché dejan de usarse (expiran con el TIMEOUT del alias).
+Last-Modified (Schedule.updated_at) es informativo: no cambia cuando cambian
+los datos del catálogo, por eso las peticiones condicionales se validan sólo
+con el ETag.
+
+Uso:
+    @api_view(['GET'])
+    @cached_schedule_view
+    def get_room_utilization(request, schedule_id):
+        ...
+"""
+
+import hashlib
+from functools import wraps
+
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Schedule
+from .data_versions import get_versions, schedule_key, versions_fingerprint
+
+
+CACHE_ALIAS = 'schedules'
+
+# Tablas cuyas columnas pueden aparecer en las vistas de un horario
+VIEW_TABLES = (
+    'rooms', 'courses', 'classes', 'time_slots', 'instructors',
+    'class_instructors', 'class_rooms', 'students', 'student_classes',
+    'group_constraints', 'group_constraint_classes',
+)
+
+
+def schedule_version(schedule: Schedule) -> str:
+    """Versión del contenido que muestran las vistas de un horario"""
+    versions = get_versions(schedule_key(schedule.pk), *VIEW_TABLES)
+    return versions_fingerprint(versions, schedule.pk, timezone.localdate().isoformat())
+
+
+def _set_validators(response, etag: str, last_modified: int):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # El cliente puede guardar la respuesta pero debe revalidarla siempre
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def cached_schedule_view(view):
+    """
+    Decorador para vistas (schedule_id) -> Response. Va debajo de @api_view.
+    Responde 404 si el horario no existe; las respuestas con error no se guardan.
+    """
+    @wraps(view)
+    def wrapper(request, schedule_id, *args, **kwargs):
+        schedule = Schedule.objects.filter(id=schedule_id).first()
+        if schedule is None:
+            return Response({'error': f'Horario {schedule_id} no existe'}, status=status.HTTP_404_NOT_FOUND)
+
+        version = schedule_version(schedule)
+        etag = f'"{version}"'
+        last_modified = int(schedule.updated_at.timestamp())
+
+        # Petición condicional: 304 si el cliente ya tiene esta versión
+        # (sólo por ETag, ver docstring del módulo)
+        not_modified = get_conditional_response(request._request, etag=etag)
+        if not_modified is not None:
+            return _set_validators(not_modified, etag, last_modified)
+
+        cache = caches[CACHE_ALIAS]
+        params = request._request.META.get('QUERY_STRING', '')
+        key = 'schedule-view:{}:{}:{}:{}'.format(
+            view.__name__, schedule_id, version,
+            hashlib.sha1(params.encode('utf-8')).hexdigest()
+        )
+
+        data = cache.get(key)
+        if data is None:
+            response = view(request, schedule_id, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            cache.set(key, response.data)
+            response['X-Cache'] = 'MISS'
+        else:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+
+        return _set_validators(response, etag, last_modified)
+
+    return wrapper
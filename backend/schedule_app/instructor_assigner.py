@@ -10,8 +10,14 @@ Este módulo se encarga de:
 3. Permitir clases sin instructor si no hay disponibilidad
 """
 
+import time
 from typing import Dict, List, Tuple, Set
 from collections import defaultdict
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from .solver.intervals import BusyIntervalIndex
+from .dashboard_snapshot import refresh_dashboard
 from .models import (
     Schedule, ScheduleAssignment, Instructor, ClassInstructor,
     TimeSlot, InstructorTimeSlot
@@ -23,107 +29,159 @@ class InstructorAssigner:
     Asigna instructores a clases que ya tienen aula y horario definidos.
     """
     
-    def __init__(self, schedule: Schedule):
+    # Pesos del costo de asignación
+    LOAD_PENALTY = 0.5          # Costo por cada clase que el instructor ya tiene
+    UNASSIGNED_COST = 1e6       # Costo de dejar una clase sin instructor
+    INFEASIBLE_COST = 1e9       # Instructor no calificado para la clase
+    
+    DEFAULT_BATCH_SIZE = 500    # Filas por INSERT al guardar ClassInstructor
+    
+    def __init__(self, schedule: Schedule, batch_size: int = DEFAULT_BATCH_SIZE):
         """
         Inicializa el asignador para un horario específico.
         
         Args:
             schedule: Horario con asignaciones de clase-aula-tiempo ya definidas
+            batch_size: Filas por lote en el bulk_create de ClassInstructor
         """
         self.schedule = schedule
+        self.batch_size = batch_size
         self.assignments = list(
             ScheduleAssignment.objects.filter(schedule=schedule)
             .select_related('class_obj', 'room', 'time_slot')
         )
         
         # Estructuras de datos para optimización
-        self.instructor_availability = {}  # {instructor_id: {(day, start, end): bool}}
+        self.instructor_busy = BusyIntervalIndex()  # {instructor_id: {día: intervalos}}
         self.instructor_preferences = {}   # {instructor_id: {timeslot_id: preference}}
         self.class_instructors_assigned = {}  # {class_id: instructor_id}
+        self.instructor_load = defaultdict(int)  # {instructor_id: clases asignadas}
         
         print(f"[INFO] InstructorAssigner inicializado para horario '{schedule.name}'")
         print(f"[INFO] Total de asignaciones a procesar: {len(self.assignments)}")
     
     def load_instructor_data(self):
         """
-        Carga datos de instructores: disponibilidad y preferencias.
+        Carga las preferencias de horario de todos los instructores
+        en una sola consulta.
         """
-        all_instructors = Instructor.objects.all()
-        
-        print(f"[INFO] Cargando datos de {all_instructors.count()} instructores...")
+        preferences = defaultdict(dict)
+        time_prefs = InstructorTimeSlot.objects.values_list(
+            'instructor_id', 'time_slot_id', 'preference'
+        )
+        for instructor_id, time_slot_id, preference in time_prefs:
+            preferences[instructor_id][time_slot_id] = preference
         
-        for instructor in all_instructors:
-            # Inicializar disponibilidad (por defecto: disponible en todos los horarios)
-            self.instructor_availability[instructor.id] = {}
-            
-            # Cargar preferencias de horario
-            time_prefs = InstructorTimeSlot.objects.filter(
-                instructor=instructor
-            ).values_list('time_slot_id', 'preference')
-            
-            self.instructor_preferences[instructor.id] = dict(time_prefs)
+        self.instructor_preferences = dict(preferences)
         
-        print(f"[OK] Datos de instructores cargados")
+        print(f"[OK] Preferencias cargadas para {len(self.instructor_preferences)} instructores")
     
     def assign_instructors(self) -> Dict:
         """
         Asigna instructores a todas las clases del horario.
         
+        El problema se modela como una secuencia de emparejamientos bipartitos
+        de costo mínimo: las clases se agrupan por franja horaria idéntica
+        (todas las clases de un grupo se solapan entre sí, así que un instructor
+        puede recibir como máximo una) y cada grupo se resuelve con el algoritmo
+        húngaro sobre los instructores calificados y libres en esa franja.
+        
+        Costo de asignar un instructor a una clase:
+            -preferencia(instructor, timeslot) + LOAD_PENALTY * carga_actual
+        
         Returns:
             Dict con estadísticas de asignación:
             - assigned: número de clases con instructor asignado
             - unassigned: número de clases sin instructor
-            - conflicts_avoided: número de conflictos evitados
+            - preassigned: clases que ya tenían instructor (XML)
+            - conflicts_avoided: candidatos descartados por estar ocupados
         """
         self.load_instructor_data()
         
-        assigned_count = 0
-        unassigned_count = 0
-        conflicts_avoided = 0
-        
-        # Obtener todos los instructores disponibles
-        all_instructors = list(Instructor.objects.all())
+        all_ids = list(Instructor.objects.values_list('id', flat=True))
+        qualified_by_offering, preassigned = self._load_qualifications()
         
         print(f"\n[INFO] Iniciando asignación de instructores...")
-        print(f"[INFO] Instructores disponibles: {len(all_instructors)}")
+        print(f"[INFO] Instructores disponibles: {len(all_ids)}")
         
-        # Ordenar asignaciones por preferencia (clases con menos opciones primero)
-        # Esto asegura mejor distribución
-        sorted_assignments = sorted(
-            self.assignments,
-            key=lambda a: self._count_available_instructors(a, all_instructors)
-        )
+        # Carga mantenida incrementalmente (en vez de recalcularla por candidato)
+        self.instructor_load = defaultdict(int)
         
-        for assignment in sorted_assignments:
-            # Intentar asignar instructor a esta clase
-            instructor = self._find_best_instructor(
-                assignment,
-                all_instructors
-            )
+        # Las clases con instructor del XML se respetan: ocupan al instructor
+        # y cuentan para su carga
+        pending = []
+        busy_batch = []
+        for assignment in self.assignments:
+            instructor_ids = preassigned.get(assignment.class_obj_id)
+            if instructor_ids:
+                ts = assignment.time_slot
+                for instructor_id in instructor_ids:
+                    busy_batch.append((
+                        instructor_id, ts.days, ts.start_time,
+                        ts.start_time + ts.length, assignment.class_obj_id
+                    ))
+                    self.instructor_load[instructor_id] += 1
+                self.class_instructors_assigned[assignment.class_obj_id] = instructor_ids[0]
+            else:
+                pending.append(assignment)
+        self.instructor_busy.add_many(busy_batch)
+        
+        preassigned_count = len(self.assignments) - len(pending)
+        if preassigned_count:
+            print(f"[INFO] {preassigned_count} clases ya tienen instructor (se respetan)")
+        
+        # Agrupar por franja horaria idéntica y resolver primero los grupos
+        # con menos holgura (candidatos - clases)
+        groups = self._build_time_groups(pending)
+        
+        def slack(group):
+            candidates = set()
+            for assignment in group:
+                candidates.update(self._eligible_instructors(assignment, qualified_by_offering, all_ids))
+            return len(candidates) - len(group)
+        
+        ordered_groups = sorted(groups, key=lambda g: (slack(g), -len(g)))
+        
+        assigned_count = 0
+        unassigned_count = 0
+        conflicts_avoided = 0
+        
+        for group in ordered_groups:
+            decisions, avoided = self._assign_group(group, qualified_by_offering, all_ids)
+            conflicts_avoided += avoided
             
-            if instructor:
-                # Crear relación ClassInstructor
-                ClassInstructor.objects.get_or_create(
-                    class_obj=assignment.class_obj,
-                    instructor=instructor
-                )
+            for assignment, instructor_id in decisions:
+                if instructor_id is None:
+                    unassigned_count += 1
+                    print(f"[WARNING] Clase {assignment.class_obj.xml_id} quedó sin instructor")
+                    continue
                 
-                # Marcar horario como ocupado
-                self._mark_instructor_busy(
-                    instructor.id,
-                    assignment.time_slot
-                )
+                # Marcar horario como ocupado y actualizar carga
+                self._mark_instructor_busy(instructor_id, assignment.time_slot, assignment.class_obj_id)
+                self.instructor_load[instructor_id] += 1
                 
                 assigned_count += 1
-                self.class_instructors_assigned[assignment.class_obj.id] = instructor.id
-            else:
-                unassigned_count += 1
-                print(f"[WARNING] Clase {assignment.class_obj.xml_id} quedó sin instructor")
+                self.class_instructors_assigned[assignment.class_obj_id] = instructor_id
+        
+        # Persistir todas las decisiones de una vez
+        new_pairs = [
+            (class_id, instructor_id)
+            for class_id, instructor_id in self.class_instructors_assigned.items()
+            if class_id not in preassigned
+        ]
+        rows_written, write_time = self.save_assignments(new_pairs)
+        
+        loads = [load for load in self.instructor_load.values() if load > 0]
         
         stats = {
-            'assigned': assigned_count,
+            'assigned': assigned_count + preassigned_count,
             'unassigned': unassigned_count,
+            'preassigned': preassigned_count,
             'conflicts_avoided': conflicts_avoided,
+            'max_load': max(loads, default=0),
+            'load_std': float(np.std(loads)) if loads else 0.0,
+            'rows_written': rows_written,
+            'write_time': write_time,
             'total': len(self.assignments)
         }
         
@@ -131,77 +189,159 @@ class InstructorAssigner:
         
         return stats
     
-    def _count_available_instructors(
-        self,
-        assignment: ScheduleAssignment,
-        instructors: List[Instructor]
-    ) -> int:
-        """
-        Cuenta cuántos instructores están disponibles para una asignación.
-        Usado para priorizar clases con pocas opciones.
-        """
-        count = 0
-        for instructor in instructors:
-            if self._is_instructor_available(instructor.id, assignment.time_slot):
-                count += 1
-        return count
-    
-    def _find_best_instructor(
-        self,
-        assignment: ScheduleAssignment,
-        instructors: List[Instructor]
-    ) -> Instructor:
+    def save_assignments(self, pairs: List[Tuple[int, int]]) -> Tuple[int, float]:
         """
-        Encuentra el mejor instructor para una asignación específica.
-        
-        Criterios (en orden de prioridad):
-        1. Disponible en ese horario (sin conflictos)
-        2. Tiene preferencia positiva por ese horario
-        3. Tiene menor carga de clases asignadas
+        Guarda las relaciones ClassInstructor en una transacción con
+        bulk_create por lotes. Las filas ya existentes se ignoran.
         
         Args:
-            assignment: Asignación de clase-aula-tiempo
-            instructors: Lista de instructores disponibles
+            pairs: Lista de (class_id, instructor_id)
         
         Returns:
-            Instructor seleccionado, o None si no hay disponibles
+            (filas escritas, segundos empleados)
         """
-        time_slot = assignment.time_slot
-        candidates = []
+        start = time.perf_counter()
         
-        for instructor in instructors:
-            # CRITERIO 1: Disponibilidad (sin conflictos)
-            if not self._is_instructor_available(instructor.id, time_slot):
-                continue
-            
-            # CRITERIO 2: Preferencia de horario
-            preference = self.instructor_preferences.get(instructor.id, {}).get(
-                time_slot.id,
-                0.0  # Neutral si no hay preferencia definida
+        objects = [
+            ClassInstructor(
+                class_obj_id=class_id,
+                instructor_id=instructor_id,
+                source=ClassInstructor.SOURCE_ASSIGNED
             )
-            
-            # CRITERIO 3: Carga actual (cuántas clases ya tiene asignadas)
-            current_load = sum(
-                1 for cid, iid in self.class_instructors_assigned.items()
-                if iid == instructor.id
+            for class_id, instructor_id in pairs
+        ]
+        
+        with transaction.atomic():
+            before = ClassInstructor.objects.count()
+            ClassInstructor.objects.bulk_create(
+                objects,
+                batch_size=self.batch_size,
+                ignore_conflicts=True
             )
-            
-            # Calcular score combinado
-            # Mayor preferencia = mejor
-            # Menor carga = mejor (para distribuir equitativamente)
-            score = preference - (current_load * 0.5)
-            
-            candidates.append((instructor, score, preference, current_load))
+            rows_written = ClassInstructor.objects.count() - before
+            if rows_written:
+                # Last-Modified de las vistas del horario (http_cache.py)
+                Schedule.objects.filter(pk=self.schedule.pk).update(updated_at=timezone.now())
+                # Carga de instructores del dashboard (dashboard_snapshot.py)
+                refresh_dashboard()
         
-        if not candidates:
-            return None
+        elapsed = time.perf_counter() - start
+        print(f"[OK] {rows_written} asignaciones de instructor guardadas en {elapsed*1000:.1f} ms")
         
-        # Ordenar por score (mayor es mejor)
-        candidates.sort(key=lambda x: x[1], reverse=True)
+        return rows_written, elapsed
+    
+    def _load_qualifications(self) -> Tuple[Dict[int, Set[int]], Dict[int, List[int]]]:
+        """
+        Carga las calificaciones a partir de ClassInstructor en una sola consulta.
+        
+        Returns:
+            (qualified_by_offering, preassigned):
+            - qualified_by_offering: {offering_id: {instructor_id}} instructores
+              que ya dictan alguna clase del curso
+            - preassigned: {class_id: [instructor_id]} clases del horario que ya
+              tienen instructor
+        """
+        class_ids = {a.class_obj_id for a in self.assignments}
+        qualified_by_offering = defaultdict(set)
+        preassigned = defaultdict(list)
+        
+        rows = ClassInstructor.objects.values_list(
+            'class_obj_id', 'class_obj__offering_id', 'instructor_id'
+        )
+        for class_id, offering_id, instructor_id in rows:
+            if offering_id:
+                qualified_by_offering[offering_id].add(instructor_id)
+            if class_id in class_ids:
+                preassigned[class_id].append(instructor_id)
+        
+        return qualified_by_offering, preassigned
+    
+    def _eligible_instructors(
+        self,
+        assignment: ScheduleAssignment,
+        qualified_by_offering: Dict[int, Set[int]],
+        all_ids: List[int]
+    ):
+        """
+        Instructores calificados para una clase: los que dictan su curso, o
+        todos si el curso aún no tiene ningún instructor.
+        """
+        qualified = qualified_by_offering.get(assignment.class_obj.offering_id)
+        return qualified if qualified else all_ids
+    
+    def _build_time_groups(
+        self,
+        assignments: List[ScheduleAssignment]
+    ) -> List[List[ScheduleAssignment]]:
+        """
+        Agrupa asignaciones con la misma franja (días, inicio, fin).
+        Todas las clases de un grupo se solapan entre sí.
+        """
+        groups = defaultdict(list)
+        for assignment in assignments:
+            ts = assignment.time_slot
+            groups[(ts.days, ts.start_time, ts.start_time + ts.length)].append(assignment)
+        return list(groups.values())
+    
+    def _assign_group(
+        self,
+        group: List[ScheduleAssignment],
+        qualified_by_offering: Dict[int, Set[int]],
+        all_ids: List[int]
+    ) -> Tuple[List[Tuple[ScheduleAssignment, int]], int]:
+        """
+        Resuelve el emparejamiento de costo mínimo de un grupo de clases
+        simultáneas contra los instructores libres en esa franja.
         
-        best_instructor, score, pref, load = candidates[0]
+        Returns:
+            ([(assignment, instructor_id | None)], candidatos descartados por conflicto)
+        """
+        time_slot = group[0].time_slot
+        
+        candidate_ids = set()
+        eligible_by_row = []
+        for assignment in group:
+            eligible = self._eligible_instructors(assignment, qualified_by_offering, all_ids)
+            eligible_by_row.append(eligible)
+            candidate_ids.update(eligible)
+        
+        # CRITERIO 1: Disponibilidad (sin conflictos) - se evalúa una vez por grupo
+        available = [iid for iid in candidate_ids if self._is_instructor_available(iid, time_slot)]
+        avoided = len(candidate_ids) - len(available)
+        
+        if not available:
+            return [(assignment, None) for assignment in group], avoided
+        
+        col_index = {iid: j for j, iid in enumerate(available)}
+        n, m = len(group), len(available)
+        
+        # Columnas extra "sin instructor" para que el problema siempre sea factible
+        cost = np.full((n, m + n), self.INFEASIBLE_COST)
+        cost[:, m:] = self.UNASSIGNED_COST
+        
+        # CRITERIO 3: Carga actual (contador mantenido)
+        load_cost = np.array([self.instructor_load[iid] * self.LOAD_PENALTY for iid in available])
+        
+        for row, assignment in enumerate(group):
+            slot_id = assignment.time_slot_id
+            for iid in eligible_by_row[row]:
+                j = col_index.get(iid)
+                if j is None:
+                    continue
+                # CRITERIO 2: Preferencia de horario (mayor es mejor)
+                preference = self.instructor_preferences.get(iid, {}).get(slot_id, 0.0)
+                cost[row, j] = load_cost[j] - preference
+        
+        columns = _min_cost_assignment(cost)
+        
+        decisions = []
+        for row, j in enumerate(columns):
+            if j < m and cost[row, j] < self.INFEASIBLE_COST:
+                decisions.append((group[row], available[j]))
+            else:
+                decisions.append((group[row], None))
         
-        return best_instructor
+        return decisions, avoided
     
     def _is_instructor_available(
         self,
@@ -211,46 +351,32 @@ class InstructorAssigner:
         """
         Verifica si un instructor está disponible en un horario específico.
         
-        Un instructor está disponible si:
-        - No tiene otra clase al mismo tiempo (mismo día + horario solapado)
+        Un instructor está disponible si no tiene otra clase que se solape,
+        aunque sea parcialmente, en alguno de los días del slot.
         """
-        busy_schedule = self.instructor_availability.get(instructor_id, {})
-        
-        # Parsear días y tiempo del slot
-        days = time_slot.days
-        start = time_slot.start_time
-        end = start + time_slot.length
-        
-        # Verificar cada día de la semana
-        for day_idx, day_active in enumerate(days):
-            if day_active == '1':
-                # Verificar si hay conflicto en ese día
-                key = (day_idx, start, end)
-                if key in busy_schedule and busy_schedule[key]:
-                    return False  # Ocupado en ese horario
-        
-        return True  # Disponible
+        return self.instructor_busy.is_free(
+            instructor_id,
+            time_slot.days,
+            time_slot.start_time,
+            time_slot.start_time + time_slot.length
+        )
     
     def _mark_instructor_busy(
         self,
         instructor_id: int,
-        time_slot: TimeSlot
+        time_slot: TimeSlot,
+        class_id: int = None
     ):
         """
         Marca un instructor como ocupado en un horario específico.
         """
-        days = time_slot.days
-        start = time_slot.start_time
-        end = start + time_slot.length
-        
-        if instructor_id not in self.instructor_availability:
-            self.instructor_availability[instructor_id] = {}
-        
-        # Marcar cada día como ocupado
-        for day_idx, day_active in enumerate(days):
-            if day_active == '1':
-                key = (day_idx, start, end)
-                self.instructor_availability[instructor_id][key] = True
+        self.instructor_busy.add(
+            instructor_id,
+            time_slot.days,
+            time_slot.start_time,
+            time_slot.start_time + time_slot.length,
+            class_id
+        )
     
     def _print_report(self, stats: Dict):
         """
@@ -259,10 +385,14 @@ class InstructorAssigner:
         print(f"\n========================================")
         print(f" REPORTE DE ASIGNACION DE INSTRUCTORES")
         print(f"========================================")
+        total = stats['total'] or 1
         print(f"Total de clases: {stats['total']}")
-        print(f"  • Asignadas: {stats['assigned']} ({stats['assigned']/stats['total']*100:.1f}%)")
-        print(f"  • Sin instructor: {stats['unassigned']} ({stats['unassigned']/stats['total']*100:.1f}%)")
+        print(f"  • Asignadas: {stats['assigned']} ({stats['assigned']/total*100:.1f}%)")
+        print(f"  • Ya asignadas (XML): {stats['preassigned']}")
+        print(f"  • Sin instructor: {stats['unassigned']} ({stats['unassigned']/total*100:.1f}%)")
         print(f"Conflictos evitados: {stats['conflicts_avoided']}")
+        print(f"Carga máxima: {stats['max_load']} | Desviación de carga: {stats['load_std']:.2f}")
+        print(f"Filas escritas: {stats['rows_written']} en {stats['write_time']*1000:.1f} ms")
         print(f"========================================\n")
     
     def get_unassigned_classes(self) -> List[Dict]:
@@ -290,7 +420,10 @@ class InstructorAssigner:
         return unassigned
 
 
-def assign_instructors_to_schedule(schedule: Schedule) -> Dict:
+def assign_instructors_to_schedule(
+    schedule: Schedule,
+    batch_size: int = InstructorAssigner.DEFAULT_BATCH_SIZE
+) -> Dict:
     """
     Función helper para asignar instructores a un horario ya generado.
     
@@ -304,11 +437,70 @@ def assign_instructors_to_schedule(schedule: Schedule) -> Dict:
     
     Args:
         schedule: Horario con asignaciones de clase-aula-tiempo ya definidas
+        batch_size: Filas por lote al guardar las asignaciones
     
     Returns:
         Diccionario con estadísticas de asignación
     """
-    assigner = InstructorAssigner(schedule)
+    assigner = InstructorAssigner(schedule, batch_size=batch_size)
     stats = assigner.assign_instructors()
     
     return stats
+
+
+def _min_cost_assignment(cost: np.ndarray) -> List[int]:
+    """
+    Resuelve el problema de asignación rectangular (filas <= columnas) con el
+    algoritmo húngaro con potenciales, O(n² · m). El barrido interno sobre
+    columnas está vectorizado con NumPy.
+    
+    Args:
+        cost: Matriz n x m de costos (finitos)
+    
+    Returns:
+        Lista con la columna asignada a cada fila
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)   # p[j] = fila (1-based) asignada a la columna j
+    way = np.zeros(m + 1, dtype=np.int64)
+    
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            improve = free & (reduced < minv[1:])
+            minv[1:][improve] = reduced[improve]
+            way[1:][improve] = j0
+            
+            masked = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(masked)) + 1
+            delta = masked[j1 - 1]
+            
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            
+            j0 = j1
+            if p[j0] == 0:
+                break
+        
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    
+    result = [0] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            result[p[j] - 1] = j - 1
+    return result
@@ -0,0 +1,19 @@
+"""
+Punto de entrada de los procesos hijos que ejecutan un GenerationJob.
+
+Los procesos se crean con el método 'spawn' (igual en Linux y Windows), así
+que este módulo no importa modelos al cargarse: primero configura Django y
+después delega en jobs.run_job.
+"""
+
+import os
+
+
+def main(job_id: int):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'timetable_system.settings')
+
+    import django
+    django.setup()
+
+    from .jobs import run_job
+    run_job(job_id)
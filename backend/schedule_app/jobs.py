@@ -0,0 +1,398 @@
+"""
+Generación de horarios en segundo plano.
+
+La cola es la propia tabla GenerationJob: las peticiones sólo crean el trabajo
+(submit_job) y un despachador (JobDispatcher) lo ejecuta en un proceso hijo,
+sin broker externo. El despachador corre como hilo dentro del servidor web
+(GENERATION_RUN_IN_PROCESS=True, por defecto) o aparte con
+`python manage.py run_generation_worker`.
+
+Límites (settings):
+- GENERATION_MAX_WORKERS: procesos de generación simultáneos (en total,
+  contando los trabajos 'running' de todos los despachadores)
+- GENERATION_MAX_PENDING: trabajos en cola + en ejecución aceptados
+- GENERATION_DEFAULT_TIME_BUDGET / GENERATION_MAX_TIME_BUDGET: segundos por trabajo
+
+Al agotarse el presupuesto la evolución se detiene y se guarda el mejor
+horario encontrado; si el proceso sigue vivo GENERATION_KILL_GRACE segundos
+después (por ejemplo, en la asignación de instructores) se termina y el
+trabajo queda como 'timeout'. La cancelación funciona igual; un trabajo
+cancelado no guarda horario ni asigna instructores.
+
+El despachador revisa la cola cada POLL_INTERVAL segundos: en el servidor
+web arranca con la primera petición (ver apps.py), no con el primer
+trabajo, y al terminar un proceso toma el siguiente trabajo en cola. Los
+trabajos que quedaron 'running' sin proceso (por ejemplo, tras reiniciar el
+servidor) se marcan como fallidos al arrancar y periódicamente (ver
+JobDispatcher.recover_orphans).
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import GenerationJob, Schedule
+
+
+MAX_WORKERS = getattr(settings, 'GENERATION_MAX_WORKERS', 2)
+MAX_PENDING = getattr(settings, 'GENERATION_MAX_PENDING', 10)
+DEFAULT_TIME_BUDGET = getattr(settings, 'GENERATION_DEFAULT_TIME_BUDGET', 600)
+MAX_TIME_BUDGET = getattr(settings, 'GENERATION_MAX_TIME_BUDGET', 3600)
+KILL_GRACE = getattr(settings, 'GENERATION_KILL_GRACE', 60)
+
+POLL_INTERVAL = 1.0  # Segundos entre revisiones del despachador
+CANCEL_CHECK_INTERVAL = 2.0  # Segundos entre consultas de cancelación en el hijo
+PROGRESS_SAVE_INTERVAL = 1.0  # Segundos mínimos entre escrituras de progreso
+RECOVER_INTERVAL = 60.0  # Segundos entre búsquedas de trabajos huérfanos
+
+
+class JobQueueFull(Exception):
+    """Hay demasiados trabajos pendientes para aceptar uno nuevo"""
+
+
+def parse_generation_params(data) -> Dict:
+    """
+    Valida los parámetros de generación de una petición.
+
+    Raises:
+        ValueError: si algún parámetro es inválido
+    """
+    params = {
+        'name': data.get('name', 'Horario Generado'),
+        'description': data.get('description', ''),
+        'population_size': int(data.get('population_size', 100)),
+        'generations': int(data.get('generations', 200)),
+        'mutation_rate': float(data.get('mutation_rate', 0.1)),
+        'crossover_rate': float(data.get('crossover_rate', 0.8)),
+        'elitism_size': int(data.get('elitism_size', 5)),
+        'tournament_size': int(data.get('tournament_size', 5)),
+        'compact': str(data.get('compact', 'false')).lower() in ('1', 'true'),
+        'warm_start_id': int(data['warm_start_id']) if data.get('warm_start_id') else None,
+    }
+
+    if not (0 <= params['mutation_rate'] <= 1):
+        raise ValueError('mutation_rate debe estar entre 0 y 1')
+    if not (0 <= params['crossover_rate'] <= 1):
+        raise ValueError('crossover_rate debe estar entre 0 y 1')
+
+    return params
+
+
+def submit_job(params: Dict, time_budget: Optional[int] = None) -> GenerationJob:
+    """
+    Encola un trabajo de generación.
+
+    Raises:
+        JobQueueFull: si ya hay GENERATION_MAX_PENDING trabajos activos
+    """
+    time_budget = min(int(time_budget or DEFAULT_TIME_BUDGET), MAX_TIME_BUDGET)
+    if time_budget <= 0:
+        raise ValueError('time_budget debe ser mayor que 0')
+
+    with transaction.atomic():
+        pending = GenerationJob.objects.filter(status__in=GenerationJob.ACTIVE_STATUSES).count()
+        if pending >= MAX_PENDING:
+            raise JobQueueFull(f'Hay {pending} trabajos pendientes (máximo {MAX_PENDING})')
+        job = GenerationJob.objects.create(
+            name=params['name'],
+            params=params,
+            time_budget=time_budget
+        )
+
+    if getattr(settings, 'GENERATION_RUN_IN_PROCESS', True):
+        get_dispatcher().wake()
+    return job
+
+
+def cancel_job(job: GenerationJob) -> GenerationJob:
+    """
+    Cancela un trabajo: los que están en cola se cancelan de inmediato y los
+    que están en ejecución se marcan para que el proceso se detenga.
+    """
+    cancelled = GenerationJob.objects.filter(pk=job.pk, status=GenerationJob.STATUS_QUEUED).update(
+        status=GenerationJob.STATUS_CANCELLED, cancel_requested=True, finished_at=timezone.now()
+    )
+    if not cancelled:
+        GenerationJob.objects.filter(pk=job.pk, status=GenerationJob.STATUS_RUNNING).update(
+            cancel_requested=True
+        )
+    job.refresh_from_db()
+    return job
+
+
+def _finish(job_id: int, status: str, **fields):
+    """Cierra un trabajo en ejecución (no pisa un estado final ya escrito)"""
+    return GenerationJob.objects.filter(pk=job_id, status=GenerationJob.STATUS_RUNNING).update(
+        status=status, finished_at=timezone.now(), **fields
+    )
+
+
+def _process_exists(pid: int) -> bool:
+    """Si existe un proceso con ese pid en este equipo (sólo POSIX; en Windows siempre True)"""
+    if os.name != 'posix':
+        return True  # os.kill(pid, 0) terminaría el proceso en Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def start_dispatcher(**kwargs):
+    """Receptor de request_started: arranca el despachador del servidor web"""
+    get_dispatcher().start()
+
+
+def run_job(job_id: int):
+    """Ejecuta un trabajo (dentro del proceso hijo)"""
+    from .schedule_generator import GenerationCancelled, ScheduleGenerator
+
+    job = GenerationJob.objects.get(pk=job_id)
+    params = job.params
+    deadline = time.monotonic() + job.time_budget
+    state = {'reason': None, 'last_check': 0.0, 'last_progress': 0.0}
+
+    def should_stop() -> bool:
+        now = time.monotonic()
+        if now >= deadline:
+            state['reason'] = 'time_budget'
+            return True
+        if now - state['last_check'] >= CANCEL_CHECK_INTERVAL:
+            state['last_check'] = now
+            if GenerationJob.objects.filter(pk=job_id, cancel_requested=True).exists():
+                state['reason'] = 'cancelled'
+                return True
+        return False
+
+    def is_cancelled() -> bool:
+        # Antes de las fases posteriores a la evolución (sin esperar al intervalo)
+        if state['reason'] != 'cancelled' and GenerationJob.objects.filter(
+                pk=job_id, cancel_requested=True).exists():
+            state['reason'] = 'cancelled'
+        return state['reason'] == 'cancelled'
+
+    def save_progress(event: Dict):
+        # Los eventos de cada generación se guardan como máximo una vez por
+        # PROGRESS_SAVE_INTERVAL; los demás (inicio, fin) siempre
+        now = time.monotonic()
+        if event['type'] == 'generation' and now - state['last_progress'] < PROGRESS_SAVE_INTERVAL:
+            return
+        state['last_progress'] = now
+        GenerationJob.objects.filter(pk=job_id).update(progress=event)
+
+    print(f"[INFO] Trabajo de generación {job_id} iniciado (presupuesto: {job.time_budget}s)")
+    try:
+        generator = ScheduleGenerator(
+            population_size=params['population_size'],
+            generations=params['generations'],
+            mutation_rate=params['mutation_rate'],
+            crossover_rate=params['crossover_rate'],
+            elitism_size=params['elitism_size'],
+            tournament_size=params['tournament_size']
+        )
+        generator.load_data()
+
+        warm_start = None
+        if params.get('warm_start_id'):
+            warm_start = Schedule.objects.filter(id=params['warm_start_id']).first()
+
+        schedule = generator.generate(
+            params['name'], params['description'],
+            compact=params['compact'], warm_start=warm_start,
+            should_stop=should_stop, on_progress=save_progress, is_cancelled=is_cancelled
+        )
+
+        stats = generator.ga.get_statistics()
+        result = {
+            'fitness': schedule.fitness_score,
+            'generations': stats['generations'],
+            'improvement': stats['improvement'],
+            'stopped_early': state['reason'],
+        }
+        _finish(job_id, GenerationJob.STATUS_SUCCEEDED, schedule=schedule, result=result)
+        print(f"[OK] Trabajo de generación {job_id} completado: horario {schedule.id}")
+    except GenerationCancelled:
+        _finish(job_id, GenerationJob.STATUS_CANCELLED)
+        print(f"[WARNING] Trabajo de generación {job_id} cancelado")
+    except Exception:
+        _finish(job_id, GenerationJob.STATUS_FAILED, error=traceback.format_exc())
+        print(f"[WARNING] Trabajo de generación {job_id} fallido")
+        traceback.print_exc()
+
+
+class JobDispatcher:
+    """
+    Toma trabajos en cola y los ejecuta en procesos hijos, respetando el
+    máximo de procesos simultáneos, el presupuesto de tiempo y las
+    cancelaciones. Varios despachadores pueden compartir la cola: cada
+    trabajo se reclama con un UPDATE condicionado a status='queued' y a que
+    haya menos de GENERATION_MAX_WORKERS trabajos 'running' en total
+    (max_workers limita además los procesos de este despachador).
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self.max_workers = max_workers
+        # job_id -> (proceso, instante límite para terminarlo)
+        self._processes: Dict[int, Tuple[multiprocessing.Process, float]] = {}
+        self._cancel_seen: Dict[int, float] = {}
+        self._context = multiprocessing.get_context('spawn')
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_recover = float('-inf')
+
+    def start(self):
+        """Inicia el despachador en un hilo en segundo plano"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self.run_forever, name='generation-dispatcher', daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        """Revisa la cola sin esperar al siguiente intervalo"""
+        self.start()
+        self._wake.set()
+
+    def run_forever(self):
+        while True:
+            try:
+                self.tick()
+            except Exception:
+                traceback.print_exc()
+            self._wake.wait(POLL_INTERVAL)
+            self._wake.clear()
+
+    def tick(self):
+        close_old_connections()
+        self._reap()
+        self._enforce_limits()
+        if time.monotonic() - self._last_recover >= RECOVER_INTERVAL:
+            self.recover_orphans()
+        self._start_queued()
+
+    @property
+    def running(self) -> int:
+        return len(self._processes)
+
+    def recover_orphans(self):
+        """
+        Marca como fallidos los trabajos 'running' que ningún proceso ejecuta
+        (reinicio o caída del despachador que los lanzó), para que no cuenten
+        contra GENERATION_MAX_PENDING ni GENERATION_MAX_WORKERS. Se omiten los
+        de este despachador; los demás son huérfanos si su proceso ya no
+        existe (los despachadores corren en el mismo equipo) o si pasaron su
+        presupuesto más dos veces GENERATION_KILL_GRACE, cuando el
+        despachador que los ejecutaba ya los habría terminado.
+        """
+        self._last_recover = time.monotonic()
+        now = timezone.now()
+        jobs = GenerationJob.objects.filter(status=GenerationJob.STATUS_RUNNING).exclude(
+            pk__in=list(self._processes)
+        ).only('id', 'worker_pid', 'started_at', 'time_budget')
+
+        for job in jobs:
+            elapsed = (now - (job.started_at or now)).total_seconds()
+            if elapsed > job.time_budget + 2 * KILL_GRACE:
+                reason = 'presupuesto de tiempo vencido'
+            elif job.worker_pid and not _process_exists(job.worker_pid):
+                reason = f'el proceso {job.worker_pid} ya no existe'
+            else:
+                continue
+            if _finish(job.pk, GenerationJob.STATUS_FAILED,
+                       error=f'Trabajo huérfano en ejecución ({reason})'):
+                print(f"[WARNING] Trabajo {job.pk} marcado como fallido ({reason})")
+
+    def _start_queued(self):
+        from .job_worker import main
+
+        # Subconsulta con el total de trabajos en ejecución (de todos los despachadores)
+        running = GenerationJob.objects.filter(
+            status=GenerationJob.STATUS_RUNNING
+        ).order_by().values('status').annotate(total=Count('pk')).values('total')
+
+        while len(self._processes) < self.max_workers:
+            job = GenerationJob.objects.filter(
+                status=GenerationJob.STATUS_QUEUED
+            ).order_by('created_at').only('id', 'time_budget').first()
+            if job is None:
+                return
+
+            # Un solo UPDATE: reclama el trabajo sólo si sigue en cola y hay
+            # un lugar libre entre los GENERATION_MAX_WORKERS globales
+            claimed = GenerationJob.objects.filter(
+                pk=job.pk, status=GenerationJob.STATUS_QUEUED
+            ).alias(
+                active=Coalesce(Subquery(running), 0)
+            ).filter(active__lt=MAX_WORKERS).update(
+                status=GenerationJob.STATUS_RUNNING, started_at=timezone.now()
+            )
+            if not claimed:
+                if GenerationJob.objects.filter(status=GenerationJob.STATUS_RUNNING).count() >= MAX_WORKERS:
+                    return  # Sin lugar libre: se reintenta al terminar algún trabajo
+                continue  # Lo tomó otro despachador o se canceló
+
+            process = self._context.Process(target=main, args=(job.pk,), daemon=True)
+            process.start()
+            GenerationJob.objects.filter(pk=job.pk).update(worker_pid=process.pid)
+            self._processes[job.pk] = (process, time.monotonic() + job.time_budget + KILL_GRACE)
+            print(f"[INFO] Trabajo {job.pk} asignado al proceso {process.pid}")
+
+    def _reap(self):
+        for job_id, (process, _) in list(self._processes.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self._processes[job_id]
+            self._cancel_seen.pop(job_id, None)
+            # Si el hijo murió sin registrar resultado
+            _finish(job_id, GenerationJob.STATUS_FAILED,
+                    error=f'El proceso terminó inesperadamente (código {process.exitcode})')
+
+    def _enforce_limits(self):
+        if not self._processes:
+            return
+
+        now = time.monotonic()
+        cancel_requested = set(GenerationJob.objects.filter(
+            pk__in=list(self._processes), cancel_requested=True
+        ).values_list('pk', flat=True))
+
+        for job_id, (process, kill_at) in list(self._processes.items()):
+            if job_id in cancel_requested:
+                self._cancel_seen.setdefault(job_id, now)
+
+            if now >= kill_at:
+                status, reason = GenerationJob.STATUS_TIMEOUT, 'Presupuesto de tiempo agotado'
+            elif job_id in self._cancel_seen and now - self._cancel_seen[job_id] >= KILL_GRACE:
+                status, reason = GenerationJob.STATUS_CANCELLED, 'Cancelado'
+            else:
+                continue
+
+            process.terminate()
+            process.join(5)
+            del self._processes[job_id]
+            self._cancel_seen.pop(job_id, None)
+            _finish(job_id, status, error=f'{reason}: proceso terminado')
+            print(f"[WARNING] Trabajo {job_id} terminado ({reason})")
+
+
+_dispatcher: Optional[JobDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> JobDispatcher:
+    """Despachador del proceso actual (se crea al primer uso)"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = JobDispatcher()
+        return _dispatcher
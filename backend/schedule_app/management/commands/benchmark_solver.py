@@ -0,0 +1,262 @@
+"""
+Comando de Django para medir el rendimiento del solver de forma reproducible.
+Uso: python manage.py benchmark_solver [--dataset db PATH ...] [--population 50 100]
+         [--generations 20] [--mode random heuristic] [--workers 1 2]
+         [--repeat 3] [--seed 42] [--json out.json] [--csv out.csv]
+         [--baseline base.json] [--tolerance 0.10] [--save-dataset DIR]
+
+Ejecuta la matriz dataset × población × generaciones × modo × workers con
+semillas fijas (ver solver/benchmark.py) y muestra por escenario la mediana
+del tiempo total, evaluaciones/s, tiempo por fase, memoria máxima, fitness
+y violaciones duras. Los datasets son 'db' (el problema actual de la base
+de datos) o directorios guardados con Problem.save / --save-dataset, que no
+cambian con las importaciones. Con --baseline compara contra un JSON
+anterior y falla si algún escenario es más lento que --tolerance.
+"""
+
+import csv
+import json
+import os
+import platform
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from schedule_app.problem_snapshot import get_problem
+from schedule_app.solver import Problem, schedulable
+from schedule_app.solver.benchmark import (
+    DEFAULT_PARAMS, MODES, PHASES, compare, run_scenario, summarize
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark reproducible del solver (matriz de escenarios, JSON/CSV y comparación con línea base)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dataset',
+            nargs='+',
+            default=['db'],
+            help="Datasets: 'db' (problema actual) o directorios de Problem.save (default: db)"
+        )
+        parser.add_argument(
+            '--population',
+            nargs='+',
+            type=int,
+            default=[50],
+            help='Tamaños de población (default: 50)'
+        )
+        parser.add_argument(
+            '--generations',
+            nargs='+',
+            type=int,
+            default=[20],
+            help='Números de generaciones (default: 20)'
+        )
+        parser.add_argument(
+            '--mode',
+            nargs='+',
+            choices=MODES,
+            default=['random'],
+            help='Inicialización de la población (default: random)'
+        )
+        parser.add_argument(
+            '--workers',
+            nargs='+',
+            type=int,
+            default=[1],
+            help='Ejecuciones simultáneas por repetición (default: 1)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Repeticiones por escenario (default: 3)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Semilla base (default: 42)'
+        )
+        parser.add_argument(
+            '--json',
+            type=str,
+            default=None,
+            help='Guardar ejecuciones y resumen en JSON (sirve como línea base)'
+        )
+        parser.add_argument(
+            '--csv',
+            type=str,
+            default=None,
+            help='Guardar una fila por ejecución en CSV'
+        )
+        parser.add_argument(
+            '--baseline',
+            type=str,
+            default=None,
+            help='JSON de un benchmark anterior para comparar'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.10,
+            help='Variación permitida frente a la línea base (default: 0.10)'
+        )
+        parser.add_argument(
+            '--save-dataset',
+            type=str,
+            default=None,
+            help='Guardar el problema actual en un directorio (dataset fijo) y salir'
+        )
+
+    def handle(self, *args, **options):
+        if options['save_dataset']:
+            problem = get_problem()
+            path = problem.save(options['save_dataset'], fingerprint=problem.fingerprint)
+            self.stdout.write(self.style.SUCCESS(f'[OK] Dataset guardado en {path}'))
+            return
+
+        if options['repeat'] < 1 or min(options['workers']) < 1:
+            raise CommandError('--repeat y --workers deben ser >= 1')
+
+        baseline = None
+        if options['baseline']:
+            try:
+                baseline = json.loads(Path(options['baseline']).read_text(encoding='utf-8'))['summary']
+            except (OSError, ValueError, KeyError) as exc:
+                raise CommandError(f"Línea base inválida ({options['baseline']}): {exc}")
+
+        with tempfile.TemporaryDirectory(prefix='benchmark-') as tmp:
+            datasets = self._prepare_datasets(options['dataset'], tmp)
+
+            scenarios = [
+                {'dataset': name, 'population': population, 'generations': generations,
+                 'mode': mode, 'workers': workers}
+                for name in datasets
+                for population in options['population']
+                for generations in options['generations']
+                for mode in options['mode']
+                for workers in options['workers']
+            ]
+
+            self.stdout.write(f"\n{'='*60}")
+            self.stdout.write(f"BENCHMARK DEL SOLVER ({len(scenarios)} escenarios × {options['repeat']} repeticiones)")
+            self.stdout.write(f"{'='*60}\n")
+
+            runs = []
+            for number, scenario in enumerate(scenarios, 1):
+                self.stdout.write(
+                    f"[INFO] {number}/{len(scenarios)} {scenario['dataset']} | pob {scenario['population']} | "
+                    f"gen {scenario['generations']} | {scenario['mode']} | workers {scenario['workers']}"
+                )
+                runs.extend(run_scenario(
+                    scenario, datasets[scenario['dataset']]['path'], options['seed'], options['repeat']
+                ))
+
+        summary = summarize(runs)
+        self._print_summary(summary)
+
+        result = {
+            'created': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+            },
+            'seed': options['seed'],
+            'repeat': options['repeat'],
+            'params': DEFAULT_PARAMS,
+            'datasets': {
+                name: {key: value for key, value in info.items() if key != 'path'}
+                for name, info in datasets.items()
+            },
+            'runs': runs,
+            'summary': summary,
+        }
+
+        comparison = None
+        if baseline is not None:
+            comparison = compare(summary, baseline, options['tolerance'])
+            result['comparison'] = comparison
+            self._print_comparison(comparison, options['tolerance'])
+
+        if options['json']:
+            Path(options['json']).write_text(json.dumps(result, indent=2), encoding='utf-8')
+            self.stdout.write(f"[OK] Resultados guardados en {options['json']}")
+        if options['csv']:
+            self._write_csv(options['csv'], runs)
+            self.stdout.write(f"[OK] Ejecuciones guardadas en {options['csv']}")
+
+        if comparison and any(row['status'] == 'slower' for row in comparison):
+            raise CommandError(f"Hay escenarios más lentos que la línea base (tolerancia {options['tolerance']:.0%})")
+
+    def _prepare_datasets(self, names, tmp):
+        """Cada dataset como directorio de Problem (la base de datos se lee una vez)"""
+        datasets = {}
+        for name in names:
+            if name == 'db':
+                problem = get_problem()
+                path = problem.save(Path(tmp) / 'db', fingerprint=problem.fingerprint)
+            else:
+                path = Path(name)
+                try:
+                    problem = Problem.load(path)
+                except (OSError, ValueError) as exc:
+                    raise CommandError(f'Dataset inválido ({name}): {exc}')
+            classes, rooms, _ = schedulable(*problem.entities())
+            datasets[name] = {
+                'path': str(path),
+                'classes': len(classes),
+                'rooms': len(rooms),
+                'fingerprint': problem.meta.get('fingerprint'),
+            }
+            self.stdout.write(f"[OK] Dataset {name}: {len(classes)} clases, {len(rooms)} aulas")
+        return datasets
+
+    def _print_summary(self, summary):
+        self.stdout.write(f"\n{'Escenario':<38} {'wall s':>8} {'eval/s':>9} {'RSS MB':>8} {'fitness':>12} {'duras':>6}")
+        for row in summary:
+            name = (f"{row['dataset']}/p{row['population']}/g{row['generations']}/"
+                    f"{row['mode']}/w{row['workers']}")
+            rss = f"{row['peak_rss_mb']:.0f}" if row['peak_rss_mb'] is not None else '-'
+            self.stdout.write(
+                f"{name:<38} {row['wall']:>8.2f} {row['evals_per_second']:>9.0f} {rss:>8} "
+                f"{row['fitness']:>12.0f} {row['hard_violations']:>6.0f}"
+            )
+            phases = ' | '.join(f"{phase} {row['phases'][phase]:.2f}s" for phase in PHASES)
+            self.stdout.write(f"    {phases}")
+        self.stdout.write('')
+
+    def _print_comparison(self, comparison, tolerance):
+        self.stdout.write(f"COMPARACIÓN CON LÍNEA BASE (tolerancia {tolerance:.0%})")
+        for row in comparison:
+            name = (f"{row['dataset']}/p{row['population']}/g{row['generations']}/"
+                    f"{row['mode']}/w{row['workers']}")
+            if row['status'] == 'new':
+                self.stdout.write(f"  [INFO] {name}: sin línea base")
+                continue
+            mark = '[WARNING]' if row['status'] == 'slower' else '[OK]'
+            self.stdout.write(
+                f"  {mark} {name}: {row['status']} | wall {row['wall_change']:+.1%} | "
+                f"eval/s {row['evals_per_second_change']:+.1%} | fitness {row['fitness_change']:+.0f} | "
+                f"duras {row['hard_violations_change']:+.0f}"
+            )
+        self.stdout.write('')
+
+    def _write_csv(self, path, runs):
+        fields = ['dataset', 'population', 'generations', 'mode', 'workers', 'repetition', 'worker',
+                  'seed', 'wall'] + [f'phase_{phase}' for phase in PHASES] + [
+                  'evaluations', 'evals_per_second', 'peak_rss_mb', 'fitness', 'hard_violations',
+                  'generations_run']
+        with open(path, 'w', newline='', encoding='utf-8') as handle:
+            writer = csv.DictWriter(handle, fieldnames=fields)
+            writer.writeheader()
+            for run in runs:
+                row = {key: run[key] for key in fields if key in run}
+                row.update({f'phase_{phase}': run['phases'][phase] for phase in PHASES})
+                writer.writerow(row)
@@ -0,0 +1,141 @@
+"""
+Comando de Django para revisar el perfil de la base de datos.
+Uso: python manage.py check_db_profile [--concurrency] [--hold 3]
+
+Muestra el motor y los parámetros efectivos (PRAGMA en SQLite, versión y
+pool en PostgreSQL) y falla si faltan triggers de data_versions (ver
+version_triggers.py). Con --concurrency simula la carga de producción: un hilo
+mantiene abierta una transacción de escritura durante --hold segundos
+mientras otro lee el catálogo sin parar y un tercero intenta escribir. Los
+lectores no deben esperar a la escritura y el segundo escritor debe esperar
+(busy_timeout) en vez de fallar con 'database is locked'. La transacción de
+prueba se revierte al terminar.
+"""
+
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction, OperationalError
+
+from schedule_app.db_profile import describe
+from schedule_app.models import Class, Room, StatsSnapshot, StudentClass
+from schedule_app.version_triggers import missing_triggers
+
+
+PROBE_KEY = '__db_profile_probe__'
+
+
+class Command(BaseCommand):
+    help = 'Muestra el perfil de la base de datos y prueba lectores concurrentes con escrituras largas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            action='store_true',
+            help='Probar lecturas y escrituras concurrentes'
+        )
+        parser.add_argument(
+            '--hold',
+            type=float,
+            default=3.0,
+            help='Segundos que se mantiene abierta la transacción de escritura (default: 3)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write("PERFIL DE BASE DE DATOS")
+        self.stdout.write(f"{'='*60}\n")
+        for key, value in describe(connection).items():
+            self.stdout.write(f"  {key:<18} {value}")
+
+        self._check_triggers()
+        if options['concurrency']:
+            self._check_concurrency(options['hold'])
+        self.stdout.write('')
+
+    def _check_triggers(self):
+        missing = missing_triggers(connection)
+        if missing:
+            raise CommandError(
+                f"Faltan {len(missing)} triggers de data_versions ({', '.join(missing)}); "
+                f"ejecuta `python manage.py migrate` para reinstalarlos"
+            )
+        self.stdout.write(self.style.SUCCESS('\n[OK] Triggers de data_versions instalados'))
+
+    def _check_concurrency(self, hold: float):
+        self.stdout.write(f"\n[INFO] Transacción de escritura abierta durante {hold:.1f}s")
+
+        started = threading.Event()
+        errors = []
+        reads = []
+        second_write = {}
+
+        def long_writer():
+            try:
+                with transaction.atomic():
+                    StatsSnapshot.objects.update_or_create(
+                        key=PROBE_KEY, defaults={'fingerprint': 'writer-1', 'payload': {}}
+                    )
+                    started.set()
+                    time.sleep(hold)
+                    transaction.set_rollback(True)
+            except Exception as exc:
+                errors.append(f'escritor largo: {exc}')
+                started.set()
+            finally:
+                connection.close()
+
+        def reader():
+            try:
+                deadline = time.monotonic() + hold * 0.8
+                while time.monotonic() < deadline:
+                    begin = time.perf_counter()
+                    Room.objects.count()
+                    Class.objects.filter(committed=True).count()
+                    StudentClass.objects.values('class_obj_id').distinct().count()
+                    reads.append(time.perf_counter() - begin)
+                    time.sleep(0.05)
+            except OperationalError as exc:
+                errors.append(f'lector: {exc}')
+            finally:
+                connection.close()
+
+        def second_writer():
+            begin = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    StatsSnapshot.objects.update_or_create(
+                        key=PROBE_KEY, defaults={'fingerprint': 'writer-2', 'payload': {}}
+                    )
+                    transaction.set_rollback(True)
+                second_write['wait'] = time.perf_counter() - begin
+            except OperationalError as exc:
+                errors.append(f'segundo escritor: {exc}')
+            finally:
+                connection.close()
+
+        writer = threading.Thread(target=long_writer)
+        writer.start()
+        started.wait()
+
+        threads = [threading.Thread(target=reader), threading.Thread(target=second_writer)]
+        for thread in threads:
+            thread.start()
+        for thread in threads + [writer]:
+            thread.join()
+
+        if reads:
+            reads.sort()
+            self.stdout.write(
+                f"  lecturas           {len(reads)} | mediana {reads[len(reads) // 2] * 1000:.1f} ms"
+                f" | máx {reads[-1] * 1000:.1f} ms"
+            )
+        if 'wait' in second_write:
+            self.stdout.write(f"  segundo escritor   esperó {second_write['wait']:.2f}s")
+
+        if errors:
+            raise CommandError('Errores de concurrencia:\n  ' + '\n  '.join(errors))
+        if not reads or reads[-1] >= hold / 2:
+            raise CommandError('Los lectores esperaron a la transacción de escritura')
+        self.stdout.write(self.style.SUCCESS('[OK] Lectores sin bloqueo durante la escritura'))
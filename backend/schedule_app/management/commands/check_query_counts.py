@@ -0,0 +1,116 @@
+"""
+Comando de Django para verificar que los endpoints de la API no hacen N+1.
+Uso: python manage.py check_query_counts [--verbose]
+
+Cada listado se pide en su primera y en su última página (con distinta
+cantidad de filas): el número de consultas debe ser el mismo y no superar el
+presupuesto del endpoint. Los listados con cursor (KeysetPagination) se
+recorren siguiendo 'next' y se comparan la primera y la última página. Los detalles se piden para el primer objeto.
+Necesita datos cargados (import_xml) y al menos un horario.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from schedule_app.models import Class, Course, Instructor, Schedule, Student
+from schedule_app.solution_storage import ensure_materialized
+
+
+# Consultas máximas por endpoint (sin contar la paginación de listas vacías)
+LIST_BUDGETS = {
+    '/api/rooms/': 2,
+    '/api/instructors/': 2,
+    '/api/courses/': 2,
+    '/api/classes/': 3,
+    '/api/students/': 1,
+    '/api/schedules/': 2,
+    '/api/timeslots/': 1,
+    '/api/class-instructors/': 1,
+    '/api/class-rooms/': 2,
+    '/api/student-classes/': 1,
+    '/api/generation-jobs/': 2,
+}
+
+
+class Command(BaseCommand):
+    help = 'Verifica que el número de consultas de la API no depende del número de filas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose',
+            action='store_true',
+            help='Mostrar el SQL de cada petición'
+        )
+
+    def handle(self, *args, **options):
+        self.client = Client()
+        self.verbose = options['verbose']
+        failures = []
+
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write("CONSULTAS POR ENDPOINT")
+        self.stdout.write(f"{'='*60}\n")
+
+        for url, budget in LIST_BUDGETS.items():
+            first = self._get(url)
+            data = first['response'].json()
+            page_size = len(data.get('results', [])) or 1
+            if 'count' in data:
+                last_page = max(1, -(-data['count'] // page_size))
+                last = self._get(f'{url}?page={last_page}') if last_page > 1 else first
+            else:
+                last = self._last_cursor_page(url)
+
+            line = (f"  {url:<28} filas {page_size:>3}/{len(last['response'].json()['results']):>3}"
+                    f" | consultas {first['queries']:>2}/{last['queries']:>2} (máx {budget})")
+            if first['queries'] != last['queries']:
+                failures.append(f'{url}: {first["queries"]} vs {last["queries"]} consultas según la página')
+            elif first['queries'] > budget:
+                failures.append(f'{url}: {first["queries"]} consultas (máximo {budget})')
+            self.stdout.write(line)
+
+        # Detalles y acciones que anidan listas
+        schedule = Schedule.objects.order_by('-id').first()
+        if schedule is not None:
+            ensure_materialized(schedule)
+        details = [
+            (Class, '/api/classes/{}/', 6),
+            (Instructor, '/api/instructors/{}/classes/', 4),
+            (Course, '/api/courses/{}/classes/', 4),
+            (Student, '/api/students/{}/', 1),
+            (Schedule, '/api/schedules/{}/', 6),
+        ]
+        for model, pattern, budget in details:
+            obj = model.objects.order_by('pk').first() if model is not Schedule else schedule
+            if obj is None:
+                continue
+            url = pattern.format(obj.pk)
+            result = self._get(url)
+            self.stdout.write(f"  {url:<28} consultas {result['queries']:>2} (máx {budget})")
+            if result['queries'] > budget:
+                failures.append(f'{url}: {result["queries"]} consultas (máximo {budget})')
+
+        self.stdout.write(f"\n{'='*60}\n")
+        if failures:
+            raise CommandError('Endpoints con consultas por fila:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS('[OK] Número de consultas fijo en todos los endpoints'))
+
+    def _last_cursor_page(self, url):
+        """Recorre un listado con cursor (páginas de 1000) hasta la última página"""
+        page = self._get(f'{url}?page_size=1000')
+        while page['response'].json().get('next'):
+            page = self._get(page['response'].json()['next'])
+        return page
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, HTTP_ACCEPT='application/json')
+        if response.status_code != 200:
+            raise CommandError(f'{url} respondió {response.status_code}')
+        if self.verbose:
+            self.stdout.write(f'\n{url}')
+            for query in ctx.captured_queries:
+                self.stdout.write(f"    {query['sql'][:160]}")
+        return {'response': response, 'queries': len(ctx.captured_queries)}
@@ -0,0 +1,134 @@
+"""
+Comando de Django para verificar que las consultas frecuentes usan índices.
+Uso: python manage.py check_query_plans [--verbose]
+
+Cada consulta se pasa por EXPLAIN QUERY PLAN (SQLite) y falla si alguna de
+sus tablas se recorre completa (SCAN sin índice), si necesita ordenar en un
+B-tree temporal o si no usa el índice esperado (migración 0011). En otros
+motores sólo se muestra el plan. Necesita datos cargados (import_xml) y al
+menos un horario.
+"""
+
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+
+from schedule_app.models import (
+    Class, GenerationJob, GroupConstraintClass, Room, Schedule,
+    ScheduleAssignment, Student, StudentClass, TimeSlot
+)
+
+
+FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?! USING)\s*$')
+
+
+def hot_queries(schedule, room, time_slot, class_obj, student):
+    """(nombre, queryset, índice esperado o None) de los caminos de acceso frecuentes"""
+    return [
+        ('asignaciones de un aula (views, rooms)',
+         ScheduleAssignment.objects.filter(schedule=schedule, room=room).select_related(
+             'class_obj__offering', 'time_slot'),
+         'sa_schedule_room_idx'),
+        ('asignaciones de un slot',
+         ScheduleAssignment.objects.filter(schedule=schedule, time_slot=time_slot),
+         'sa_schedule_timeslot_idx'),
+        ('asignaciones de un horario (analysis, timetable)',
+         ScheduleAssignment.objects.filter(schedule=schedule).select_related(
+             'class_obj', 'room', 'time_slot'),
+         None),
+        ('patrón de una clase (importadores)',
+         TimeSlot.objects.filter(class_obj=class_obj, days=time_slot.days,
+                                 start_time=time_slot.start_time, length=time_slot.length),
+         'ts_class_pattern_idx'),
+        ('slots de varias clases (importadores)',
+         TimeSlot.objects.filter(class_obj_id__in=[class_obj.pk]).values_list(
+             'id', 'class_obj_id', 'days', 'start_time', 'length'),
+         'ts_class_pattern_idx'),
+        ('estudiantes de una clase',
+         StudentClass.objects.filter(class_obj=class_obj).values_list('student_id', flat=True),
+         'sc_class_student_idx'),
+        ('estudiantes de un curso (constraints)',
+         StudentClass.objects.filter(class_obj__offering_id=class_obj.offering_id).values_list(
+             'student_id', flat=True),
+         'sc_class_student_idx'),
+        ('demandas de un curso',
+         StudentClass.objects.filter(offering_id=class_obj.offering_id).values_list(
+             'student_id', flat=True),
+         'sc_offering_student_idx'),
+        ('inscritos por clase de un horario (timetable)',
+         StudentClass.objects.filter(
+             class_obj_id__in=ScheduleAssignment.objects.filter(schedule=schedule).values('class_obj_id')
+         ).values('class_obj_id').annotate(n=Count('id')),
+         None),
+        ('clases de un estudiante',
+         StudentClass.objects.filter(student=student).select_related('class_obj'),
+         None),
+        ('restricciones de una clase',
+         GroupConstraintClass.objects.filter(class_obj=class_obj).values_list(
+             'constraint_id', flat=True),
+         'gcc_class_constraint_idx'),
+        ('cola de trabajos (despachador)',
+         GenerationJob.objects.filter(status=GenerationJob.STATUS_QUEUED).order_by('created_at'),
+         'job_status_created_idx'),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Verifica con EXPLAIN QUERY PLAN que las consultas frecuentes no recorren tablas completas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose',
+            action='store_true',
+            help='Mostrar el plan de cada consulta'
+        )
+
+    def handle(self, *args, **options):
+        schedule = Schedule.objects.order_by('-id').first()
+        room = Room.objects.order_by('id').first()
+        time_slot = TimeSlot.objects.order_by('id').first()
+        class_obj = Class.objects.filter(offering__isnull=False).order_by('id').first()
+        student = Student.objects.order_by('id').first()
+        if None in (schedule, room, time_slot, class_obj, student):
+            raise CommandError('Se necesitan datos cargados y al menos un horario')
+
+        sqlite = connection.vendor == 'sqlite'
+        failures = []
+
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write(f"PLANES DE CONSULTA ({connection.vendor})")
+        self.stdout.write(f"{'='*60}\n")
+
+        for name, queryset, index in hot_queries(schedule, room, time_slot, class_obj, student):
+            plan = queryset.explain()
+            problems = self._check_plan(plan, index) if sqlite else []
+
+            mark = '[WARNING]' if problems else '[OK]'
+            self.stdout.write(f"  {mark} {name}")
+            if problems or options['verbose'] or not sqlite:
+                for line in plan.splitlines():
+                    self.stdout.write(f"        {line}")
+            for problem in problems:
+                failures.append(f'{name}: {problem}')
+
+        self.stdout.write(f"\n{'='*60}\n")
+        if failures:
+            raise CommandError('Consultas sin índice:\n  ' + '\n  '.join(failures))
+        if sqlite:
+            self.stdout.write(self.style.SUCCESS('[OK] Todas las consultas frecuentes usan índices'))
+        else:
+            self.stdout.write('[INFO] Verificación automática sólo disponible en SQLite')
+
+    def _check_plan(self, plan: str, index):
+        problems = []
+        for line in plan.splitlines():
+            match = FULL_SCAN.search(line)
+            if match:
+                problems.append(f'recorre la tabla {match.group(1)} completa')
+            if 'USE TEMP B-TREE' in line:
+                problems.append('ordena en un B-tree temporal')
+        if index and index not in plan:
+            problems.append(f'no usa el índice {index}')
+        return problems
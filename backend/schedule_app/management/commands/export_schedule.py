@@ -0,0 +1,62 @@
+"""
+Comando de Django para exportar un horario a XML de solución o CSV.
+Uso: python manage.py export_schedule <schedule_id> [--format xml|csv] [--output ARCHIVO]
+"""
+
+import sys
+from contextlib import redirect_stdout
+
+from django.core.management.base import BaseCommand, CommandError
+from schedule_app.models import Schedule
+from schedule_app.schedule_export import EXPORTERS, EXPORT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Exporta un horario como XML de solución (estilo UniTime) o CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'schedule_id',
+            type=int,
+            help='ID del horario a exportar'
+        )
+        parser.add_argument(
+            '--format',
+            choices=sorted(EXPORTERS),
+            default='xml',
+            help='Formato de salida (default: xml)'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Archivo de salida (default: salida estándar)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help=f'Asignaciones leídas por consulta (default: {EXPORT_CHUNK_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        schedule = Schedule.objects.filter(id=options['schedule_id']).first()
+        if not schedule:
+            raise CommandError(f"Horario {options['schedule_id']} no existe")
+
+        writer, _ = EXPORTERS[options['format']]
+        chunks = writer(schedule, chunk_size=options['chunk_size'])
+
+        if options['output'] is None:
+            # Los mensajes de progreso (p. ej. al materializar) van a stderr
+            # para no mezclarse con el archivo exportado
+            with redirect_stdout(sys.stderr):
+                for chunk in chunks:
+                    self.stdout.write(chunk, ending='')
+            return
+
+        with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+            output.writelines(chunks)
+        self.stderr.write(self.style.SUCCESS(
+            f"[OK] Horario {schedule.id} exportado a {options['output']}"
+        ))
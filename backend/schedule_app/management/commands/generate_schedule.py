@@ -4,6 +4,7 @@ Uso: python manage.py generate_schedule [opciones]
 """
 
 from django.core.management.base import BaseCommand
+from schedule_app.models import Schedule
 from schedule_app.schedule_generator import ScheduleGenerator
 
 
@@ -47,6 +48,22 @@ class Command(BaseCommand):
             default=5,
             help='Tamaño del elitismo (default: 5)'
         )
+        parser.add_argument(
+            '--compact',
+            action='store_true',
+            help='Guardar la solución como genoma binario (sin filas de asignación)'
+        )
+        parser.add_argument(
+            '--warm-start',
+            type=int,
+            default=None,
+            help='ID de un horario existente para sembrar la población inicial'
+        )
+        parser.add_argument(
+            '--no-snapshot',
+            action='store_true',
+            help='Leer el problema desde la base de datos sin usar el snapshot en disco'
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('=== Generador de Horarios - Algoritmo Genético ===\n'))
@@ -62,13 +79,20 @@ class Command(BaseCommand):
         
         self.stdout.write('Cargando datos...')
         try:
-            generator.load_data()
+            generator.load_data(use_snapshot=False if options['no_snapshot'] else None)
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Error al cargar datos: {e}'))
             return
         
         self.stdout.write(self.style.SUCCESS('Datos cargados exitosamente\n'))
         
+        warm_start = None
+        if options['warm_start']:
+            warm_start = Schedule.objects.filter(id=options['warm_start']).first()
+            if not warm_start:
+                self.stdout.write(self.style.ERROR(f"Horario {options['warm_start']} no existe"))
+                return
+        
         # Generar horario
         self.stdout.write('Iniciando generación de horario...\n')
         try:
@@ -78,13 +102,20 @@ class Command(BaseCommand):
                            f"population={options['population']}, "
                            f"generations={options['generations']}, "
                            f"mutation_rate={options['mutation_rate']}, "
-                           f"crossover_rate={options['crossover_rate']}"
+                           f"crossover_rate={options['crossover_rate']}",
+                compact=options['compact'],
+                warm_start=warm_start
             )
             
             self.stdout.write(self.style.SUCCESS(f'\n[OK] Horario generado exitosamente!'))
             self.stdout.write(f'  ID: {schedule.id}')
             self.stdout.write(f'  Nombre: {schedule.name}')
             self.stdout.write(f'  Fitness: {schedule.fitness_score:.2f}')
+            
+            if options['compact']:
+                self.stdout.write(f"  Asignaciones: {schedule.genome_manifest['count']} (compacto, sin materializar)")
+                return
+            
             self.stdout.write(f'  Asignaciones: {schedule.assignments.count()}')
             
             # Obtener resumen
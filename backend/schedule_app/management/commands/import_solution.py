@@ -0,0 +1,77 @@
+"""
+Comando de Django para importar un XML de solución como horario.
+Uso: python manage.py import_solution <archivo> [--name NOMBRE] [--compact] [--evaluate]
+"""
+
+import os
+import xml.etree.ElementTree as ET
+
+from django.core.management.base import BaseCommand, CommandError
+from schedule_app.solution_importer import SolutionImporter
+
+
+class Command(BaseCommand):
+    help = 'Importa la solución de un XML (aula y horario por clase) como un Schedule'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'file',
+            type=str,
+            help='Ruta del XML de solución'
+        )
+        parser.add_argument(
+            '--name',
+            type=str,
+            default=None,
+            help='Nombre del horario (default: nombre del archivo)'
+        )
+        parser.add_argument(
+            '--compact',
+            action='store_true',
+            help='Guardar la solución como genoma binario (sin filas de asignación)'
+        )
+        parser.add_argument(
+            '--evaluate',
+            action='store_true',
+            help='Calcular el fitness de la solución con el validador del GA'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('=== Importación de Solución XML ===\n'))
+
+        name = options['name'] or os.path.basename(options['file'])
+        importer = SolutionImporter()
+        try:
+            schedule = importer.run(
+                options['file'],
+                name=name,
+                description=f"Solución importada desde {os.path.basename(options['file'])}",
+                compact=options['compact']
+            )
+        except FileNotFoundError:
+            raise CommandError(f"No existe el archivo {options['file']}")
+        except ET.ParseError as e:
+            raise CommandError(f'Error al parsear XML: {e}')
+
+        stats = importer.stats
+        self.stdout.write(self.style.SUCCESS(f'\n[OK] Horario creado en {stats["elapsed"]:.2f}s'))
+        self.stdout.write(f'  ID: {schedule.id}')
+        self.stdout.write(f'  Nombre: {schedule.name}')
+        self.stdout.write(f'  Asignaciones: {stats["assigned"]}/{stats["classes"]}')
+        for key, label in (
+            ('unknown_class', 'Clases no importadas'),
+            ('no_room', 'Sin aula en la solución'),
+            ('no_time', 'Sin horario en la solución'),
+            ('unknown_time', 'Horario sin TimeSlot equivalente'),
+        ):
+            if stats[key]:
+                self.stdout.write(self.style.WARNING(f'  [WARNING] {label}: {stats[key]}'))
+
+        if options['evaluate']:
+            from schedule_app.schedule_generator import ScheduleGenerator
+
+            self.stdout.write('\nEvaluando solución...')
+            generator = ScheduleGenerator()
+            generator.load_data()
+            fitness = generator.evaluate_schedule(schedule)
+            self.stdout.write(self.style.SUCCESS(f'  Fitness: {fitness:.2f}'))
@@ -0,0 +1,141 @@
+"""
+Comando de Django para importar datos desde un XML (formato UniTime/Purdue).
+Usa el mismo motor que la vista /api/import-xml/ (XMLImporter).
+Uso: python manage.py import_xml <archivo> [--clear-existing] [--incremental] [--batch-size N] [--trace-memory]
+"""
+
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from schedule_app.xml_importer import XMLImporter, IncrementalXMLImporter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+SECTION_LABELS = {
+    'rooms': 'Aulas',
+    'classes': 'Clases',
+    'constraints': 'Restricciones',
+    'students': 'Estudiantes',
+}
+
+
+def _peak_rss_mb():
+    """Pico de memoria residente del proceso en MB (None si no está disponible)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS reporta bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class Command(BaseCommand):
+    help = 'Importa aulas, clases, restricciones y estudiantes desde un archivo XML'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'file',
+            type=str,
+            help='Ruta del archivo XML'
+        )
+        parser.add_argument(
+            '--clear-existing',
+            action='store_true',
+            help='Vaciar los datos importados (y los horarios) antes de importar'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Aplicar sólo altas, cambios y bajas respecto a lo ya importado'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=XMLImporter.DEFAULT_BATCH_SIZE,
+            help=f'Elementos por lote de escritura (default: {XMLImporter.DEFAULT_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--trace-memory',
+            action='store_true',
+            help='Medir el pico de objetos Python con tracemalloc (hace la importación más lenta)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('=== Importación de XML ===\n'))
+
+        if options['trace_memory']:
+            tracemalloc.start()
+        importer_class = IncrementalXMLImporter if options['incremental'] else XMLImporter
+        importer = importer_class(batch_size=options['batch_size'], progress=self._progress)
+        try:
+            # El archivo se abre antes de vaciar nada, y el vaciado y la
+            # importación van en una sola transacción: si el XML no se puede
+            # leer o parsear, los datos existentes quedan intactos
+            with open(options['file'], 'rb') as xml_file, transaction.atomic():
+                if options['clear_existing']:
+                    start = time.perf_counter()
+                    deleted = XMLImporter.clear_existing()
+                    self.stdout.write(
+                        f'Datos existentes eliminados: {sum(deleted.values())} filas en '
+                        f'{time.perf_counter() - start:.2f}s'
+                    )
+                stats = importer.run(xml_file)
+        except FileNotFoundError:
+            raise CommandError(f"No existe el archivo {options['file']}")
+        except ET.ParseError as e:
+            raise CommandError(f'Error al parsear XML: {e}')
+        finally:
+            peak_python = None
+            if tracemalloc.is_tracing():
+                _, peak_python = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+        self.stdout.write(self.style.SUCCESS(f"\n[OK] XML importado en {stats['elapsed']:.2f}s"))
+        for key, value in stats.items():
+            if key not in ('elapsed', 'changes'):
+                self.stdout.write(f'  - {key}: {value}')
+
+        if options['incremental']:
+            self.stdout.write('\nCambios:')
+            for kind, changes in stats['changes'].items():
+                self.stdout.write(
+                    f"  - {SECTION_LABELS.get(kind, kind)}: {changes['created']} nuevos, "
+                    f"{changes['updated']} modificados, {changes['deleted']} eliminados, "
+                    f"{changes['unchanged']} sin cambios"
+                )
+
+        self.stdout.write('\nFases:')
+        for kind, phase in importer.phases.items():
+            self.stdout.write(f"  - {SECTION_LABELS.get(kind, kind)}: {phase['rows']} elementos "
+                              f"en {phase['seconds']:.2f}s ({self._rate(phase['rows'], phase['seconds'])})")
+
+        self.stdout.write('\nMemoria:')
+        peak_rss = _peak_rss_mb()
+        if peak_rss is not None:
+            self.stdout.write(f'  - Pico de memoria del proceso: {peak_rss:.1f} MB')
+        if peak_python is not None:
+            self.stdout.write(f'  - Pico de objetos Python: {peak_python / (1024 * 1024):.1f} MB')
+        if peak_rss is None and peak_python is None:
+            self.stdout.write('  - No disponible en esta plataforma (usar --trace-memory)')
+
+    def _progress(self, kind, rows, seconds, finished):
+        label = SECTION_LABELS.get(kind, kind)
+        if finished:
+            self.stdout.write(self.style.SUCCESS(
+                f'[OK] {label}: {rows} elementos en {seconds:.2f}s ({self._rate(rows, seconds)})'
+            ))
+        else:
+            self.stdout.write(f'[INFO] {label}: {rows} elementos... ({self._rate(rows, seconds)})')
+
+    @staticmethod
+    def _rate(rows, seconds):
+        if seconds <= 0:
+            return '-'
+        return f'{rows / seconds:.0f} filas/s'
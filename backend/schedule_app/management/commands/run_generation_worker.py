@@ -0,0 +1,33 @@
+"""
+Comando de Django para ejecutar los trabajos de generación en cola.
+Uso: python manage.py run_generation_worker [--workers N]
+
+Pensado para despliegues con GENERATION_RUN_IN_PROCESS=False, donde el
+servidor web sólo encola los trabajos.
+"""
+
+from django.core.management.base import BaseCommand
+from schedule_app.jobs import JobDispatcher, MAX_WORKERS
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los trabajos de generación de horarios en segundo plano'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=MAX_WORKERS,
+            help=f'Procesos de generación simultáneos de este despachador; el total '
+                 f'entre despachadores no supera GENERATION_MAX_WORKERS (default: {MAX_WORKERS})'
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Despachador de generación iniciado ({workers} procesos). Ctrl+C para salir.'
+        ))
+        try:
+            JobDispatcher(max_workers=workers).run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Despachador detenido'))
@@ -4,7 +4,9 @@ Los instructores ya están asignados desde el XML, este script verifica si hay c
 """
 
 from django.core.management.base import BaseCommand
-from schedule_app.models import Schedule, ScheduleAssignment, ClassInstructor, TimeSlot
+from schedule_app.models import Schedule, ScheduleAssignment, ClassInstructor
+from schedule_app.solver.intervals import BusyIntervalIndex
+from schedule_app.solution_storage import ensure_materialized
 from collections import defaultdict
 
 
@@ -34,6 +36,8 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'Horario {schedule_id} no existe'))
             return
 
+        ensure_materialized(schedule)
+
         self.stdout.write(f"\n{'='*60}")
         self.stdout.write(f"VERIFICACIÓN DE CONFLICTOS DE INSTRUCTORES")
         self.stdout.write(f"Horario: {schedule.name} (ID: {schedule.id})")
@@ -44,50 +48,50 @@ class Command(BaseCommand):
             schedule=schedule
         ).select_related('class_obj', 'room', 'time_slot')
 
+        # Instructores de todas las clases del horario en una sola consulta
+        class_instructors = defaultdict(list)
+        for ci in ClassInstructor.objects.filter(
+            class_obj__in=assignments.values('class_obj')
+        ).select_related('instructor'):
+            class_instructors[ci.class_obj_id].append(ci.instructor)
+
         # Construir mapa: instructor -> [(class, room, timeslot)]
         instructor_schedules = defaultdict(list)
 
         for assignment in assignments:
-            # Obtener instructores de la clase
-            class_instructors = ClassInstructor.objects.filter(
-                class_obj=assignment.class_obj
-            ).select_related('instructor')
-
-            for ci in class_instructors:
-                instructor_schedules[ci.instructor].append({
+            for instructor in class_instructors.get(assignment.class_obj_id, []):
+                instructor_schedules[instructor].append({
                     'assignment': assignment,
                     'class': assignment.class_obj,
                     'room': assignment.room,
                     'timeslot': assignment.time_slot
                 })
 
-        # Detectar conflictos
+        # Detectar conflictos con el índice de intervalos por instructor y día
         total_conflicts = 0
         conflicts_by_instructor = {}
+        busy = BusyIntervalIndex()
 
         for instructor, schedule_list in instructor_schedules.items():
             conflicts = []
 
-            # Comparar cada par de asignaciones
-            for i in range(len(schedule_list)):
-                for j in range(i + 1, len(schedule_list)):
-                    assign1 = schedule_list[i]
-                    assign2 = schedule_list[j]
-
-                    ts1 = assign1['timeslot']
-                    ts2 = assign2['timeslot']
-
-                    # Verificar solapamiento
-                    if self._timeslots_overlap(ts1, ts2):
-                        conflicts.append({
-                            'class1': assign1['class'],
-                            'class2': assign2['class'],
-                            'room1': assign1['room'],
-                            'room2': assign2['room'],
-                            'timeslot1': ts1,
-                            'timeslot2': ts2
-                        })
-                        total_conflicts += 1
+            for entry in schedule_list:
+                ts = entry['timeslot']
+                end = ts.start_time + ts.length
+
+                # Solapamientos con las clases ya registradas del instructor
+                for previous in busy.overlapping(instructor.id, ts.days, ts.start_time, end):
+                    conflicts.append({
+                        'class1': previous['class'],
+                        'class2': entry['class'],
+                        'room1': previous['room'],
+                        'room2': entry['room'],
+                        'timeslot1': previous['timeslot'],
+                        'timeslot2': ts
+                    })
+                    total_conflicts += 1
+
+                busy.add(instructor.id, ts.days, ts.start_time, end, entry)
 
             if conflicts:
                 conflicts_by_instructor[instructor] = conflicts
@@ -135,24 +139,6 @@ class Command(BaseCommand):
 
         self.stdout.write(f"\n{'='*60}\n")
 
-    def _timeslots_overlap(self, ts1: TimeSlot, ts2: TimeSlot) -> bool:
-        """Verifica si dos timeslots se solapan"""
-        # Verificar si comparten al menos un día
-        share_day = False
-        for i in range(min(len(ts1.days), len(ts2.days))):
-            if ts1.days[i] == '1' and ts2.days[i] == '1':
-                share_day = True
-                break
-
-        if not share_day:
-            return False
-
-        # Verificar solapamiento de tiempo
-        end1 = ts1.start_time + ts1.length
-        end2 = ts2.start_time + ts2.length
-
-        return not (end1 <= ts2.start_time or end2 <= ts1.start_time)
-
     def _format_time(self, start_time: int) -> str:
         """Formatea el tiempo desde slots de 5 minutos"""
         minutes = start_time * 5
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule_app', '0003_alter_groupconstraintclass_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstructorTimeSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('preference', models.FloatField(default=0.0)),
+                ('instructor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_prefs', to='schedule_app.instructor')),
+                ('time_slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='instructor_prefs', to='schedule_app.timeslot')),
+            ],
+            options={
+                'verbose_name': 'Preferencia de Horario de Instructor',
+                'verbose_name_plural': 'Preferencias de Horario de Instructores',
+                'db_table': 'instructor_time_slots',
+                'unique_together': {('instructor', 'time_slot')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule_app', '0004_instructortimeslot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='genome',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='schedule',
+            name='genome_manifest',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='schedule',
+            name='is_materialized',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule_app', '0006_xml_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleTimetable',
+            fields=[
+                ('schedule', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='timetable_cache', serialize=False, to='schedule_app.schedule')),
+                ('fingerprint', models.CharField(max_length=128)),
+                ('payload', models.BinaryField()),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Tabla de Horario',
+                'verbose_name_plural': 'Tablas de Horarios',
+                'db_table': 'schedule_timetables',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule_app', '0007_schedule_timetable'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('status', models.CharField(choices=[('queued', 'En cola'), ('running', 'En ejecución'), ('succeeded', 'Completado'), ('failed', 'Fallido'), ('cancelled', 'Cancelado'), ('timeout', 'Tiempo agotado')], default='queued', max_length=20)),
+                ('params', models.JSONField(default=dict)),
+                ('time_budget', models.IntegerField()),
+                ('cancel_requested', models.BooleanField(default=False)),
+                ('worker_pid', models.IntegerField(blank=True, null=True)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('schedule', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='generation_jobs', to='schedule_app.schedule')),
+            ],
+            options={
+                'verbose_name': 'Trabajo de Generación',
+                'verbose_name_plural': 'Trabajos de Generación',
+                'db_table': 'generation_jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
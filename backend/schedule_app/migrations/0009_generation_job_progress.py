@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule_app', '0008_generation_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='progress',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule_app', '0009_generation_job_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('fingerprint', models.CharField(max_length=512)),
+                ('payload', models.JSONField()),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Estadísticas Precalculadas',
+                'verbose_name_plural': 'Estadísticas Precalculadas',
+                'db_table': 'stats_snapshots',
+            },
+        ),
+    ]
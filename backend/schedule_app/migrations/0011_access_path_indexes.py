@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule_app', '0010_stats_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='generationjob',
+            index=models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='groupconstraintclass',
+            index=models.Index(fields=['class_obj', 'constraint'], name='gcc_class_constraint_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduleassignment',
+            index=models.Index(fields=['schedule', 'room'], name='sa_schedule_room_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduleassignment',
+            index=models.Index(fields=['schedule', 'time_slot'], name='sa_schedule_timeslot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentclass',
+            index=models.Index(fields=['class_obj', 'student'], name='sc_class_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentclass',
+            index=models.Index(fields=['offering', 'student'], name='sc_offering_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(fields=['class_obj', 'days', 'start_time', 'length'], name='ts_class_pattern_idx'),
+        ),
+    ]
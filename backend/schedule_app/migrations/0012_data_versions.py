@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:01
+
+import random
+
+from django.db import migrations, models
+
+from schedule_app import version_triggers
+
+
+def install_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        version_triggers.install_triggers(cursor, vendor)
+
+    # Versión inicial de cada tabla (distinta en cada base de datos)
+    DataVersion = apps.get_model('schedule_app', 'DataVersion')
+    DataVersion.objects.bulk_create([
+        DataVersion(key=table, version=random.getrandbits(62))
+        for table in version_triggers.TRACKED_TABLES
+    ])
+
+
+def remove_triggers(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        version_triggers.drop_triggers(cursor, schema_editor.connection.vendor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule_app', '0011_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Versión de Datos',
+                'verbose_name_plural': 'Versiones de Datos',
+                'db_table': 'data_versions',
+            },
+        ),
+        migrations.RunPython(install_triggers, remove_triggers),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:21
+
+from django.db import migrations, models
+
+
+def mark_synthetic_assignments(apps, schema_editor):
+    # Las filas existentes no guardan su origen: sólo se reconocen las de
+    # instructores sintéticos (xml_id >= 900000, ver schedule_generator.py)
+    ClassInstructor = apps.get_model('schedule_app', 'ClassInstructor')
+    ClassInstructor.objects.filter(instructor__xml_id__gte=900000).update(source='assigned')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule_app', '0012_data_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classinstructor',
+            name='source',
+            field=models.CharField(choices=[('xml', 'Archivo XML'), ('assigned', 'Asignado por el sistema')], default='xml', max_length=10),
+        ),
+        migrations.RunPython(mark_synthetic_assignments, migrations.RunPython.noop),
+    ]
@@ -7,6 +7,8 @@ class Room(models.Model):
     capacity = models.IntegerField()
     location = models.CharField(max_length=100, blank=True)
     is_constraint = models.BooleanField(default=False)
+    # Hash de los atributos del elemento XML (importación incremental)
+    xml_hash = models.CharField(max_length=40, null=True, blank=True, editable=False)
     
     class Meta:
         db_table = 'rooms'
@@ -59,6 +61,8 @@ class Class(models.Model):
     department = models.IntegerField(null=True, blank=True)
     dates = models.TextField(blank=True)
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='children')
+    # Hash de los atributos del elemento XML (importación incremental)
+    xml_hash = models.CharField(max_length=40, null=True, blank=True, editable=False)
     
     class Meta:
         db_table = 'classes'
@@ -71,8 +75,17 @@ class Class(models.Model):
 
 class ClassInstructor(models.Model):
     """Relación entre clases e instructores"""
+    SOURCE_XML = 'xml'
+    SOURCE_ASSIGNED = 'assigned'
+    SOURCE_CHOICES = [
+        (SOURCE_XML, 'Archivo XML'),
+        (SOURCE_ASSIGNED, 'Asignado por el sistema'),
+    ]
+
     class_obj = models.ForeignKey(Class, on_delete=models.CASCADE, related_name='instructors')
     instructor = models.ForeignKey(Instructor, on_delete=models.CASCADE, related_name='classes')
+    # Origen de la fila: la re-importación incremental sólo reemplaza las del XML
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default=SOURCE_XML)
     
     class Meta:
         db_table = 'class_instructors'
@@ -81,6 +94,19 @@ class ClassInstructor(models.Model):
         verbose_name_plural = 'Instructores de Clases'
 
 
+class InstructorTimeSlot(models.Model):
+    """Preferencias de horario de los instructores"""
+    instructor = models.ForeignKey(Instructor, on_delete=models.CASCADE, related_name='time_prefs')
+    time_slot = models.ForeignKey('TimeSlot', on_delete=models.CASCADE, related_name='instructor_prefs')
+    preference = models.FloatField(default=0.0)
+    
+    class Meta:
+        db_table = 'instructor_time_slots'
+        unique_together = ('instructor', 'time_slot')
+        verbose_name = 'Preferencia de Horario de Instructor'
+        verbose_name_plural = 'Preferencias de Horario de Instructores'
+
+
 class ClassRoom(models.Model):
     """Relación entre clases y aulas con preferencias"""
     class_obj = models.ForeignKey(Class, on_delete=models.CASCADE, related_name='room_prefs')
@@ -105,6 +131,10 @@ class TimeSlot(models.Model):
     
     class Meta:
         db_table = 'time_slots'
+        indexes = [
+            # Búsqueda de un patrón concreto de una clase (importadores)
+            models.Index(fields=['class_obj', 'days', 'start_time', 'length'], name='ts_class_pattern_idx'),
+        ]
         verbose_name = 'Slot de Tiempo'
         verbose_name_plural = 'Slots de Tiempo'
     
@@ -133,6 +163,8 @@ class Student(models.Model):
     xml_id = models.IntegerField(unique=True)
     name = models.CharField(max_length=200, blank=True)
     email = models.EmailField(blank=True, null=True)
+    # Hash de los atributos del elemento XML (importación incremental)
+    xml_hash = models.CharField(max_length=40, null=True, blank=True, editable=False)
     
     class Meta:
         db_table = 'students'
@@ -153,6 +185,11 @@ class StudentClass(models.Model):
     class Meta:
         db_table = 'student_classes'
         unique_together = ('student', 'class_obj')
+        indexes = [
+            # Estudiantes de una clase o de un curso sin leer la tabla (índices cubrientes)
+            models.Index(fields=['class_obj', 'student'], name='sc_class_student_idx'),
+            models.Index(fields=['offering', 'student'], name='sc_offering_student_idx'),
+        ]
         verbose_name = 'Estudiante en Clase'
         verbose_name_plural = 'Estudiantes en Clases'
 
@@ -165,6 +202,10 @@ class Schedule(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     fitness_score = models.FloatField(default=0.0)
     is_active = models.BooleanField(default=False)
+    # Almacenamiento compacto opcional (ver solution_storage.py)
+    genome = models.BinaryField(null=True, blank=True, editable=False)
+    genome_manifest = models.JSONField(null=True, blank=True)
+    is_materialized = models.BooleanField(default=True)
     
     class Meta:
         db_table = 'schedules'
@@ -186,10 +227,56 @@ class ScheduleAssignment(models.Model):
     class Meta:
         db_table = 'schedule_assignments'
         unique_together = ('schedule', 'class_obj')
+        indexes = [
+            # Asignaciones de un aula / de un slot dentro de un horario
+            models.Index(fields=['schedule', 'room'], name='sa_schedule_room_idx'),
+            models.Index(fields=['schedule', 'time_slot'], name='sa_schedule_timeslot_idx'),
+        ]
         verbose_name = 'Asignación de Horario'
         verbose_name_plural = 'Asignaciones de Horarios'
 
 
+class ScheduleTimetable(models.Model):
+    """Tabla de horario precalculada de un Schedule (ver timetable_cache.py)"""
+    schedule = models.OneToOneField(Schedule, on_delete=models.CASCADE, primary_key=True, related_name='timetable_cache')
+    fingerprint = models.CharField(max_length=128)
+    payload = models.BinaryField()  # JSON comprimido con zlib
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'schedule_timetables'
+        verbose_name = 'Tabla de Horario'
+        verbose_name_plural = 'Tablas de Horarios'
+
+
+class StatsSnapshot(models.Model):
+    """Sección precalculada del dashboard (ver dashboard_snapshot.py)"""
+    key = models.CharField(max_length=50, unique=True)  # 'catalog', 'workload', 'schedule:<id>'
+    fingerprint = models.CharField(max_length=512)
+    payload = models.JSONField()
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'stats_snapshots'
+        verbose_name = 'Estadísticas Precalculadas'
+        verbose_name_plural = 'Estadísticas Precalculadas'
+
+
+class DataVersion(models.Model):
+    """
+    Versión de una tabla o de las asignaciones de un horario (ver
+    data_versions.py). La mantienen triggers de la base de datos: no escribir
+    desde la aplicación.
+    """
+    key = models.CharField(max_length=64, primary_key=True)  # 'rooms', 'schedule:<id>', ...
+    version = models.BigIntegerField()
+
+    class Meta:
+        db_table = 'data_versions'
+        verbose_name = 'Versión de Datos'
+        verbose_name_plural = 'Versiones de Datos'
+
+
 class GroupConstraint(models.Model):
     """Restricciones de grupo (BTB, DIFF_TIME, etc.)"""
     xml_id = models.IntegerField(unique=True)
@@ -197,6 +284,8 @@ class GroupConstraint(models.Model):
     preference = models.CharField(max_length=10)
     course_limit = models.IntegerField(null=True, blank=True)
     delta = models.IntegerField(null=True, blank=True)
+    # Hash de los atributos del elemento XML (importación incremental)
+    xml_hash = models.CharField(max_length=40, null=True, blank=True, editable=False)
     
     class Meta:
         db_table = 'group_constraints'
@@ -215,5 +304,54 @@ class GroupConstraintClass(models.Model):
     class Meta:
         db_table = 'group_constraint_classes'
         unique_together = ('constraint', 'class_obj')
+        indexes = [
+            models.Index(fields=['class_obj', 'constraint'], name='gcc_class_constraint_idx'),
+        ]
         verbose_name = 'Clase en Restricción de Grupo'
         verbose_name_plural = 'Clases en Restricciones de Grupo'
+
+
+class GenerationJob(models.Model):
+    """Generación de horario en segundo plano (ver jobs.py)"""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_TIMEOUT = 'timeout'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'En cola'),
+        (STATUS_RUNNING, 'En ejecución'),
+        (STATUS_SUCCEEDED, 'Completado'),
+        (STATUS_FAILED, 'Fallido'),
+        (STATUS_CANCELLED, 'Cancelado'),
+        (STATUS_TIMEOUT, 'Tiempo agotado'),
+    ]
+    ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+    name = models.CharField(max_length=200)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    params = models.JSONField(default=dict)  # Parámetros del GA
+    time_budget = models.IntegerField()  # Segundos
+    cancel_requested = models.BooleanField(default=False)
+    worker_pid = models.IntegerField(null=True, blank=True)
+    schedule = models.ForeignKey(Schedule, on_delete=models.SET_NULL, null=True, blank=True, related_name='generation_jobs')
+    progress = models.JSONField(null=True, blank=True)  # Último evento (ver progress.py)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'generation_jobs'
+        indexes = [
+            # Cola del despachador: status='queued' ORDER BY created_at
+            models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+        ]
+        verbose_name = 'Trabajo de Generación'
+        verbose_name_plural = 'Trabajos de Generación'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.name} ({self.status})"
@@ -0,0 +1,50 @@
+"""
+Paginación por cursor (keyset) y campos parciales para los listados grandes.
+
+PageNumberPagination hace un COUNT(*) por página y un OFFSET que crece con
+cada página, así que recorrer todos los estudiantes o inscripciones se vuelve
+cuadrático. KeysetPagination pagina con WHERE id > <último id> ORDER BY id
+sobre la clave primaria: cada página cuesta lo mismo sin importar su
+posición y no hay conteo. La respuesta mantiene 'results' y agrega
+'next'/'previous' con el cursor opaco:
+
+    GET /api/students/?page_size=500
+    GET /api/students/?cursor=cD0xMjM0&page_size=500
+
+Los serializers con SparseFieldsMixin aceptan ?fields=id,name para devolver
+sólo esos campos.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor sobre la clave primaria (indexada) para listados de muchas filas"""
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class SparseFieldsMixin:
+    """
+    Serializer que devuelve sólo los campos pedidos en ?fields=a,b,c.
+    Los nombres desconocidos se ignoran; sin el parámetro se devuelven todos.
+    """
+    fields_query_param = 'fields'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or not hasattr(request, 'query_params'):
+            return
+
+        requested = request.query_params.get(self.fields_query_param)
+        if not requested:
+            return
+
+        wanted = {name.strip() for name in requested.split(',')} & set(self.fields)
+        if not wanted:
+            return
+        for name in set(self.fields) - wanted:
+            self.fields.pop(name)
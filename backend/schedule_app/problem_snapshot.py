@@ -0,0 +1,219 @@
+"""
+Snapshot del problema de horarios en disco.
+
+ScheduleGenerator.load_data y ConstraintValidator.load_data leían las clases,
+aulas, slots, instructores, estudiantes por curso y restricciones de grupo
+con consultas por clase en cada ejecución, aunque los datos no cambiaran.
+Ahora el problema se lee con una consulta por tabla, se guarda como arreglos
+NumPy (.npy, sin pickle) en PROBLEM_SNAPSHOT_DIR/<huella>/ y las ejecuciones
+siguientes lo abren con memory-mapping.
+
+La huella son las versiones de datos (ver data_versions.py) de las tablas
+que se leen, en una sola consulta: cambia con cualquier importación o
+edición de esas tablas; un snapshot con otra huella o con otro
+PROBLEM_FORMAT_VERSION simplemente no se usa. Se conservan los
+PROBLEM_SNAPSHOT_KEEP más recientes.
+
+Éste es el lado Django del solver: el formato de los arreglos y su
+conversión a dataclasses están en solver/problem.py, de modo que un snapshot
+también se puede abrir sin base de datos con Problem.load(path).
+
+Uso:
+    problem = get_problem()          # desde el snapshot o la base de datos
+    classes, rooms, slots = problem.entities()
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+
+from .models import (
+    Room, Class, ClassInstructor, ClassRoom, TimeSlot, StudentClass,
+    GroupConstraint, GroupConstraintClass
+)
+from .data_versions import get_versions, versions_fingerprint
+from .solver.problem import Problem
+
+
+PROBLEM_FORMAT_VERSION = 3
+
+SNAPSHOT_DIR = Path(getattr(
+    settings, 'PROBLEM_SNAPSHOT_DIR',
+    os.path.join(tempfile.gettempdir(), 'timetable_problem_snapshots')
+))
+SNAPSHOT_ENABLED = getattr(settings, 'PROBLEM_SNAPSHOT_ENABLED', True)
+SNAPSHOT_KEEP = getattr(settings, 'PROBLEM_SNAPSHOT_KEEP', 3)
+
+# Tablas que se leen en build_arrays (cada una con su versión de datos)
+PROBLEM_TABLES = (
+    'classes', 'rooms', 'time_slots', 'class_instructors', 'class_rooms',
+    'student_classes', 'group_constraints', 'group_constraint_classes',
+)
+
+
+def problem_fingerprint() -> str:
+    """Huella de los datos del problema (una consulta)"""
+    return versions_fingerprint(
+        get_versions(*PROBLEM_TABLES), PROBLEM_FORMAT_VERSION, connection.settings_dict['NAME']
+    )
+
+
+def _int_array(values) -> np.ndarray:
+    return np.array(values, dtype=np.int64)
+
+
+def _columns(rows: List[tuple], width: int) -> List[list]:
+    """Transpone filas en columnas (listas vacías si no hay filas)"""
+    if not rows:
+        return [[] for _ in range(width)]
+    return [list(column) for column in zip(*rows)]
+
+
+def build_arrays() -> Dict[str, np.ndarray]:
+    """Lee el problema de la base de datos con una consulta por tabla"""
+    class_id, class_xml, class_offering, class_department, class_limit = _columns(list(
+        Class.objects.order_by('id').values_list('id', 'xml_id', 'offering_id', 'department', 'class_limit')
+    ), 5)
+    room_id, room_xml, room_capacity, room_location = _columns(list(
+        Room.objects.order_by('id').values_list('id', 'xml_id', 'capacity', 'location')
+    ), 4)
+    slot_id, slot_class, slot_days, slot_start, slot_length, slot_preference = _columns(list(
+        TimeSlot.objects.order_by('class_obj_id', 'id').values_list(
+            'id', 'class_obj_id', 'days', 'start_time', 'length', 'preference')
+    ), 6)
+    ci_class, ci_instructor = _columns(list(
+        ClassInstructor.objects.order_by('id').values_list('class_obj_id', 'instructor_id')
+    ), 2)
+    cr_class, cr_room, cr_preference = _columns(list(
+        ClassRoom.objects.order_by('id').values_list('class_obj_id', 'room_id', 'preference')
+    ), 3)
+    # Estudiantes por curso (ConstraintValidator agrupa a los estudiantes por offering)
+    os_offering, os_student = _columns(list(
+        StudentClass.objects.filter(class_obj__offering__isnull=False).values_list(
+            'class_obj__offering_id', 'student_id'
+        ).distinct().order_by('class_obj__offering_id', 'student_id')
+    ), 2)
+    gc_id, gc_type, gc_preference = _columns(list(
+        GroupConstraint.objects.order_by('id').values_list('id', 'constraint_type', 'preference')
+    ), 3)
+    gcc_constraint, gcc_class = _columns(list(
+        GroupConstraintClass.objects.order_by('constraint_id', 'class_obj_id').values_list(
+            'constraint_id', 'class_obj_id')
+    ), 2)
+
+    return {
+        'class_id': _int_array(class_id),
+        'class_xml_id': _int_array(class_xml),
+        'class_offering': _int_array([offering or 0 for offering in class_offering]),
+        'class_department': _int_array([department or 0 for department in class_department]),
+        'class_limit': _int_array(class_limit),
+        'room_id': _int_array(room_id),
+        'room_xml_id': _int_array(room_xml),
+        'room_capacity': _int_array(room_capacity),
+        'room_location': np.array(room_location, dtype=np.str_).reshape(-1),
+        'slot_id': _int_array(slot_id),
+        'slot_class': _int_array(slot_class),
+        'slot_days': np.array(slot_days, dtype=np.str_).reshape(-1),
+        'slot_start': _int_array(slot_start),
+        'slot_length': _int_array(slot_length),
+        'slot_preference': np.array(slot_preference, dtype=np.float64),
+        'ci_class': _int_array(ci_class),
+        'ci_instructor': _int_array(ci_instructor),
+        'cr_class': _int_array(cr_class),
+        'cr_room': _int_array(cr_room),
+        'cr_preference': np.array(cr_preference, dtype=np.float64),
+        'os_offering': _int_array(os_offering),
+        'os_student': _int_array(os_student),
+        'gc_id': _int_array(gc_id),
+        'gc_type': np.array(gc_type, dtype=np.str_).reshape(-1),
+        'gc_preference': np.array(gc_preference, dtype=np.str_).reshape(-1),
+        'gcc_constraint': _int_array(gcc_constraint),
+        'gcc_class': _int_array(gcc_class),
+    }
+
+
+class ProblemSnapshot(Problem):
+    """Problem con la huella de los datos y su origen"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], fingerprint: str, source: str):
+        super().__init__(arrays, {'format': PROBLEM_FORMAT_VERSION, 'fingerprint': fingerprint})
+        self.fingerprint = fingerprint
+        self.source = source  # 'cache' o 'db'
+
+
+def _snapshot_path(fingerprint: str) -> Path:
+    digest = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()[:20]
+    return SNAPSHOT_DIR / f'v{PROBLEM_FORMAT_VERSION}-{digest}'
+
+
+def save_arrays(arrays: Dict[str, np.ndarray], fingerprint: str) -> Path:
+    """Escribe el snapshot en un directorio temporal y lo publica con un rename atómico"""
+    path = _snapshot_path(fingerprint)
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix='.tmp-', dir=SNAPSHOT_DIR))
+    try:
+        Problem(arrays).save(tmp, format=PROBLEM_FORMAT_VERSION, fingerprint=fingerprint)
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # Otro proceso publicó el mismo snapshot primero
+            shutil.rmtree(tmp, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    _prune()
+    return path
+
+
+def load_arrays(fingerprint: str) -> Optional[Dict[str, np.ndarray]]:
+    """Abre el snapshot con memory-mapping (None si no existe o no coincide)"""
+    try:
+        problem = Problem.load(_snapshot_path(fingerprint))
+    except (OSError, ValueError):
+        return None
+    if problem.meta.get('format') != PROBLEM_FORMAT_VERSION or problem.meta.get('fingerprint') != fingerprint:
+        return None
+    return problem.arrays
+
+
+def _prune():
+    """Conserva sólo los SNAPSHOT_KEEP snapshots más recientes"""
+    snapshots = sorted(
+        (path for path in SNAPSHOT_DIR.glob('v*-*') if path.is_dir()),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True
+    )
+    for path in snapshots[SNAPSHOT_KEEP:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def get_problem(use_snapshot: Optional[bool] = None) -> ProblemSnapshot:
+    """
+    Problema actual: desde el snapshot si su huella coincide con los datos,
+    si no desde la base de datos (y se guarda para las siguientes ejecuciones).
+    """
+    if use_snapshot is None:
+        use_snapshot = SNAPSHOT_ENABLED
+
+    fingerprint = problem_fingerprint()
+    if use_snapshot:
+        arrays = load_arrays(fingerprint)
+        if arrays is not None:
+            print(f"[OK] Problema cargado desde snapshot ({_snapshot_path(fingerprint).name})")
+            return ProblemSnapshot(arrays, fingerprint, 'cache')
+
+    arrays = build_arrays()
+    if use_snapshot:
+        try:
+            path = save_arrays(arrays, fingerprint)
+            print(f"[INFO] Snapshot del problema guardado en {path}")
+        except OSError as exc:
+            print(f"[WARNING] No se pudo guardar el snapshot del problema: {exc}")
+    return ProblemSnapshot(arrays, fingerprint, 'db')
@@ -0,0 +1,65 @@
+"""
+Progreso de la generación como Server-Sent Events.
+
+Los eventos los publica el solver (ver solver/progress.py); los trabajos en
+segundo plano guardan el último en GenerationJob.progress (ver jobs.py) y
+sse_stream lo transmite a la API.
+"""
+
+import json
+import time
+from typing import Iterator
+
+
+SSE_POLL_INTERVAL = 0.5  # Segundos entre lecturas del trabajo
+SSE_KEEPALIVE = 15.0  # Segundos entre comentarios para mantener la conexión
+
+
+def sse_message(event: str, data, event_id=None) -> str:
+    """Formatea un mensaje text/event-stream"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def sse_stream(job_id: int) -> Iterator[str]:
+    """
+    Transmite el progreso de un GenerationJob: un mensaje 'progress' por cada
+    evento nuevo y un mensaje 'status' final cuando el trabajo termina.
+    """
+    from .models import GenerationJob
+
+    last_key = None
+    last_sent = time.monotonic()
+    fields = ('status', 'progress', 'schedule_id', 'result', 'error')
+
+    while True:
+        job = GenerationJob.objects.filter(pk=job_id).values(*fields).first()
+        if job is None:
+            return
+
+        progress = job['progress']
+        if progress:
+            key = (progress['type'], progress['generation'])
+            if key != last_key:
+                last_key = key
+                last_sent = time.monotonic()
+                yield sse_message('progress', progress, event_id=progress['generation'])
+
+        if job['status'] not in GenerationJob.ACTIVE_STATUSES:
+            yield sse_message('status', {
+                'status': job['status'],
+                'schedule': job['schedule_id'],
+                'result': job['result'],
+                'error': job['error'],
+            })
+            return
+
+        if time.monotonic() - last_sent >= SSE_KEEPALIVE:
+            last_sent = time.monotonic()
+            yield ': keepalive\n\n'
+
+        time.sleep(SSE_POLL_INTERVAL)
@@ -0,0 +1,260 @@
+"""
+Ocupación de aulas con NumPy.
+
+RoomOccupancy arma, con una sola consulta de asignaciones, un tensor
+aula × día × unidad de 5 minutos con el número de clases que ocupan cada aula
+en cada instante (y otro con los asientos pedidos, class_limit). Los
+intervalos se cargan con un arreglo de diferencias (+1 al inicio, -1 al fin)
+y una suma acumulada, sin bucles por aula.
+
+Métricas (dentro de la ventana de operación, lunes a viernes de
+ROOM_UTILIZATION_HOURS, por defecto 07:00-22:00):
+- occupied_hours / occupied_percentage: tiempo con al menos una clase
+- seat_fill: class_limit / capacidad ponderado por tiempo
+- peak_concurrency: máximo de clases simultáneas (>1 es un conflicto)
+- idle_windows: huecos libres entre clases de un mismo día (>= 30 min)
+- heatmaps: % de aulas ocupadas por día y hora, y % de ocupación por aula y día
+
+Uso:
+    occupancy = RoomOccupancy.from_schedule(schedule)
+    data = occupancy.report()
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+
+from .models import Room, Schedule, ScheduleAssignment
+from .solution_storage import ensure_materialized
+from .timetable_cache import DAY_NAMES
+
+
+UNITS_PER_HOUR = 12  # Unidades de 5 minutos
+UNITS_PER_DAY = 24 * UNITS_PER_HOUR
+WEEK_DAYS = 5  # Lunes a viernes
+
+OPEN_HOUR, CLOSE_HOUR = getattr(settings, 'ROOM_UTILIZATION_HOURS', (7, 22))
+MIN_IDLE_UNITS = 6  # Huecos de al menos 30 minutos
+
+
+def _format_unit(unit: int) -> str:
+    minutes = int(unit) * 5
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _ratio(numerator, denominator) -> np.ndarray:
+    """Cociente elemento a elemento con NaN donde el denominador es 0"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    out = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def _rounded(value, digits: int = 1) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+class RoomOccupancy:
+    """Tensores de ocupación de todas las aulas en un horario"""
+
+    def __init__(self, room_ids: np.ndarray, room_xml_ids: np.ndarray, capacities: np.ndarray,
+                 assignments: np.ndarray, classes: np.ndarray, seats: np.ndarray):
+        self.room_ids = room_ids
+        self.room_xml_ids = room_xml_ids
+        self.capacities = capacities
+        self.assignments = assignments  # (aulas,) asignaciones por aula
+        self.classes = classes  # (aulas, 7, 288) clases simultáneas
+        self.seats = seats  # (aulas, 7, 288) asientos pedidos
+
+    @classmethod
+    def from_schedule(cls, schedule: Schedule) -> 'RoomOccupancy':
+        ensure_materialized(schedule)
+        rooms = np.array(
+            list(Room.objects.order_by('id').values_list('id', 'xml_id', 'capacity')),
+            dtype=np.int64
+        ).reshape(-1, 3)
+        rows = list(ScheduleAssignment.objects.filter(schedule=schedule).values_list(
+            'room_id', 'class_obj__class_limit',
+            'time_slot__days', 'time_slot__start_time', 'time_slot__length'
+        ))
+        return cls.from_rows(rooms, rows)
+
+    @classmethod
+    def from_rows(cls, rooms: np.ndarray, rows: List[tuple]) -> 'RoomOccupancy':
+        """
+        rooms: arreglo (n, 3) de (id, xml_id, capacidad) ordenado por id
+        rows: tuplas (room_id, class_limit, días, inicio, duración)
+        """
+        room_ids = rooms[:, 0]
+        shape = (len(room_ids), 7, UNITS_PER_DAY + 1)
+        classes = np.zeros(shape, dtype=np.int32)
+        seats = np.zeros(shape, dtype=np.int64)
+        assignments = np.zeros(len(room_ids), dtype=np.int64)
+
+        if rows:
+            room_col = np.array([row[0] for row in rows], dtype=np.int64)
+            limits = np.array([row[1] for row in rows], dtype=np.int64)
+            starts = np.array([row[3] for row in rows], dtype=np.int64)
+            lengths = np.array([row[4] for row in rows], dtype=np.int64)
+            days = np.frombuffer(
+                ''.join(row[2][:7].ljust(7, '0') for row in rows).encode('ascii'),
+                dtype=np.uint8
+            ).reshape(-1, 7) == ord('1')
+
+            room_index = np.searchsorted(room_ids, room_col)
+            assignments = np.bincount(room_index, minlength=len(room_ids))
+
+            # Un intervalo por (asignación, día activo)
+            row_idx, day_idx = np.nonzero(days)
+            begin = np.clip(starts[row_idx], 0, UNITS_PER_DAY)
+            end = np.clip(starts[row_idx] + lengths[row_idx], 0, UNITS_PER_DAY)
+            target_rooms = room_index[row_idx]
+
+            np.add.at(classes, (target_rooms, day_idx, begin), 1)
+            np.add.at(classes, (target_rooms, day_idx, end), -1)
+            np.add.at(seats, (target_rooms, day_idx, begin), limits[row_idx])
+            np.add.at(seats, (target_rooms, day_idx, end), -limits[row_idx])
+
+        classes = np.cumsum(classes, axis=2)[:, :, :UNITS_PER_DAY]
+        seats = np.cumsum(seats, axis=2)[:, :, :UNITS_PER_DAY]
+        return cls(room_ids, rooms[:, 1], rooms[:, 2], assignments, classes, seats)
+
+    # --- Ventana de operación -------------------------------------------------
+
+    @property
+    def window(self) -> slice:
+        return slice(OPEN_HOUR * UNITS_PER_HOUR, CLOSE_HOUR * UNITS_PER_HOUR)
+
+    @property
+    def window_units(self) -> int:
+        return (CLOSE_HOUR - OPEN_HOUR) * UNITS_PER_HOUR
+
+    def occupied(self) -> np.ndarray:
+        """(aulas, días hábiles, unidades de la ventana) aula con alguna clase"""
+        return self.classes[:, :WEEK_DAYS, self.window] > 0
+
+    # --- Métricas -------------------------------------------------------------
+
+    def room_metrics(self) -> Dict[str, np.ndarray]:
+        """Métricas por aula como arreglos alineados con room_ids"""
+        occupied = self.occupied()
+        occupied_units = occupied.sum(axis=(1, 2))
+        class_units = self.classes[:, :WEEK_DAYS, self.window].sum(axis=(1, 2))
+        seat_units = self.seats[:, :WEEK_DAYS, self.window].sum(axis=(1, 2))
+
+        return {
+            'occupied_hours': occupied_units / UNITS_PER_HOUR,
+            'occupied_percentage': occupied_units / (WEEK_DAYS * self.window_units) * 100,
+            # Asientos pedidos por unidad de clase sobre la capacidad del aula
+            'seat_fill': _ratio(seat_units, class_units * self.capacities),
+            'peak_concurrency': self.classes.max(axis=(1, 2)),
+        }
+
+    def idle_windows(self) -> List[List[Dict]]:
+        """
+        Huecos libres entre dos clases del mismo día (no cuentan antes de la
+        primera ni después de la última), de al menos MIN_IDLE_UNITS.
+        """
+        occupied = self.occupied()
+        n_rooms, n_days, n_units = occupied.shape
+        flat = occupied.reshape(n_rooms * n_days, n_units).astype(np.int8)
+
+        # -1: termina una ocupación (empieza un hueco); +1: empieza una ocupación
+        edges = np.diff(flat, axis=1)
+        rows, cols = np.nonzero(edges)
+        kinds = edges[rows, cols]
+        # Un hueco interior es un -1 seguido de un +1 en la misma fila
+        is_gap = (kinds[:-1] == -1) & (kinds[1:] == 1) & (rows[:-1] == rows[1:])
+        gap_rows = rows[:-1][is_gap]
+        gap_start = cols[:-1][is_gap] + 1
+        gap_end = cols[1:][is_gap] + 1
+        keep = (gap_end - gap_start) >= MIN_IDLE_UNITS
+
+        windows: List[List[Dict]] = [[] for _ in range(n_rooms)]
+        offset = self.window.start
+        for row, start, end in zip(gap_rows[keep], gap_start[keep], gap_end[keep]):
+            room, day = divmod(int(row), n_days)
+            windows[room].append({
+                'day': DAY_NAMES[day],
+                'start': _format_unit(offset + start),
+                'end': _format_unit(offset + end),
+                'minutes': int(end - start) * 5,
+            })
+        return windows
+
+    def heatmaps(self) -> Dict:
+        """Matrices listas para graficar (porcentajes con un decimal)"""
+        occupied = self.occupied()
+        hours = CLOSE_HOUR - OPEN_HOUR
+
+        # % de aulas ocupadas por día y hora
+        if len(self.room_ids):
+            campus = occupied.mean(axis=0).reshape(WEEK_DAYS, hours, UNITS_PER_HOUR).mean(axis=2) * 100
+        else:
+            campus = np.zeros((WEEK_DAYS, hours))
+        # % de ocupación de cada aula por día
+        rooms = occupied.mean(axis=2) * 100
+
+        return {
+            'days': DAY_NAMES[:WEEK_DAYS],
+            'hours': [f"{hour:02d}:00" for hour in range(OPEN_HOUR, CLOSE_HOUR)],
+            'campus': np.round(campus, 1).tolist(),
+            'rooms': {
+                'room_ids': self.room_ids.tolist(),
+                'values': np.round(rooms, 1).tolist(),
+            },
+        }
+
+    def report(self) -> Dict:
+        """Resumen, métricas por aula, huecos y heatmaps"""
+        metrics = self.room_metrics()
+        idle = self.idle_windows()
+        occupied = self.occupied()
+
+        in_use = occupied.sum(axis=0)  # (días, unidades) aulas ocupadas
+        peak_day, peak_unit = np.unravel_index(in_use.argmax(), in_use.shape) if in_use.size else (0, 0)
+        used = self.assignments > 0
+
+        rooms = []
+        for i, room_id in enumerate(self.room_ids.tolist()):
+            rooms.append({
+                'room_id': room_id,
+                'xml_id': int(self.room_xml_ids[i]),
+                'capacity': int(self.capacities[i]),
+                'assignments': int(self.assignments[i]),
+                'occupied_hours': round(float(metrics['occupied_hours'][i]), 2),
+                'occupied_percentage': round(float(metrics['occupied_percentage'][i]), 1),
+                'seat_fill': _rounded(metrics['seat_fill'][i], 3),
+                'peak_concurrency': int(metrics['peak_concurrency'][i]),
+                'idle_windows': idle[i],
+            })
+        rooms.sort(key=lambda room: room['occupied_percentage'], reverse=True)
+
+        seat_units = self.seats[:, :WEEK_DAYS, self.window].sum(axis=(1, 2))
+        class_units = self.classes[:, :WEEK_DAYS, self.window].sum(axis=(1, 2))
+        return {
+            'window': {
+                'days': DAY_NAMES[:WEEK_DAYS],
+                'start': f"{OPEN_HOUR:02d}:00",
+                'end': f"{CLOSE_HOUR:02d}:00",
+            },
+            'summary': {
+                'total_rooms': len(self.room_ids),
+                'used_rooms': int(used.sum()),
+                'occupied_hours': round(float(metrics['occupied_hours'].sum()), 2),
+                'occupied_percentage': _rounded(metrics['occupied_percentage'].mean()) if len(rooms) else 0,
+                'seat_fill': _rounded(_ratio(
+                    seat_units.sum(), (class_units * self.capacities).sum()
+                ), 3),
+                'peak_rooms_in_use': int(in_use.max()) if in_use.size else 0,
+                'peak_at': {
+                    'day': DAY_NAMES[int(peak_day)],
+                    'time': _format_unit(self.window.start + int(peak_unit)),
+                },
+                'max_concurrency': int(metrics['peak_concurrency'].max()) if len(rooms) else 0,
+            },
+            'rooms': rooms,
+            'heatmaps': self.heatmaps(),
+        }
@@ -0,0 +1,118 @@
+"""
+Exportación en streaming de horarios a XML de solución (estilo UniTime) y CSV.
+
+Los escritores son generadores de texto: recorren las asignaciones con
+.iterator() por bloques (select_related para aula, timeslot y curso, y los
+instructores prefetch por bloque), así que la memoria no depende del tamaño
+del horario. Se usan tanto desde el comando export_schedule como desde
+StreamingHttpResponse.
+
+Uso:
+    from schedule_app.schedule_export import iter_xml, iter_csv
+
+    with open('solucion.xml', 'w') as f:
+        f.writelines(iter_xml(schedule))
+"""
+
+import csv
+from typing import Iterator
+from xml.sax.saxutils import quoteattr
+
+from django.db.models import Prefetch
+
+from .models import Schedule, ScheduleAssignment, ClassInstructor
+from .solution_storage import ensure_materialized
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+CSV_COLUMNS = [
+    'class_id', 'course_code', 'course_name', 'room_id', 'room_location',
+    'days', 'start', 'end', 'start_slot', 'length', 'instructors'
+]
+
+
+def iter_assignments(schedule: Schedule, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """Asignaciones del horario ordenadas por clase, leídas por bloques"""
+    ensure_materialized(schedule)
+    return ScheduleAssignment.objects.filter(
+        schedule=schedule
+    ).select_related(
+        'class_obj__offering', 'room', 'time_slot'
+    ).prefetch_related(
+        Prefetch(
+            'class_obj__instructors',
+            queryset=ClassInstructor.objects.select_related('instructor')
+        )
+    ).order_by('class_obj__xml_id').iterator(chunk_size=chunk_size)
+
+
+def _attrs(**values) -> str:
+    return ' '.join(f'{key}={quoteattr(str(value))}' for key, value in values.items() if value is not None)
+
+
+def iter_xml(schedule: Schedule, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    XML de solución: un <class> por asignación con el aula, el horario y los
+    instructores marcados con solution="true", igual que los archivos de
+    solución de UniTime (y legible por SolutionImporter).
+    """
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield (f'<timetable {_attrs(version="2.3", nrDays=7, slotsPerDay=288)} '
+           f'{_attrs(schedule=schedule.id, name=schedule.name)}>\n')
+    yield '  <classes>\n'
+
+    for assignment in iter_assignments(schedule, chunk_size):
+        class_obj = assignment.class_obj
+        ts = assignment.time_slot
+        lines = [
+            f'    <class {_attrs(id=class_obj.xml_id, offering=class_obj.offering.xml_id if class_obj.offering else None, classLimit=class_obj.class_limit)}>'
+        ]
+        for ci in class_obj.instructors.all():
+            lines.append(f'      <instructor {_attrs(id=ci.instructor.xml_id, solution="true")}/>')
+        lines.append(f'      <room {_attrs(id=assignment.room.xml_id, solution="true")}/>')
+        lines.append(
+            f'      <time {_attrs(days=ts.days, start=ts.start_time, length=ts.length, breakTime=ts.break_time, solution="true")}/>'
+        )
+        lines.append('    </class>\n')
+        yield '\n'.join(lines)
+
+    yield '  </classes>\n'
+    yield '</timetable>\n'
+
+
+class _Echo:
+    """Pseudo-buffer para csv.writer: devuelve la línea en lugar de guardarla"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(schedule: Schedule, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """CSV con una fila por asignación (columnas en CSV_COLUMNS)"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS)
+
+    for assignment in iter_assignments(schedule, chunk_size):
+        class_obj = assignment.class_obj
+        offering = class_obj.offering
+        ts = assignment.time_slot
+        yield writer.writerow([
+            class_obj.xml_id,
+            offering.code if offering else '',
+            offering.name if offering else '',
+            assignment.room.xml_id,
+            assignment.room.location,
+            ts.days,
+            ts.get_start_time_formatted(),
+            ts.get_end_time_formatted(),
+            ts.start_time,
+            ts.length,
+            ';'.join(ci.instructor.name or str(ci.instructor.xml_id) for ci in class_obj.instructors.all())
+        ])
+
+
+EXPORTERS = {
+    'xml': (iter_xml, 'application/xml'),
+    'csv': (iter_csv, 'text/csv'),
+}
@@ -2,29 +2,41 @@
 Metodo de generación de horarios usando algoritmo genético
 """
 
-from typing import Dict, List, Optional
+import time
+from typing import Callable, Dict, List, Optional
 from django.db import transaction
 from django.utils import timezone
 from .models import (
-    Class, Room, TimeSlot, Schedule, ScheduleAssignment,
+    Class, Course, Schedule, ScheduleAssignment,
     Instructor, ClassInstructor
 )
-from .genetic_algorithm import GeneticAlgorithm, Individual
-from .constraints import ConstraintValidator
+from .solver import (
+    GeneticAlgorithm, Individual, ConstraintValidator,
+    SolverClass, SolverRoom, SolverTimeSlot, schedulable
+)
+from .solution_storage import pack_genes, genes_from_schedule
+from .problem_snapshot import get_problem
+from .dashboard_snapshot import refresh_dashboard
 
 # Importar heuristics si está disponible
 try:
-    from .heuristics import ScheduleHeuristics
+    from .solver.heuristics import ScheduleHeuristics
     HEURISTICS_AVAILABLE = True
 except ImportError:
     HEURISTICS_AVAILABLE = False
 
 
+class GenerationCancelled(Exception):
+    """La generación se canceló (no queda ningún horario guardado)"""
+
+
 class ScheduleGenerator:
     """
     Metodo principal para generar horarios usando algoritmo genético.
     """
     
+    SAVE_BATCH_SIZE = 500  # Filas por INSERT al guardar asignaciones
+    
     def __init__(self,
                  population_size: int = 100,
                  generations: int = 200,
@@ -55,32 +67,35 @@ class ScheduleGenerator:
         else:
             self.heuristics = None
         
-        self.classes: List[Class] = []
-        self.rooms: List[Room] = []
-        self.time_slots_by_class: Dict[int, List[TimeSlot]] = {}
+        self.classes: List[SolverClass] = []
+        self.rooms: List[SolverRoom] = []
+        self.time_slots_by_class: Dict[int, List[SolverTimeSlot]] = {}
+        self.class_instructors: Dict[int, List[int]] = {}
     
-    def load_data(self):
+    def load_data(self, use_snapshot: Optional[bool] = None):
         """
         Carga datos con PREPROCESAMIENTO INTELIGENTE:
         1. Filtrar clases sin timeslots (no se pueden programar)
         2. Filtrar aulas no utilizadas (sin asignaciones previas)
         3. NO crear instructores sintéticos (causan estancamiento)
+        
+        El problema se lee del snapshot en disco si los datos no cambiaron
+        desde la última ejecución (ver problem_snapshot.py); use_snapshot=False
+        lo lee siempre de la base de datos. El solver (schedule_app.solver)
+        recibe dataclasses y arreglos, no instancias de modelo.
         """
         import sys
         
-        # Cargar todas las clases
-        all_classes = list(Class.objects.select_related('offering').all())
+        problem = get_problem(use_snapshot)
+        all_classes, all_rooms, time_slots_by_class = problem.entities()
+        self.class_instructors = problem.class_instructors()
         print(f"[INFO] Clases totales en DB: {len(all_classes)}")
         
-        # FILTRO 1: Solo clases con timeslots válidos
-        classes_with_timeslots = []
-        for class_obj in all_classes:
-            time_slots = list(TimeSlot.objects.filter(class_obj=class_obj))
-            if time_slots:
-                self.time_slots_by_class[class_obj.id] = time_slots
-                classes_with_timeslots.append(class_obj)
-        
-        self.classes = classes_with_timeslots
+        # FILTRO 1 y 3: clases con timeslots válidos y aulas con capacidad
+        # suficiente para al menos una clase (ver solver.problem.schedulable)
+        self.classes, self.rooms, self.time_slots_by_class = schedulable(
+            all_classes, all_rooms, time_slots_by_class
+        )
         print(f"[OK] Clases con timeslots válidos: {len(self.classes)}")
         
         if len(all_classes) > len(self.classes):
@@ -88,12 +103,8 @@ class ScheduleGenerator:
             print(f"[WARNING] {removed} clases ignoradas (sin timeslots disponibles)")
         
         # FILTRO 2: Verificar instructores (NUEVO ENFOQUE: NO asignar durante generación)
-        from .models import ClassInstructor
-        
         # Contar clases sin instructor
-        classes_with_instructor = set(
-            ClassInstructor.objects.values_list('class_obj_id', flat=True)
-        )
+        classes_with_instructor = set(problem['ci_class'].tolist())
         
         classes_without_instructor = [
             c for c in self.classes if c.id not in classes_with_instructor
@@ -106,16 +117,7 @@ class ScheduleGenerator:
         else:
             print(f"[OK] Todas las clases tienen instructor del XML")
         
-        # FILTRO 3: Aulas con capacidad suficiente para al menos una clase
-        all_rooms = list(Room.objects.all())
         min_class_limit = min((c.class_limit for c in self.classes), default=0)
-        
-        useful_rooms = [
-            room for room in all_rooms 
-            if room.capacity >= min_class_limit
-        ]
-        
-        self.rooms = useful_rooms
         print(f"[OK] Aulas útiles: {len(self.rooms)} (capacidad >= {min_class_limit})")
         
         if len(all_rooms) > len(self.rooms):
@@ -130,7 +132,7 @@ class ScheduleGenerator:
             raise ValueError("[ERROR] No hay aulas disponibles con capacidad suficiente")
         
         # Cargar datos en el validador
-        self.validator.load_data(self.classes, self.rooms)
+        self.validator.load_data(self.classes, self.rooms, problem)
         
         print(f"\n[GOAL] DATASET OPTIMIZADO:")
         print(f"   • Clases a programar: {len(self.classes)}")
@@ -179,7 +181,7 @@ class ScheduleGenerator:
         for course_key, course_classes in classes_by_course.items():
             # Obtener nombre del curso
             if isinstance(course_key, int):
-                course = course_classes[0].offering
+                course = Course.objects.filter(pk=course_key).first()
                 course_name = course.name if course and course.name else course.code if course and course.code else f"Course_{course_key}"
             else:
                 course_name = "Sin_Curso"
@@ -202,8 +204,9 @@ class ScheduleGenerator:
             # Asignar instructor sintético a todas las clases del curso
             for class_obj in course_classes:
                 ClassInstructor.objects.get_or_create(
-                    class_obj=class_obj,
-                    instructor=instructor
+                    class_obj_id=class_obj.id,
+                    instructor=instructor,
+                    defaults={'source': ClassInstructor.SOURCE_ASSIGNED}
                 )
         
         print(f"[OK] {synthetic_count} instructores sintéticos creados")
@@ -211,7 +214,7 @@ class ScheduleGenerator:
         
         return synthetic_count
     
-    def _create_default_timeslots(self, class_obj: Class) -> List[TimeSlot]:
+    def _create_default_timeslots(self, class_obj: SolverClass) -> List[SolverTimeSlot]:
         """Crea slots de tiempo por defecto para una clase"""
         default_slots = []
         
@@ -224,9 +227,10 @@ class ScheduleGenerator:
         
         for days in days_patterns:
             for start in start_times:
-                # Crear TimeSlot temporal (no guardado en DB)
-                ts = TimeSlot(
-                    class_obj=class_obj,
+                # Crear slot temporal (no guardado en DB)
+                ts = SolverTimeSlot(
+                    id=None,
+                    class_obj_id=class_obj.id,
                     days=days,
                     start_time=start,
                     length=12,  # 1 hora por defecto
@@ -238,7 +242,12 @@ class ScheduleGenerator:
     
     def generate(self, schedule_name: str = None, 
                 description: str = "", 
-                use_heuristics: bool = True) -> Schedule:
+                use_heuristics: bool = True,
+                compact: bool = False,
+                warm_start: Optional[Schedule] = None,
+                should_stop: Optional[Callable[[], bool]] = None,
+                on_progress: Optional[Callable[[Dict], None]] = None,
+                is_cancelled: Optional[Callable[[], bool]] = None) -> Schedule:
         """
         Genera un horario optimizado usando el algoritmo genético.
         
@@ -246,6 +255,19 @@ class ScheduleGenerator:
             schedule_name: Nombre del horario
             description: Descripción del horario
             use_heuristics: Si usar heurísticas para mejorar convergencia (recomendado para >300 clases)
+            compact: Guardar la solución como genoma binario sin filas de asignación
+                     (se materializan al activar o abrir el horario)
+            warm_start: Horario existente cuya solución se inyecta en la población inicial
+            should_stop: callback para detener la evolución antes de tiempo
+                         (se guarda el mejor individuo encontrado hasta entonces)
+            on_progress: callback que recibe los eventos de progreso de la
+                         evolución (ver solver/progress.py)
+            is_cancelled: callback que se consulta antes de guardar el horario y
+                          antes de asignar instructores; si devuelve True se
+                          descarta el horario y se lanza GenerationCancelled
+
+        Raises:
+            GenerationCancelled: si is_cancelled() devuelve True
         """
 
         if not self.classes or not self.rooms:
@@ -276,7 +298,8 @@ class ScheduleGenerator:
                     classes=self.classes,
                     rooms=self.rooms,
                     time_slots_by_class=self.time_slots_by_class,
-                    size=self.ga.population_size
+                    size=self.ga.population_size,
+                    class_instructors=self.class_instructors
                 )
                 self.ga.population = population
                 print("[OK] Población híbrida creada exitosamente")
@@ -288,19 +311,27 @@ class ScheduleGenerator:
                 self.ga.initialize_population(
                     self.classes,
                     self.rooms,
-                    self.time_slots_by_class
+                    self.time_slots_by_class,
+                    self.class_instructors
                 )
         else:
             # Población random tradicional
             self.ga.initialize_population(
                 self.classes,
                 self.rooms,
-                self.time_slots_by_class
+                self.time_slots_by_class,
+                self.class_instructors
             )
         
+        if warm_start is not None:
+            self.ga.population[-1] = self.load_individual(warm_start)
+            print(f"[INFO] Población inicial con warm start del horario {warm_start.id}")
+        
         # Ejecutar algoritmo genético
         print("[INFO] Ejecutando evolución...")
-        best_solution = self.ga.evolve(self.validator)
+        best_solution = self.ga.evolve(
+            self.validator, should_stop=should_stop, on_progress=on_progress
+        )
         
         # Obtener estadísticas
         stats = self.ga.get_statistics()
@@ -311,14 +342,27 @@ class ScheduleGenerator:
         print(f"[OK] Mejora total: {stats['improvement']:.2f}")
         sys.stdout.flush()
         
+        if is_cancelled is not None and is_cancelled():
+            raise GenerationCancelled()
+        
         # Guardar solución en la base de datos
         schedule = self._save_schedule(
             best_solution,
             schedule_name or f"Horario Generado {timezone.now().strftime('%Y-%m-%d %H:%M')}",
             description,
-            stats
+            stats,
+            compact=compact
         )
         
+        if is_cancelled is not None and is_cancelled():
+            schedule.delete()
+            raise GenerationCancelled()
+        
+        if compact:
+            print(f"[INFO] Horario compacto: los instructores se asignarán al activarlo")
+            refresh_dashboard()
+            return schedule
+        
         # NUEVA FASE: Asignar instructores después de generar el horario
         print(f"\n[INFO] Iniciando asignación de instructores...")
         try:
@@ -340,66 +384,38 @@ class ScheduleGenerator:
             print(f"[WARNING] Error al asignar instructores: {e}")
             print(f"[INFO] Puedes asignarlos manualmente después")
         
+        refresh_dashboard()
         return schedule
     
     @transaction.atomic
-    def _save_schedule(self, solution: Individual, name: str, description: str, stats: Dict) -> Schedule:
+    def _save_schedule(self, solution: Individual, name: str, description: str, stats: Dict,
+                       compact: bool = False) -> Schedule:
         """
         Guarda la solución en la base de datos como un Schedule.
-        """
-        # Crear el registro de Schedule
-        schedule = Schedule.objects.create(
-            name=name,
-            description=description,
-            fitness_score=solution.fitness,
-            is_active=False
-        )
         
-        # Crear las asignaciones
-        for class_id, (room_id, timeslot_id) in solution.genes.items():
-            try:
-                class_obj = Class.objects.get(id=class_id)
-                room = Room.objects.get(id=room_id) if room_id else None
-                
-                # Obtener o crear el TimeSlot
-                if timeslot_id:
-                    try:
-                        time_slot = TimeSlot.objects.get(id=timeslot_id)
-                    except TimeSlot.DoesNotExist:
-                        # Si el timeslot no existe en DB (era temporal), crearlo
-                        temp_slots = self.time_slots_by_class.get(class_id, [])
-                        matching_slot = next((ts for ts in temp_slots 
-                                            if hasattr(ts, 'id') and ts.id == timeslot_id), None)
-                        
-                        if not matching_slot:
-                            # Buscar por índice
-                            idx = timeslot_id % len(temp_slots) if temp_slots else 0
-                            matching_slot = temp_slots[idx] if temp_slots else None
-                        
-                        if matching_slot and not matching_slot.id:
-                            matching_slot.save()
-                            time_slot = matching_slot
-                        else:
-                            continue
-                else:
-                    continue
-                
-                # Crear la asignación
-                if room and time_slot:
-                    ScheduleAssignment.objects.create(
-                        schedule=schedule,
-                        class_obj=class_obj,
-                        room=room,
-                        time_slot=time_slot
-                    )
-            except Exception as e:
-                print(f"Error al guardar asignación para clase {class_id}: {e}")
-                continue
+        Los ids de clase, aula y timeslot se resuelven contra los datos ya
+        cargados en memoria (sin consultas por gen) y las asignaciones se
+        insertan con bulk_create por lotes. Con compact=True sólo se guarda
+        el genoma binario y las filas se crean al materializar el horario.
+        """
+        start = time.perf_counter()
+        
+        # Índices en memoria del problema cargado
+        class_ids = {c.id for c in self.classes}
+        room_ids = {r.id for r in self.rooms}
+        slot_ids = {
+            ts.id
+            for slots in self.time_slots_by_class.values()
+            for ts in slots
+            if ts.id
+        }
         
-        # Actualizar descripción con estadísticas
+        # El reporte de conflictos se calcula sobre la solución en memoria
         conflicts_report = self.validator.get_conflicts_report(solution)
         
-        schedule.description = f"""{description}
+        schedule = Schedule.objects.create(
+            name=name,
+            description=f"""{description}
             Estadísticas de Generación:
             - Fitness Final: {stats['best_fitness']:.2f}
             - Generaciones: {stats['generations']}
@@ -410,14 +426,86 @@ class ScheduleGenerator:
             - Aulas: {conflicts_report['hard_constraints']['room_conflicts']}
             - Estudiantes: {conflicts_report['hard_constraints']['student_conflicts']}
             - Capacidad: {conflicts_report['hard_constraints']['capacity_violations']}
-            """
-        schedule.save()
+            """,
+            fitness_score=solution.fitness,
+            is_active=False
+        )
+        
+        # Filtrar genes válidos
+        valid_genes = {}
+        skipped = 0
+        for class_id, (room_id, timeslot_id) in solution.genes.items():
+            if class_id in class_ids and room_id in room_ids and timeslot_id in slot_ids:
+                valid_genes[class_id] = (room_id, timeslot_id)
+            else:
+                skipped += 1
+        
+        if compact:
+            schedule.genome, schedule.genome_manifest = pack_genes(valid_genes)
+            schedule.is_materialized = False
+            schedule.save(update_fields=['genome', 'genome_manifest', 'is_materialized'])
+        else:
+            ScheduleAssignment.objects.bulk_create(
+                [
+                    ScheduleAssignment(
+                        schedule=schedule,
+                        class_obj_id=class_id,
+                        room_id=room_id,
+                        time_slot_id=timeslot_id
+                    )
+                    for class_id, (room_id, timeslot_id) in valid_genes.items()
+                ],
+                batch_size=self.SAVE_BATCH_SIZE
+            )
         
-        print(f"Horario guardado con ID: {schedule.id}")
-        print(f"Total de asignaciones: {schedule.assignments.count()}")
+        elapsed = time.perf_counter() - start
+        print(f"Horario guardado con ID: {schedule.id}{' (compacto)' if compact else ''}")
+        print(f"Total de asignaciones: {len(valid_genes)} ({elapsed*1000:.1f} ms)")
+        if skipped:
+            print(f"[WARNING] {skipped} genes sin aula o timeslot válido no se guardaron")
         
         return schedule
     
+    def load_individual(self, schedule: Schedule) -> Individual:
+        """
+        Convierte la solución guardada de un horario (genoma compacto o filas)
+        en un Individual sobre los datos cargados, para warm starts y
+        comparaciones. Las clases que falten o cuyo gen ya no sea válido se
+        completan con la inicialización aleatoria.
+        """
+        genes = genes_from_schedule(schedule)
+        
+        room_ids = {r.id for r in self.rooms}
+        individual = Individual(self.classes, self.rooms, self.time_slots_by_class, self.class_instructors)
+        
+        valid = {}
+        for class_obj in self.classes:
+            gene = genes.get(class_obj.id)
+            if not gene:
+                continue
+            slot_ids = {ts.id for ts in self.time_slots_by_class.get(class_obj.id, [])}
+            if gene[0] in room_ids and gene[1] in slot_ids:
+                valid[class_obj.id] = gene
+        
+        if len(valid) < len(self.classes):
+            individual.initialize_random()
+        individual.genes.update(valid)
+        
+        print(f"[OK] Solución del horario {schedule.id} cargada: {len(valid)}/{len(self.classes)} genes válidos")
+        return individual
+    
+    def evaluate_schedule(self, schedule: Schedule) -> float:
+        """
+        Calcula el fitness de un horario guardado (por ejemplo una solución de
+        referencia importada) con el mismo validador que usa el GA y lo guarda
+        en fitness_score. Requiere load_data().
+        """
+        individual = self.load_individual(schedule)
+        fitness = individual.calculate_fitness(self.validator)
+        Schedule.objects.filter(pk=schedule.pk).update(fitness_score=fitness)
+        schedule.fitness_score = fitness
+        return fitness
+
     def get_schedule_summary(self, schedule: Schedule) -> Dict:
         """ Genera un resumen del horario generado """
         assignments = ScheduleAssignment.objects.filter(
@@ -2,21 +2,34 @@ from rest_framework import serializers
 from .models import (
     Room, Instructor, Course, Class, ClassInstructor,
     ClassRoom, TimeSlot, Student, StudentClass,
-    Schedule, ScheduleAssignment
+    Schedule, ScheduleAssignment, GenerationJob
 )
+from .pagination import SparseFieldsMixin
+from .solution_storage import assignment_count
+
+
+def annotated_count(obj, name, related_manager):
+    """
+    Conteo anotado por el queryset (annotate(Count(...)) en los ViewSets);
+    si el objeto no viene anotado se consulta la relación.
+    """
+    value = getattr(obj, name, None)
+    if value is None:
+        value = related_manager.count()
+    return value
 
 
 class RoomSerializer(serializers.ModelSerializer):
     class Meta:
         model = Room
-        fields = '__all__'
+        exclude = ['xml_hash']  # Huella interna de la importación incremental
 
 
 class InstructorSerializer(serializers.ModelSerializer):
     class_count = serializers.SerializerMethodField()
     
     def get_class_count(self, obj):
-        return obj.classes.count()
+        return annotated_count(obj, 'class_count', obj.classes)
     
     class Meta:
         model = Instructor
@@ -27,14 +40,14 @@ class CourseSerializer(serializers.ModelSerializer):
     class_count = serializers.SerializerMethodField()
     
     def get_class_count(self, obj):
-        return obj.classes.count()
+        return annotated_count(obj, 'class_count', obj.classes)
     
     class Meta:
         model = Course
         fields = '__all__'
 
 
-class TimeSlotSerializer(serializers.ModelSerializer):
+class TimeSlotSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     day_names = serializers.SerializerMethodField()
     start_time_formatted = serializers.SerializerMethodField()
     end_time_formatted = serializers.SerializerMethodField()
@@ -53,7 +66,7 @@ class TimeSlotSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ClassInstructorSerializer(serializers.ModelSerializer):
+class ClassInstructorSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     instructor_name = serializers.CharField(source='instructor.name', read_only=True)
     
     class Meta:
@@ -77,19 +90,20 @@ class ClassSerializer(serializers.ModelSerializer):
     student_count = serializers.SerializerMethodField()
     
     def get_student_count(self, obj):
-        return obj.enrolled_students.count()
+        return annotated_count(obj, 'student_count', obj.enrolled_students)
     
     class Meta:
         model = Class
-        fields = '__all__'
+        exclude = ['xml_hash']
 
 
-class ClassListSerializer(serializers.ModelSerializer):
+class ClassListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer simplificado para listados"""
     offering_name = serializers.CharField(source='offering.name', read_only=True)
     instructor_names = serializers.SerializerMethodField()
     
     def get_instructor_names(self, obj):
+        # Usa el prefetch 'instructors__instructor' si el queryset lo trae
         return [ci.instructor.name for ci in obj.instructors.all()]
     
     class Meta:
@@ -97,18 +111,18 @@ class ClassListSerializer(serializers.ModelSerializer):
         fields = ['id', 'xml_id', 'class_limit', 'offering_name', 'instructor_names']
 
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     enrolled_classes_count = serializers.SerializerMethodField()
     
     def get_enrolled_classes_count(self, obj):
-        return obj.enrolled_classes.count()
+        return annotated_count(obj, 'enrolled_classes_count', obj.enrolled_classes)
     
     class Meta:
         model = Student
-        fields = '__all__'
+        exclude = ['xml_hash']
 
 
-class StudentClassSerializer(serializers.ModelSerializer):
+class StudentClassSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     student_name = serializers.CharField(source='student.name', read_only=True)
     class_info = serializers.CharField(source='class_obj.__str__', read_only=True)
     
@@ -132,11 +146,11 @@ class ScheduleSerializer(serializers.ModelSerializer):
     assignment_count = serializers.SerializerMethodField()
     
     def get_assignment_count(self, obj):
-        return obj.assignments.count()
+        return assignment_count(obj)
     
     class Meta:
         model = Schedule
-        fields = '__all__'
+        exclude = ['genome']
 
 
 class ScheduleListSerializer(serializers.ModelSerializer):
@@ -144,9 +158,18 @@ class ScheduleListSerializer(serializers.ModelSerializer):
     assignment_count = serializers.SerializerMethodField()
     
     def get_assignment_count(self, obj):
-        return obj.assignments.count()
+        return assignment_count(obj)
     
     class Meta:
         model = Schedule
         fields = ['id', 'name', 'description', 'fitness_score', 'is_active', 
-                  'created_at', 'updated_at', 'assignment_count']
+                  'is_materialized', 'created_at', 'updated_at', 'assignment_count']
+
+
+class GenerationJobSerializer(serializers.ModelSerializer):
+    """Estado de un trabajo de generación en segundo plano"""
+    class Meta:
+        model = GenerationJob
+        fields = ['id', 'name', 'status', 'params', 'time_budget', 'cancel_requested',
+                  'schedule', 'progress', 'result', 'error', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
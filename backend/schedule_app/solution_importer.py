@@ -0,0 +1,171 @@
+"""
+Importador de soluciones XML (formato UniTime/Purdue) como Schedule.
+
+Los archivos de solución repiten el problema completo y marcan con
+solution="true" el aula y el horario elegidos de cada clase. Sólo se recorre
+la sección <classes> con iterparse (el resto del documento no se lee) y cada
+horario elegido se resuelve contra los TimeSlot existentes con un índice en
+memoria (clase, días, inicio, duración) construido en una sola consulta.
+
+Uso:
+    from schedule_app.solution_importer import SolutionImporter
+
+    schedule = SolutionImporter().run('pu-spr07-sa-cs_commited_solution.xml',
+                                      name='Solución de referencia')
+"""
+
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Optional, Tuple
+
+from django.db import transaction
+
+from .models import Class, Room, TimeSlot, Schedule, ScheduleAssignment
+from .solution_storage import pack_genes
+from .dashboard_snapshot import refresh_dashboard
+
+
+class SolutionImporter:
+    """
+    Convierte la solución de un XML en un Schedule con sus asignaciones.
+
+    Las clases, aulas y timeslots deben existir (importados antes desde el XML
+    de entrada); las clases de la solución que no se encuentran se cuentan en
+    las estadísticas y se omiten.
+    """
+
+    DEFAULT_BATCH_SIZE = 1000
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.stats = {
+            'classes': 0,
+            'assigned': 0,
+            'unknown_class': 0,
+            'no_room': 0,
+            'no_time': 0,
+            'unknown_time': 0
+        }
+
+        self.class_map: Dict[int, int] = {}
+        self.room_map: Dict[int, int] = {}
+        # (class_pk, days, start, length) -> time_slot_pk
+        self.slot_index: Dict[Tuple[int, str, int, int], int] = {}
+
+    def _load_indexes(self):
+        self.class_map = dict(Class.objects.values_list('xml_id', 'id'))
+        self.room_map = dict(Room.objects.values_list('xml_id', 'id'))
+        for pk, class_pk, days, start, length in TimeSlot.objects.values_list(
+            'id', 'class_obj_id', 'days', 'start_time', 'length'
+        ):
+            # Si hay duplicados se conserva el primero
+            self.slot_index.setdefault((class_pk, days, start, length), pk)
+
+    def read_genes(self, source) -> Dict[int, Tuple[int, int]]:
+        """
+        Lee la solución como genes {class_pk: (room_pk, time_slot_pk)}.
+        """
+        if not self.class_map:
+            self._load_indexes()
+
+        genes = {}
+        depth = 0
+        in_classes = False
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == 2 and elem.tag == 'classes':
+                    in_classes = True
+                continue
+
+            depth -= 1
+            if depth == 1:
+                if in_classes:
+                    # Lo que sigue (restricciones, estudiantes) no hace falta
+                    break
+                elem.clear()
+            elif depth == 2 and in_classes and elem.tag == 'class':
+                gene = self._parse_class(elem)
+                if gene:
+                    genes[gene[0]] = gene[1]
+                elem.clear()
+
+        return genes
+
+    def _parse_class(self, elem) -> Optional[Tuple[int, Tuple[int, int]]]:
+        self.stats['classes'] += 1
+
+        class_pk = self.class_map.get(int(elem.get('id')))
+        if class_pk is None:
+            self.stats['unknown_class'] += 1
+            return None
+
+        room = next((e for e in elem.iterfind('room') if e.get('solution') == 'true'), None)
+        room_pk = self.room_map.get(int(room.get('id'))) if room is not None else None
+        if room_pk is None:
+            self.stats['no_room'] += 1
+            return None
+
+        chosen = next((e for e in elem.iterfind('time') if e.get('solution') == 'true'), None)
+        if chosen is None:
+            self.stats['no_time'] += 1
+            return None
+
+        key = (class_pk, chosen.get('days', '0000000'), int(chosen.get('start', 0)), int(chosen.get('length', 0)))
+        slot_pk = self.slot_index.get(key)
+        if slot_pk is None:
+            self.stats['unknown_time'] += 1
+            return None
+
+        self.stats['assigned'] += 1
+        return class_pk, (room_pk, slot_pk)
+
+    @transaction.atomic
+    def run(self, source, name: str, description: str = "", compact: bool = False) -> Schedule:
+        """
+        Importa la solución y crea el Schedule.
+
+        Args:
+            source: ruta u objeto archivo del XML de solución
+            name: nombre del horario
+            description: descripción adicional
+            compact: guardar como genoma binario sin filas de asignación
+        """
+        start = time.perf_counter()
+        genes = self.read_genes(source)
+
+        schedule = Schedule.objects.create(
+            name=name,
+            description=f"""{description}
+            Importado desde XML de solución:
+            - Clases en la solución: {self.stats['classes']}
+            - Asignaciones importadas: {self.stats['assigned']}
+            - Clases omitidas: {self.stats['classes'] - self.stats['assigned']}
+            """,
+            is_active=False
+        )
+
+        if compact:
+            schedule.genome, schedule.genome_manifest = pack_genes(genes)
+            schedule.is_materialized = False
+            schedule.save(update_fields=['genome', 'genome_manifest', 'is_materialized'])
+        else:
+            ScheduleAssignment.objects.bulk_create(
+                [
+                    ScheduleAssignment(
+                        schedule=schedule,
+                        class_obj_id=class_pk,
+                        room_id=room_pk,
+                        time_slot_id=slot_pk
+                    )
+                    for class_pk, (room_pk, slot_pk) in genes.items()
+                ],
+                batch_size=self.batch_size
+            )
+
+        refresh_dashboard()
+
+        self.stats['elapsed'] = round(time.perf_counter() - start, 3)
+        print(f"[OK] Solución importada como horario {schedule.id}: "
+              f"{self.stats['assigned']}/{self.stats['classes']} clases ({self.stats['elapsed']}s)")
+        return schedule
@@ -0,0 +1,192 @@
+"""
+Almacenamiento compacto de soluciones en Schedule.
+
+En lugar de una fila ScheduleAssignment por clase, el genoma se guarda como un
+blob de enteros int32 (little-endian) con tripletas
+(class_id, room_id, time_slot_id) y un manifiesto JSON que describe el formato.
+Las filas se materializan sólo cuando el horario se activa o se abre en una
+vista basada en filas.
+
+Uso:
+    from schedule_app.solution_storage import pack_genes, ensure_materialized
+
+    blob, manifest = pack_genes(individual.genes)
+    ensure_materialized(schedule)   # crea las filas si aún no existen
+"""
+
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Schedule, ScheduleAssignment
+
+
+GENOME_FORMAT_VERSION = 1
+GENOME_DTYPE = '<i4'
+GENOME_COLUMNS = ['class_id', 'room_id', 'time_slot_id']
+MATERIALIZE_BATCH_SIZE = 500
+
+
+def pack_genes(genes: Dict[int, Tuple[int, int]]) -> Tuple[bytes, Dict]:
+    """
+    Empaqueta los genes {class_id: (room_id, timeslot_id)} en un blob int32.
+    Los genes sin aula o timeslot se omiten. Las filas quedan ordenadas por
+    class_id para poder comparar genomas directamente.
+
+    Returns:
+        (blob, manifest)
+    """
+    rows = sorted(
+        (class_id, room_id, timeslot_id)
+        for class_id, (room_id, timeslot_id) in genes.items()
+        if room_id and timeslot_id
+    )
+    array = np.array(rows, dtype=GENOME_DTYPE).reshape(-1, len(GENOME_COLUMNS))
+
+    manifest = {
+        'version': GENOME_FORMAT_VERSION,
+        'dtype': GENOME_DTYPE,
+        'columns': GENOME_COLUMNS,
+        'count': int(array.shape[0])
+    }
+    return array.tobytes(), manifest
+
+
+def unpack_genome(schedule: Schedule) -> np.ndarray:
+    """
+    Devuelve el genoma como arreglo (n, 3) de (class_id, room_id, time_slot_id).
+
+    Si el horario no tiene blob (horarios guardados como filas), el arreglo se
+    arma desde ScheduleAssignment en una sola consulta.
+    """
+    if schedule.genome is not None:
+        manifest = schedule.genome_manifest or {}
+        if manifest.get('version') != GENOME_FORMAT_VERSION:
+            raise ValueError(f"Formato de genoma no soportado: {manifest.get('version')}")
+        array = np.frombuffer(bytes(schedule.genome), dtype=manifest['dtype'])
+        return array.reshape(-1, len(manifest['columns']))
+
+    rows = ScheduleAssignment.objects.filter(schedule=schedule).order_by('class_obj_id').values_list(
+        'class_obj_id', 'room_id', 'time_slot_id'
+    )
+    return np.array(list(rows), dtype=GENOME_DTYPE).reshape(-1, len(GENOME_COLUMNS))
+
+
+def genes_from_schedule(schedule: Schedule) -> Dict[int, Tuple[int, int]]:
+    """Reconstruye el diccionario de genes {class_id: (room_id, timeslot_id)}"""
+    array = unpack_genome(schedule)
+    return {
+        int(class_id): (int(room_id), int(timeslot_id))
+        for class_id, room_id, timeslot_id in array
+    }
+
+
+def compare_schedules(schedule_a: Schedule, schedule_b: Schedule) -> Dict:
+    """
+    Compara dos horarios clase por clase sin materializar filas.
+
+    Returns:
+        Dict con clases en común y cuántas cambian de aula, de horario o de ambos
+    """
+    a = unpack_genome(schedule_a)
+    b = unpack_genome(schedule_b)
+
+    common, idx_a, idx_b = np.intersect1d(a[:, 0], b[:, 0], return_indices=True)
+    room_changed = a[idx_a, 1] != b[idx_b, 1]
+    time_changed = a[idx_a, 2] != b[idx_b, 2]
+
+    return {
+        'common_classes': int(common.size),
+        'only_in_a': int(a.shape[0] - common.size),
+        'only_in_b': int(b.shape[0] - common.size),
+        'room_changes': int(np.count_nonzero(room_changed & ~time_changed)),
+        'time_changes': int(np.count_nonzero(time_changed & ~room_changed)),
+        'both_changed': int(np.count_nonzero(room_changed & time_changed)),
+        'identical': int(np.count_nonzero(~room_changed & ~time_changed))
+    }
+
+
+def ensure_materialized(schedule: Schedule) -> bool:
+    """
+    Crea las filas ScheduleAssignment de un horario compacto si aún no existen.
+
+    Returns:
+        True si se materializaron filas en esta llamada
+    """
+    if schedule.is_materialized:
+        return False
+
+    with transaction.atomic():
+        # Bloquear la fila para que dos peticiones no materialicen a la vez
+        locked = Schedule.objects.select_for_update().get(pk=schedule.pk)
+        if locked.is_materialized:
+            schedule.is_materialized = True
+            return False
+
+        array = unpack_genome(locked)
+        ScheduleAssignment.objects.bulk_create(
+            [
+                ScheduleAssignment(
+                    schedule_id=schedule.pk,
+                    class_obj_id=int(class_id),
+                    room_id=int(room_id),
+                    time_slot_id=int(timeslot_id)
+                )
+                for class_id, room_id, timeslot_id in array
+            ],
+            batch_size=MATERIALIZE_BATCH_SIZE
+        )
+        Schedule.objects.filter(pk=schedule.pk).update(is_materialized=True, updated_at=timezone.now())
+
+    schedule.is_materialized = True
+    print(f"[OK] Horario {schedule.pk} materializado: {array.shape[0]} asignaciones")
+    return True
+
+
+def prune_genomes(class_ids: Iterable[int], room_ids: Iterable[int],
+                  time_slot_ids: Iterable[int]) -> int:
+    """
+    Quita de los genomas sin materializar las filas que apuntan a clases,
+    aulas o timeslots borrados (las filas materializadas se van en cascada).
+
+    Returns:
+        Número de horarios modificados
+    """
+    columns = [np.fromiter(ids, dtype=GENOME_DTYPE) for ids in (class_ids, room_ids, time_slot_ids)]
+    pruned = []
+    for schedule in Schedule.objects.filter(is_materialized=False, genome__isnull=False):
+        array = unpack_genome(schedule)
+        keep = np.ones(array.shape[0], dtype=bool)
+        for col, ids in enumerate(columns):
+            if ids.size:
+                keep &= ~np.isin(array[:, col], ids)
+        if keep.all():
+            continue
+        array = array[keep]
+        schedule.genome = array.tobytes()
+        schedule.genome_manifest = {**schedule.genome_manifest, 'count': int(array.shape[0])}
+        pruned.append(schedule)
+
+    Schedule.objects.bulk_update(pruned, ['genome', 'genome_manifest'])
+    return len(pruned)
+
+
+def assignment_count(schedule: Schedule) -> int:
+    """
+    Número de asignaciones sin materializar filas. Usa la anotación
+    assignment_count del queryset (with_assignment_count) si existe.
+    """
+    if not schedule.is_materialized and schedule.genome_manifest:
+        return schedule.genome_manifest['count']
+    rows = getattr(schedule, 'assignment_count', None)
+    if rows is not None:
+        return rows
+    return schedule.assignments.count()
+
+
+def with_assignment_count(queryset):
+    """Anota el número de filas de asignación (evita un COUNT por horario)"""
+    return queryset.annotate(assignment_count=Count('assignments'))
@@ -0,0 +1,27 @@
+"""
+Núcleo del generador de horarios, independiente de Django.
+
+Sólo depende de NumPy y la biblioteca estándar: recibe un Problem (arreglos
+y dataclasses, ver problem.py) y devuelve los genes del mejor individuo
+({class_id: (room_id, timeslot_id)}). Ningún módulo de este paquete debe
+importar Django ni schedule_app.models; la construcción del problema desde
+la base de datos y la persistencia del resultado viven en el adaptador
+(problem_snapshot.py y schedule_generator.py).
+
+Uso:
+    problem = Problem.load(path)
+    classes, rooms, time_slots_by_class = problem.entities()
+
+    validator = ConstraintValidator()
+    validator.load_data(classes, rooms, problem)
+
+    ga = GeneticAlgorithm(population_size=50, generations=100)
+    ga.initialize_population(classes, rooms, time_slots_by_class, problem.class_instructors())
+    best = ga.evolve(validator)
+"""
+
+from .problem import Problem, SolverClass, SolverRoom, SolverTimeSlot, PROBLEM_ARRAYS, schedulable
+from .progress import ProgressBus, print_progress
+from .constraints import ConstraintValidator
+from .genetic_algorithm import GeneticAlgorithm, Individual
+from .heuristics import ScheduleHeuristics
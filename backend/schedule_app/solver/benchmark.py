@@ -0,0 +1,228 @@
+"""
+Benchmark reproducible del solver (sin Django ni base de datos).
+
+Cada escenario es una combinación dataset × población × generaciones × modo
+× workers. Una repetición lanza `workers` ejecuciones simultáneas, cada una
+en su propio proceso (como los trabajos de generación, ver jobs.py) sobre un
+Problem guardado en disco, con random y NumPy sembrados: la misma semilla
+produce el mismo fitness. Por ejecución se mide:
+
+- wall: tiempo total de la ejecución (segundos)
+- phases: load (abrir el Problem y preprocesarlo), validator (load_data),
+  init (población inicial) y evolve
+- evaluations / evals_per_second: evaluaciones de fitness durante evolve
+- peak_rss_mb: memoria residente máxima del proceso (None si la plataforma
+  no tiene el módulo resource)
+- fitness y hard_violations del mejor individuo, generations_run
+
+Modos:
+- random:    GeneticAlgorithm.initialize_population
+- heuristic: ScheduleHeuristics.initialize_hybrid_population
+
+Lo usa `python manage.py benchmark_solver`, que prepara los datasets y
+guarda/compara los resultados.
+"""
+
+import contextlib
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .constraints import ConstraintValidator
+from .genetic_algorithm import GeneticAlgorithm
+from .heuristics import ScheduleHeuristics
+from .problem import Problem, schedulable
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+MODES = ('random', 'heuristic')
+SCENARIO_KEYS = ('dataset', 'population', 'generations', 'mode', 'workers')
+PHASES = ('load', 'validator', 'init', 'evolve')
+
+# Parámetros por defecto de generate_schedule / ScheduleGenerator
+DEFAULT_PARAMS = {
+    'mutation_rate': 0.1,
+    'crossover_rate': 0.8,
+    'elitism_size': 5,
+    'tournament_size': 5,
+    'hard_weight': 100.0,
+    'soft_weight': 1.0,
+}
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Memoria residente máxima del proceso actual en MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_once(problem_path: str, population: int, generations: int, mode: str,
+             seed: int, params: Optional[Dict] = None) -> Dict:
+    """Una ejecución completa del solver con semilla fija (sin salida por consola)"""
+    params = dict(DEFAULT_PARAMS, **(params or {}))
+    random.seed(seed)
+    np.random.seed(seed)
+    phases = {}
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        problem = Problem.load(problem_path)
+        classes, rooms, time_slots_by_class = schedulable(*problem.entities())
+        class_instructors = problem.class_instructors()
+        phases['load'] = time.perf_counter() - start
+
+        begin = time.perf_counter()
+        validator = ConstraintValidator(
+            hard_constraint_weight=params['hard_weight'],
+            soft_constraint_weight=params['soft_weight']
+        )
+        validator.load_data(classes, rooms, problem)
+        phases['validator'] = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        ga = GeneticAlgorithm(
+            population_size=population,
+            generations=generations,
+            mutation_rate=params['mutation_rate'],
+            crossover_rate=params['crossover_rate'],
+            elitism_size=params['elitism_size'],
+            tournament_size=params['tournament_size']
+        )
+        if mode == 'heuristic':
+            ga.population = ScheduleHeuristics().initialize_hybrid_population(
+                classes, rooms, time_slots_by_class, population, class_instructors
+            )
+        else:
+            ga.initialize_population(classes, rooms, time_slots_by_class, class_instructors)
+        phases['init'] = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        best = ga.evolve(validator)
+        phases['evolve'] = time.perf_counter() - begin
+        wall = time.perf_counter() - start
+
+        hard_violations = validator.count_hard_violations(best)
+
+    return {
+        'seed': seed,
+        'wall': wall,
+        'phases': phases,
+        'evaluations': ga.evaluations,
+        'evals_per_second': ga.evaluations / phases['evolve'] if phases['evolve'] > 0 else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'fitness': best.fitness,
+        'hard_violations': hard_violations,
+        'generations_run': ga.generations_run,
+    }
+
+
+def _run_task(task: Tuple) -> Dict:
+    return run_once(*task)
+
+
+def run_scenario(scenario: Dict, problem_path: str, seed: int, repeat: int,
+                 params: Optional[Dict] = None) -> List[Dict]:
+    """
+    Ejecuta un escenario `repeat` veces. En cada repetición corren
+    scenario['workers'] procesos a la vez (uno por ejecución, sin reutilizar
+    procesos para que peak_rss_mb sea de esa ejecución).
+    """
+    context = multiprocessing.get_context('spawn')
+    workers = scenario['workers']
+    runs = []
+    for repetition in range(repeat):
+        tasks = [
+            (problem_path, scenario['population'], scenario['generations'], scenario['mode'],
+             seed + repetition * workers + worker, params)
+            for worker in range(workers)
+        ]
+        with context.Pool(processes=workers, maxtasksperchild=1) as pool:
+            results = pool.map(_run_task, tasks, chunksize=1)
+        for worker, result in enumerate(results):
+            runs.append(dict(scenario, repetition=repetition, worker=worker, **result))
+    return runs
+
+
+def scenario_key(row: Dict) -> Tuple:
+    return tuple(row[key] for key in SCENARIO_KEYS)
+
+
+def summarize(runs: List[Dict]) -> List[Dict]:
+    """Medianas por escenario (fitness y violaciones también como mejor valor)"""
+    groups: Dict[Tuple, List[Dict]] = {}
+    for run in runs:
+        groups.setdefault(scenario_key(run), []).append(run)
+
+    summary = []
+    for key, group in groups.items():
+        rss = [run['peak_rss_mb'] for run in group if run['peak_rss_mb'] is not None]
+        row = dict(zip(SCENARIO_KEYS, key))
+        row.update({
+            'runs': len(group),
+            'wall': statistics.median(run['wall'] for run in group),
+            'wall_min': min(run['wall'] for run in group),
+            'evals_per_second': statistics.median(run['evals_per_second'] for run in group),
+            'phases': {
+                phase: statistics.median(run['phases'][phase] for run in group)
+                for phase in PHASES
+            },
+            'peak_rss_mb': max(rss) if rss else None,
+            'fitness': statistics.median(run['fitness'] for run in group),
+            'best_fitness': max(run['fitness'] for run in group),
+            'hard_violations': statistics.median(run['hard_violations'] for run in group),
+            'min_hard_violations': min(run['hard_violations'] for run in group),
+        })
+        summary.append(row)
+    return summary
+
+
+def compare(summary: List[Dict], baseline: List[Dict], tolerance: float = 0.10) -> List[Dict]:
+    """
+    Compara cada escenario con el mismo escenario de una línea base.
+    status: 'slower' si el tiempo sube o las evaluaciones/s bajan más que
+    tolerance, 'faster' en el caso contrario, 'same' dentro del margen y
+    'new' si el escenario no está en la línea base.
+    """
+    previous = {scenario_key(row): row for row in baseline}
+    comparison = []
+    for row in summary:
+        base = previous.get(scenario_key(row))
+        result = dict(zip(SCENARIO_KEYS, scenario_key(row)))
+        if base is None:
+            result['status'] = 'new'
+            comparison.append(result)
+            continue
+
+        wall_ratio = row['wall'] / base['wall'] if base['wall'] else float('inf')
+        eps_ratio = (row['evals_per_second'] / base['evals_per_second']
+                     if base['evals_per_second'] else float('inf'))
+        if wall_ratio > 1 + tolerance or eps_ratio < 1 - tolerance:
+            status = 'slower'
+        elif wall_ratio < 1 - tolerance or eps_ratio > 1 + tolerance:
+            status = 'faster'
+        else:
+            status = 'same'
+        result.update({
+            'status': status,
+            'wall': row['wall'],
+            'baseline_wall': base['wall'],
+            'wall_change': wall_ratio - 1,
+            'evals_per_second_change': eps_ratio - 1,
+            'fitness_change': row['fitness'] - base['fitness'],
+            'hard_violations_change': row['hard_violations'] - base['hard_violations'],
+        })
+        comparison.append(result)
+    return comparison
@@ -5,7 +5,8 @@ Define y evalúa restricciones duras (hard) y blandas (soft).
 
 from typing import List, Dict, Set, Tuple
 from collections import defaultdict
-from .models import Class, Room, TimeSlot, Instructor, ClassInstructor, GroupConstraint, GroupConstraintClass
+from .problem import Problem, SolverClass, SolverRoom
+from .intervals import count_overlaps
 import math
 
 
@@ -48,25 +49,26 @@ class ConstraintValidator:
         self.timeslot_cache: Dict[int, Tuple] = {}  # Caché de timeslots
         self.group_constraints: List[Dict] = []  # Restricciones de grupo (BTB, etc.)
     
-    def load_data(self, classes: List[Class], rooms: List[Room]):
-        """Carga y cachea los datos necesarios para las validaciones"""
-        from .models import ClassRoom, StudentClass
+    def load_data(self, classes: List[SolverClass], rooms: List[SolverRoom], problem: Problem):
+        """
+        Carga y cachea los datos necesarios para las validaciones.
+        problem: arreglos del problema (Problem, ver problem.py); desde Django
+        se obtiene con problem_snapshot.get_problem().
+        """
+        class_ids = [class_obj.id for class_obj in classes]
         
         # Cargar instructores por clase
-        for class_obj in classes:
-            instructors = ClassInstructor.objects.filter(
-                class_obj=class_obj
-            ).values_list('instructor_id', flat=True)
-            self.class_instructors[class_obj.id] = set(instructors)
+        self.class_instructors = {class_id: set() for class_id in class_ids}
+        for class_id, instructor_id in zip(problem['ci_class'].tolist(), problem['ci_instructor'].tolist()):
+            if class_id in self.class_instructors:
+                self.class_instructors[class_id].add(instructor_id)
         
         # Cargar estudiantes por clase (mismo offering = mismo grupo de estudiantes)
+        students_by_offering = problem.offering_students()
         for class_obj in classes:
             if class_obj.offering_id:
-                # Estudiantes del curso
-                students = StudentClass.objects.filter(
-                    class_obj__offering_id=class_obj.offering_id
-                ).values_list('student_id', flat=True)
-                self.class_students[class_obj.id] = set(students)
+                # Estudiantes del curso (un conjunto compartido por curso, sólo lectura)
+                self.class_students[class_obj.id] = students_by_offering.get(class_obj.offering_id, set())
             else:
                 self.class_students[class_obj.id] = set()
         
@@ -90,35 +92,34 @@ class ConstraintValidator:
             self.class_limits[class_obj.id] = class_obj.class_limit
         
         # Cargar preferencias de aula
-        for class_obj in classes:
-            prefs = ClassRoom.objects.filter(
-                class_obj=class_obj
-            ).values_list('room_id', 'preference')
-            self.room_preferences[class_obj.id] = dict(prefs)
+        self.room_preferences = {class_id: {} for class_id in class_ids}
+        for class_id, room_id, preference in zip(
+                problem['cr_class'].tolist(), problem['cr_room'].tolist(), problem['cr_preference'].tolist()):
+            if class_id in self.room_preferences:
+                self.room_preferences[class_id][room_id] = preference
         
         # Cargar preferencias de horario y cachear timeslots
-        all_timeslots = TimeSlot.objects.all()
-        for ts in all_timeslots:
-            self.timeslot_cache[ts.id] = (ts.days, ts.start_time, ts.length)
-        
-        for class_obj in classes:
-            time_slots = TimeSlot.objects.filter(
-                class_obj=class_obj
-            ).values_list('id', 'preference')
-            self.time_preferences[class_obj.id] = dict(time_slots)
+        self.time_preferences = {class_id: {} for class_id in class_ids}
+        for slot_id, class_id, days, start, length, preference in zip(
+                problem['slot_id'].tolist(), problem['slot_class'].tolist(), problem['slot_days'].tolist(),
+                problem['slot_start'].tolist(), problem['slot_length'].tolist(),
+                problem['slot_preference'].tolist()):
+            self.timeslot_cache[slot_id] = (days, start, length)
+            if class_id in self.time_preferences:
+                self.time_preferences[class_id][slot_id] = preference
         
         # Cargar group constraints
-        all_constraints = GroupConstraint.objects.all()
-        for constraint in all_constraints:
-            class_ids = GroupConstraintClass.objects.filter(
-                constraint=constraint
-            ).values_list('class_obj_id', flat=True)
-            
+        constraint_classes = defaultdict(list)
+        for constraint_id, class_id in zip(problem['gcc_constraint'].tolist(), problem['gcc_class'].tolist()):
+            constraint_classes[constraint_id].append(class_id)
+        
+        for constraint_id, constraint_type, preference in zip(
+                problem['gc_id'].tolist(), problem['gc_type'].tolist(), problem['gc_preference'].tolist()):
             self.group_constraints.append({
-                'id': constraint.id,
-                'type': constraint.constraint_type,
-                'preference': constraint.preference,
-                'classes': list(class_ids)
+                'id': constraint_id,
+                'type': constraint_type,
+                'preference': preference,
+                'classes': constraint_classes.get(constraint_id, [])
             })
     
     def evaluate(self, individual) -> float:
@@ -137,6 +138,10 @@ class ConstraintValidator:
         - BASE - 10000 = Bueno
         - < BASE - 20000 = Necesita mejoras
         """
+        return self.evaluate_with_violations(individual)[0]
+    
+    def evaluate_with_violations(self, individual) -> Tuple[float, int]:
+        """Fitness (ver evaluate) y número de violaciones duras, calculadas una sola vez"""
         hard_violations = self._evaluate_hard_constraints(individual)
         soft_violations = self._evaluate_soft_constraints(individual)
         
@@ -154,7 +159,11 @@ class ConstraintValidator:
         
         fitness = BASE_FITNESS - penalty
         
-        return fitness
+        return fitness, hard_violations
+    
+    def count_hard_violations(self, individual) -> int:
+        """Número de violaciones duras de un individuo (reportes de progreso)"""
+        return self._evaluate_hard_constraints(individual)
     
     def _evaluate_hard_constraints(self, individual) -> int:
         """
@@ -219,11 +228,8 @@ class ConstraintValidator:
         return timeslots_data
     
     def _check_instructor_conflicts(self, individual, time_slots_map) -> int:
-        """Verifica conflictos de horario para instructores (OPTIMIZADO)"""
-        conflicts = 0
-        instructor_schedules = defaultdict(list)
-        
-        # Agrupar clases por instructor
+        """Verifica conflictos de horario para instructores (barrido por instructor y día)"""
+        intervals = []
         for class_id, (room_id, timeslot_id) in individual.genes.items():
             instructors = self.class_instructors.get(class_id, set())
             
@@ -234,64 +240,26 @@ class ConstraintValidator:
             days, start, length = time_slots_map.get(class_id, (None, None, None))
             
             if days and start is not None and length:
-                class_info = {
-                    'class_id': class_id,
-                    'days': days,
-                    'start': start,
-                    'end': start + length
-                }
                 for instructor_id in instructors:
-                    instructor_schedules[instructor_id].append(class_info)
+                    intervals.append((instructor_id, days, start, start + length, class_id))
         
-        # Verificar solapamientos (optimizado: solo verificar si hay >1 clase)
-        for instructor_id, schedule in instructor_schedules.items():
-            if len(schedule) < 2:
-                continue  # Sin conflictos posibles
-            
-            # Verificar pares
-            for i in range(len(schedule)):
-                for j in range(i + 1, len(schedule)):
-                    if self._times_overlap(schedule[i], schedule[j]):
-                        conflicts += 1
-        
-        return conflicts
+        return count_overlaps(intervals)
     
     def _check_room_conflicts(self, individual, time_slots_map) -> int:
-        """Verifica conflictos de horario en aulas (OPTIMIZADO)"""
-        conflicts = 0
-        room_schedules = defaultdict(list)
-        
-        # Agrupar clases por aula
+        """Verifica conflictos de horario en aulas (barrido por aula y día)"""
+        intervals = []
         for class_id, (room_id, timeslot_id) in individual.genes.items():
             days, start, length = time_slots_map.get(class_id, (None, None, None))
             
             if room_id and days and start is not None and length:
-                room_schedules[room_id].append({
-                    'class_id': class_id,
-                    'days': days,
-                    'start': start,
-                    'end': start + length
-                })
-        
-        # Verificar solapamientos (optimizado: solo verificar si hay >1 clase)
-        for room_id, schedule in room_schedules.items():
-            if len(schedule) < 2:
-                continue  # Sin conflictos posibles
-            
-            # Verificar pares
-            for i in range(len(schedule)):
-                for j in range(i + 1, len(schedule)):
-                    if self._times_overlap(schedule[i], schedule[j]):
-                        conflicts += 1
+                intervals.append((room_id, days, start, start + length, class_id))
         
-        return conflicts
+        # Cada pareja de clases solapadas en la misma aula cuenta una vez
+        return count_overlaps(intervals)
     
     def _check_student_conflicts(self, individual, time_slots_map) -> int:
-        """Verifica conflictos de horario para estudiantes"""
-        conflicts = 0
-        student_schedules = defaultdict(list)
-        
-        # Agrupar clases por estudiante
+        """Verifica conflictos de horario para estudiantes (barrido por estudiante y día)"""
+        intervals = []
         for class_id, (room_id, timeslot_id) in individual.genes.items():
             students = self.class_students.get(class_id, set())
             
@@ -303,21 +271,9 @@ class ConstraintValidator:
             
             if days and start is not None and length:
                 for student_id in students:
-                    student_schedules[student_id].append({
-                        'class_id': class_id,
-                        'days': days,
-                        'start': start,
-                        'end': start + length
-                    })
-        
-        # Verificar solapamientos
-        for student_id, schedule in student_schedules.items():
-            for i in range(len(schedule)):
-                for j in range(i + 1, len(schedule)):
-                    if self._times_overlap(schedule[i], schedule[j]):
-                        conflicts += 1
-        
-        return conflicts
+                    intervals.append((student_id, days, start, start + length, class_id))
+        
+        return count_overlaps(intervals)
     
     def _check_capacity_violations(self, individual) -> int:
         """Verifica violaciones de capacidad de aula"""
@@ -550,30 +506,6 @@ class ConstraintValidator:
         
         return distance
     
-    def _times_overlap(self, time1: Dict, time2: Dict) -> bool:
-        """
-        Verifica si dos horarios se solapan.
-        Deben coincidir en al menos un día Y tener solapamiento de tiempo.
-        """
-        # Verificar si comparten al menos un día
-        days1 = time1['days']
-        days2 = time2['days']
-        
-        share_day = False
-        for i in range(min(len(days1), len(days2))):
-            if days1[i] == '1' and days2[i] == '1':
-                share_day = True
-                break
-        
-        if not share_day:
-            return False
-        
-        # Verificar solapamiento de tiempo
-        start1, end1 = time1['start'], time1['end']
-        start2, end2 = time2['start'], time2['end']
-        
-        return not (end1 <= start2 or end2 <= start1)
-    
     def get_conflicts_report(self, individual) -> Dict:
         """Genera un reporte detallado de conflictos"""
         time_slots_map = self._get_timeslots_from_genes(individual)
@@ -1,12 +1,13 @@
 
 import random
 import numpy as np
-from typing import List, Tuple, Dict, Set
+from typing import Callable, List, Optional, Tuple, Dict, Set
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import multiprocessing
-from .models import Class, Room, TimeSlot, Instructor
+from .problem import SolverClass, SolverRoom, SolverTimeSlot
 from .constraints import ConstraintValidator
+from .progress import ProgressBus, ProgressCallback, print_progress
 
 
 class Individual:
@@ -15,12 +16,16 @@ class Individual:
     Cada individuo es un cromosoma que contiene asignaciones de clase-aula-tiempo.
     """
     
-    def __init__(self, classes: List[Class], rooms: List[Room], time_slots: Dict[int, List[TimeSlot]]):
+    def __init__(self, classes: List[SolverClass], rooms: List[SolverRoom],
+                 time_slots: Dict[int, List[SolverTimeSlot]],
+                 class_instructors: Optional[Dict[int, List[int]]] = None):
         self.classes = classes
         self.rooms = rooms
-        self.time_slots = time_slots  # {class_id: [TimeSlot]}
+        self.time_slots = time_slots  # {class_id: [SolverTimeSlot]}
+        self.class_instructors = class_instructors or {}  # {class_id: [instructor_id]}
         self.genes = {}  # {class_id: (room_id, timeslot_id)}
         self.fitness = 0.0
+        self.hard_violations: Optional[int] = None  # De la última calculate_fitness
         
     def initialize_random(self):
         """Inicialización inteligente con heurística de capacidad y evitación de conflictos"""
@@ -28,21 +33,8 @@ class Individual:
         room_occupation = {}  # {(room_id, timeslot_id): set(class_ids)}
         instructor_occupation = {}  # {(instructor_id, timeslot_id): set(class_ids)}
         
-        # Obtener instructores por clase (OPTIMIZADO: una sola query)
-        from .models import ClassInstructor
-        class_instructors_map = {}
-        
-        # Cargar todos los instructores de una vez
-        class_ids = [c.id for c in self.classes]
-        all_class_instructors = ClassInstructor.objects.filter(
-            class_obj_id__in=class_ids
-        ).values_list('class_obj_id', 'instructor_id')
-        
-        # Organizar en mapa
-        for class_id, instructor_id in all_class_instructors:
-            if class_id not in class_instructors_map:
-                class_instructors_map[class_id] = []
-            class_instructors_map[class_id].append(instructor_id)
+        # Instructores por clase (vienen del problema, sin consultas)
+        class_instructors_map = self.class_instructors
         
         # Ordenar clases por límite (asignar primero las más grandes)
         sorted_classes = sorted(self.classes, key=lambda c: c.class_limit, reverse=True)
@@ -155,14 +147,15 @@ class Individual:
                     self.genes[class_obj.id] = (suitable_rooms[0].id if suitable_rooms else None, None)
     
     def calculate_fitness(self, validator: 'ConstraintValidator'):
-        self.fitness = validator.evaluate(self)
+        self.fitness, self.hard_violations = validator.evaluate_with_violations(self)
         return self.fitness
     
     def clone(self):
         """Crea una copia del individuo"""
-        new_individual = Individual(self.classes, self.rooms, self.time_slots)
+        new_individual = Individual(self.classes, self.rooms, self.time_slots, self.class_instructors)
         new_individual.genes = self.genes.copy()
         new_individual.fitness = self.fitness
+        new_individual.hard_violations = self.hard_violations
         return new_individual
     
     def repair(self, validator: 'ConstraintValidator'):
@@ -271,13 +264,20 @@ class GeneticAlgorithm:
         
         # Optimización: Caching y batch processing
         self.use_batch_evaluation = True
+        
+        # Eventos de progreso (la consola es un suscriptor más, ver solver/progress.py)
+        self.evaluations = 0
+        self.generations_run = 0  # Generaciones completadas por el último evolve
+        self.progress = ProgressBus()
+        self.progress.subscribe(print_progress)
     
-    def initialize_population(self, classes: List[Class], rooms: List[Room], 
-                            time_slots: Dict[int, List[TimeSlot]]):
+    def initialize_population(self, classes: List[SolverClass], rooms: List[SolverRoom], 
+                            time_slots: Dict[int, List[SolverTimeSlot]],
+                            class_instructors: Optional[Dict[int, List[int]]] = None):
         """Crea la población inicial con individuos aleatorios"""
         self.population = []
         for _ in range(self.population_size):
-            individual = Individual(classes, rooms, time_slots)
+            individual = Individual(classes, rooms, time_slots, class_instructors)
             individual.initialize_random()
             self.population.append(individual)
     
@@ -286,6 +286,7 @@ class GeneticAlgorithm:
         # Evaluación secuencial optimizada (más rápido que threads por GIL)
         for individual in self.population:
             individual.calculate_fitness(validator)
+        self.evaluations += len(self.population)
         
         # Ordenar por fitness (mayor a menor)
         self.population.sort(key=lambda x: x.fitness, reverse=True)
@@ -430,7 +431,8 @@ class GeneticAlgorithm:
             individual = Individual(
                 [c for c in self.population[0].classes],
                 [r for r in self.population[0].rooms],
-                self.population[0].time_slots
+                self.population[0].time_slots,
+                self.population[0].class_instructors
             )
             individual.initialize_random()
             new_individuals.append(individual)
@@ -469,110 +471,139 @@ class GeneticAlgorithm:
         print(f"   [OK] Diversidad restaurada - Mejor fitness: {self.best_fitness_history[-1]:.0f}")
         sys.stdout.flush()
     
-    def evolve(self, validator: 'ConstraintValidator') -> Individual:
+    def _progress_event(self, kind: str, generation: int, validator: 'ConstraintValidator',
+                        start_time: float) -> Dict:
+        """Construye un evento de progreso (ver solver/progress.py)"""
+        import time
+        elapsed = time.time() - start_time
+        eta = elapsed / generation * (self.generations - generation) if generation else 0.0
+        # evaluate_population acaba de calcular las violaciones del mejor individuo
+        best = self.population[0]
+        hard_violations = best.hard_violations
+        if hard_violations is None:
+            hard_violations = validator.count_hard_violations(best)
+        return {
+            'type': kind,
+            'generation': generation,
+            'generations': self.generations,
+            'best_fitness': self.best_fitness_history[-1],
+            'avg_fitness': self.avg_fitness_history[-1],
+            'hard_violations': hard_violations,
+            'evaluations': self.evaluations,
+            'evals_per_second': self.evaluations / elapsed if elapsed > 0 else 0.0,
+            'elapsed': elapsed,
+            'eta': eta if kind == 'generation' else 0.0,
+            'stagnation': self.stagnation_counter,
+        }
+    
+    def evolve(self, validator: 'ConstraintValidator',
+               should_stop: Optional[Callable[[], bool]] = None,
+               on_progress: Optional[ProgressCallback] = None) -> Individual:
         """
         Ejecuta el proceso evolutivo completo.
         Retorna el mejor individuo encontrado.
+        
+        Args:
+            should_stop: callback opcional consultado al inicio de cada
+                         generación (cancelación o tiempo agotado); si devuelve
+                         True se detiene y se retorna el mejor hasta el momento
+            on_progress: callback opcional que recibe los eventos de progreso
+                         de esta ejecución (además de self.progress)
         """
         import sys
         import time
         start_time = time.time()
-        
-        # Evaluar población inicial
-        print(f"\n[WAIT] Inicializando población de {self.population_size} individuos...")
-        sys.stdout.flush()
-        self.evaluate_population(validator)
-        print(f"[OK] Población inicial evaluada - Mejor fitness: {self.best_fitness_history[0]:.2f}")
-        sys.stdout.flush()
-        
-        for generation in range(self.generations):
-            new_population = []
-            
-            # mantener los mejores individuos
-            elite = self.population[:self.elitism_size]
-            new_population.extend([ind.clone() for ind in elite])
+        self.evaluations = 0
+        self.generations_run = 0
+        unsubscribe = self.progress.subscribe(on_progress) if on_progress else None
+        
+        try:
+            # Evaluar población inicial
+            print(f"\n[WAIT] Inicializando población de {self.population_size} individuos...")
+            sys.stdout.flush()
+            self.evaluate_population(validator)
+            self.progress.publish(self._progress_event('start', 0, validator, start_time))
             
-            # Generar nueva población
-            while len(new_population) < self.population_size:
-                # Selección
-                parent1 = self.tournament_selection()
-                parent2 = self.tournament_selection()
+            generation = 0
+            for generation in range(1, self.generations + 1):
+                if should_stop is not None and should_stop():
+                    generation -= 1
+                    self.progress.publish(self._progress_event('stopped', generation, validator, start_time))
+                    break
                 
-                # Cruce
-                child1, child2 = self.crossover(parent1, parent2)
+                new_population = []
                 
-                # Mutación
-                self.mutate(child1)
-                self.mutate(child2)
+                # mantener los mejores individuos
+                elite = self.population[:self.elitism_size]
+                new_population.extend([ind.clone() for ind in elite])
                 
-                # Reparación habilitada (10% de probabilidad)
-                if random.random() < 0.1:
-                    child1.repair(validator)
-                if random.random() < 0.1:
-                    child2.repair(validator)
+                # Generar nueva población
+                while len(new_population) < self.population_size:
+                    # Selección
+                    parent1 = self.tournament_selection()
+                    parent2 = self.tournament_selection()
+                    
+                    # Cruce
+                    child1, child2 = self.crossover(parent1, parent2)
+                    
+                    # Mutación
+                    self.mutate(child1)
+                    self.mutate(child2)
+                    
+                    # Reparación habilitada (10% de probabilidad)
+                    if random.random() < 0.1:
+                        child1.repair(validator)
+                    if random.random() < 0.1:
+                        child2.repair(validator)
+                    
+                    new_population.append(child1)
+                    if len(new_population) < self.population_size:
+                        new_population.append(child2)
                 
-                new_population.append(child1)
-                if len(new_population) < self.population_size:
-                    new_population.append(child2)
-            
-            self.population = new_population
-            self.evaluate_population(validator)
-            
-            # **DETECCIÓN DE ESTANCAMIENTO**
-            current_best = self.best_fitness_history[-1]
-            improvement = current_best - self.last_best_fitness
-            
-            if improvement > 1.0:  # Mejora significativa (>1 punto)
-                self.stagnation_counter = 0
-                self.last_best_fitness = current_best
-            else:
-                self.stagnation_counter += 1
-            
-            # **ESTRATEGIAS ANTI-ESTANCAMIENTO**
-            if self.stagnation_counter >= self.stagnation_threshold:
-                self._apply_diversity_boost(validator)
-                self.stagnation_counter = 0  # Resetear contador
-            
-            # Reducir gradualmente mutación después de boost (decay suave)
-            if self.mutation_rate > self.initial_mutation_rate:
-                self.mutation_rate = max(self.initial_mutation_rate, 
-                                        self.mutation_rate * 0.98)  # Decay 2% por gen
-            
-            # Log de progreso (cada 2 generaciones)
-            if (generation + 1) % 2 == 0:
-                elapsed = time.time() - start_time
-                avg_time_per_gen = elapsed / (generation + 1)
-                remaining_time = avg_time_per_gen * (self.generations - generation - 1)
+                self.population = new_population
+                self.evaluate_population(validator)
                 
-                # Mostrar indicador de estancamiento
-                stagnation_indicator = ""
-                if self.stagnation_counter > 30:
-                    stagnation_indicator = " [WARNING]ESTANCADO"
-                elif self.stagnation_counter > 20:
-                    stagnation_indicator = " ⏸️"
+                # **DETECCIÓN DE ESTANCAMIENTO**
+                current_best = self.best_fitness_history[-1]
+                improvement = current_best - self.last_best_fitness
                 
-                print(f"Gen {generation + 1}/{self.generations} | "
-                      f"Mejor: {self.best_fitness_history[-1]:.0f} | "
-                      f"Promedio: {self.avg_fitness_history[-1]:.0f} | "
-                      f"Tiempo: {elapsed:.0f}s | ETA: {remaining_time:.0f}s{stagnation_indicator}")
-                sys.stdout.flush()  # Forzar salida inmediata
-            
-            # Early stopping basado en BASE_FITNESS
-            # Calcular BASE_FITNESS actual
-            num_classes = len(self.population[0].genes) if self.population else 0
-            BASE_FITNESS = num_classes * 500.0
-            BASE_FITNESS = max(50000.0, min(300000.0, BASE_FITNESS))
-            target_fitness = BASE_FITNESS * 0.90  # 90% del BASE
+                if improvement > 1.0:  # Mejora significativa (>1 punto)
+                    self.stagnation_counter = 0
+                    self.last_best_fitness = current_best
+                else:
+                    self.stagnation_counter += 1
+                
+                # **ESTRATEGIAS ANTI-ESTANCAMIENTO**
+                if self.stagnation_counter >= self.stagnation_threshold:
+                    self._apply_diversity_boost(validator)
+                    self.stagnation_counter = 0  # Resetear contador
+                
+                # Reducir gradualmente mutación después de boost (decay suave)
+                if self.mutation_rate > self.initial_mutation_rate:
+                    self.mutation_rate = max(self.initial_mutation_rate, 
+                                            self.mutation_rate * 0.98)  # Decay 2% por gen
+                
+                # Evento de progreso (la consola imprime cada 2 generaciones)
+                self.progress.publish(self._progress_event('generation', generation, validator, start_time))
+                
+                # Early stopping basado en BASE_FITNESS
+                # Calcular BASE_FITNESS actual
+                num_classes = len(self.population[0].genes) if self.population else 0
+                BASE_FITNESS = num_classes * 500.0
+                BASE_FITNESS = max(50000.0, min(300000.0, BASE_FITNESS))
+                target_fitness = BASE_FITNESS * 0.90  # 90% del BASE
+                
+                if self.best_fitness_history[-1] >= target_fitness:
+                    self.progress.publish(self._progress_event('goal', generation, validator, start_time))
+                    break
             
-            if self.best_fitness_history[-1] >= target_fitness:
-                print(f"\n[GOAL] ¡Fitness excelente alcanzado! ({self.best_fitness_history[-1]:.0f})")
-                print(f"   Deteniendo en generación {generation + 1}/{self.generations}")
-                sys.stdout.flush()
-                break
-        
-        total_time = time.time() - start_time
-        print(f"\n[OK] Evolución completada en {total_time:.1f} segundos")
-        sys.stdout.flush()
+            # La historia de fitness también incluye la población inicial y
+            # las re-evaluaciones tras _apply_diversity_boost
+            self.generations_run = generation
+            self.progress.publish(self._progress_event('finished', generation, validator, start_time))
+        finally:
+            if unsubscribe:
+                unsubscribe()
         
         return self.best_individual
     
@@ -581,7 +612,7 @@ class GeneticAlgorithm:
         return {
             'best_fitness': self.best_individual.fitness if self.best_individual else 0,
             'final_avg_fitness': self.avg_fitness_history[-1] if self.avg_fitness_history else 0,
-            'generations': len(self.best_fitness_history),
+            'generations': self.generations_run,
             'best_fitness_history': self.best_fitness_history,
             'avg_fitness_history': self.avg_fitness_history,
             'improvement': (self.best_fitness_history[-1] - self.best_fitness_history[0]) 
@@ -6,7 +6,7 @@ Implementa estrategias de construcción greedy, mutación dirigida y búsqueda l
 import random
 from typing import List, Dict, Set, Tuple, Optional
 from collections import defaultdict
-from .models import Class, Room, TimeSlot, Instructor
+from .problem import SolverClass, SolverRoom, SolverTimeSlot
 from .genetic_algorithm import Individual
 
 
@@ -19,7 +19,7 @@ class ScheduleHeuristics:
         self.room_occupation = {}  # {(room_id, timeslot_id): class_id}
         self.instructor_occupation = defaultdict(list)  # {(instructor_id, timeslot_id): [class_ids]}
     
-    def cluster_classes_by_department(self, classes: List[Class]) -> Dict[int, List[Class]]:
+    def cluster_classes_by_department(self, classes: List[SolverClass]) -> Dict[int, List[SolverClass]]:
         """
         H1: Agrupa clases por departamento para reducir conflictos de instructor.
         
@@ -31,14 +31,14 @@ class ScheduleHeuristics:
         """
         departments = defaultdict(list)
         for class_obj in classes:
-            dept_id = class_obj.offering.department_id if class_obj.offering else 0
+            dept_id = class_obj.department or 0
             departments[dept_id].append(class_obj)
         
         return departments
     
-    def prioritize_by_constraint(self, classes: List[Class], 
-                                 time_slots_by_class: Dict[int, List[TimeSlot]],
-                                 rooms: List[Room]) -> List[Class]:
+    def prioritize_by_constraint(self, classes: List[SolverClass], 
+                                 time_slots_by_class: Dict[int, List[SolverTimeSlot]],
+                                 rooms: List[SolverRoom]) -> List[SolverClass]:
         """
         H2: Prioriza clases por nivel de restricción (menos opciones primero).
         
@@ -71,9 +71,9 @@ class ScheduleHeuristics:
         
         return sorted(classes, key=constraint_score)
     
-    def get_valid_timeslots(self, class_obj: Class, 
+    def get_valid_timeslots(self, class_obj: SolverClass, 
                            instructor_ids: List[int],
-                           timeslots: List[TimeSlot]) -> List[TimeSlot]:
+                           timeslots: List[SolverTimeSlot]) -> List[SolverTimeSlot]:
         """
         H3: Filtra timeslots válidos considerando disponibilidad de instructor y días permitidos.
         
@@ -104,9 +104,10 @@ class ScheduleHeuristics:
         
         return valid_slots
     
-    def greedy_construction(self, classes: List[Class], 
-                           rooms: List[Room],
-                           time_slots_by_class: Dict[int, List[TimeSlot]]) -> Dict[int, Tuple[int, int]]:
+    def greedy_construction(self, classes: List[SolverClass], 
+                           rooms: List[SolverRoom],
+                           time_slots_by_class: Dict[int, List[SolverTimeSlot]],
+                           class_instructors: Optional[Dict[int, List[int]]] = None) -> Dict[int, Tuple[int, int]]:
         """
         H4: Constructor greedy mejorado que genera soluciones de alta calidad.
         
@@ -119,12 +120,12 @@ class ScheduleHeuristics:
             classes: Lista de clases
             rooms: Lista de aulas
             time_slots_by_class: Timeslots disponibles por clase
+            class_instructors: Instructores por clase (Problem.class_instructors)
             
         Returns:
             Dict {class_id: (room_id, timeslot_id)}
         """
-        from .models import ClassInstructor
-        
+        class_instructors = class_instructors or {}
         schedule = {}
         self.room_occupation = {}
         self.instructor_occupation = defaultdict(list)
@@ -134,10 +135,7 @@ class ScheduleHeuristics:
         
         for class_obj in sorted_classes:
             # Obtener instructores de la clase
-            instructor_ids = list(
-                ClassInstructor.objects.filter(class_obj=class_obj)
-                .values_list('instructor_id', flat=True)
-            )
+            instructor_ids = class_instructors.get(class_obj.id, [])
             
             timeslots = time_slots_by_class.get(class_obj.id, [])
             if not timeslots:
@@ -185,9 +183,9 @@ class ScheduleHeuristics:
         
         return schedule
     
-    def _evaluate_assignment_quality(self, class_obj: Class, 
-                                     room: Room, 
-                                     timeslot: TimeSlot,
+    def _evaluate_assignment_quality(self, class_obj: SolverClass, 
+                                     room: SolverRoom, 
+                                     timeslot: SolverTimeSlot,
                                      instructor_ids: List[int]) -> float:
         """
         Evalúa la calidad de una asignación (class, room, timeslot).
@@ -354,6 +352,7 @@ class ScheduleHeuristics:
                 individual.genes[conflicted_class] = original_assignment
         
         individual.fitness = current_fitness
+        individual.hard_violations = None  # Se recalculan en la próxima evaluación
         return individual
     
     
@@ -361,7 +360,8 @@ class ScheduleHeuristics:
                                      classes: List,
                                      rooms: List,
                                      time_slots_by_class: Dict,
-                                     size: int) -> List:
+                                     size: int,
+                                     class_instructors: Optional[Dict[int, List[int]]] = None) -> List:
         """
         H5: Genera población inicial híbrida con balance calidad/diversidad.        Distribución:
         - 30% Greedy construction (alta calidad)
@@ -374,6 +374,7 @@ class ScheduleHeuristics:
             classes: Lista de clases
             rooms: Lista de aulas
             time_slots_by_class: Timeslots por clase
+            class_instructors: Instructores por clase (Problem.class_instructors)
             
         Returns:
             Lista de individuos iniciales
@@ -383,8 +384,8 @@ class ScheduleHeuristics:
         # 30% Greedy puro
         greedy_count = int(size * 0.3)
         for _ in range(greedy_count):
-            genes = self.greedy_construction(classes, rooms, time_slots_by_class)
-            ind = Individual(classes, rooms, time_slots_by_class)
+            genes = self.greedy_construction(classes, rooms, time_slots_by_class, class_instructors)
+            ind = Individual(classes, rooms, time_slots_by_class, class_instructors)
             ind.genes = genes
             population.append(ind)
             
@@ -395,8 +396,8 @@ class ScheduleHeuristics:
         # 30% Greedy + mutación leve
         greedy_mutated_count = int(size * 0.3)
         for _ in range(greedy_mutated_count):
-            genes = self.greedy_construction(classes, rooms, time_slots_by_class)
-            ind = Individual(classes, rooms, time_slots_by_class)
+            genes = self.greedy_construction(classes, rooms, time_slots_by_class, class_instructors)
+            ind = Individual(classes, rooms, time_slots_by_class, class_instructors)
             ind.genes = genes
             
             # Mutar 10% de los genes
@@ -417,7 +418,7 @@ class ScheduleHeuristics:
         # 40% Random (biased + puro)
         remaining = size - len(population)
         for _ in range(remaining):
-            ind = Individual(classes, rooms, time_slots_by_class)
+            ind = Individual(classes, rooms, time_slots_by_class, class_instructors)
             ind.initialize_random()
             population.append(ind)
         
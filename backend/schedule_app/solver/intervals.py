@@ -0,0 +1,198 @@
+"""
+Índice de intervalos ocupados por recurso y día.
+
+Se usa para detectar solapamientos de horario (instructor en dos lugares a la
+vez) sin comparar todas las parejas de clases. Cada recurso (por ejemplo un
+instructor) tiene, por cada día de la semana, un arreglo de intervalos
+[inicio, fin) ordenado por inicio; las consultas usan bisect y sólo recorren
+los intervalos que pueden solaparse con el consultado.
+
+Para detectar todos los conflictos de un conjunto (por ejemplo las clases de
+cada aula) está overlapping_pairs: ordena los intervalos de cada (recurso, día)
+y hace un barrido, en O(n log n + k) para k parejas en conflicto.
+
+Los tiempos están en unidades de 5 minutos, igual que TimeSlot.start_time.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from functools import lru_cache
+from heapq import heappop, heappush
+from itertools import count
+from typing import Any, Dict, Hashable, Iterable, List, Set, Tuple
+
+
+@lru_cache(maxsize=256)
+def active_days(days: str) -> Tuple[int, ...]:
+    """Índices de los días activos en una cadena de bits ("1010000" -> (0, 2))"""
+    return tuple(i for i, bit in enumerate(days) if bit == '1')
+
+
+class _DayIntervals:
+    """Intervalos de un recurso en un día, ordenados por inicio."""
+
+    __slots__ = ('starts', 'ends', 'payloads', 'max_length')
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.payloads: List[Any] = []
+        self.max_length = 0
+
+    def add(self, start: int, end: int, payload: Any):
+        idx = bisect_right(self.starts, start)
+        self.starts.insert(idx, start)
+        self.ends.insert(idx, end)
+        self.payloads.insert(idx, payload)
+        self.max_length = max(self.max_length, end - start)
+
+    def extend(self, items: List[Tuple[int, int, Any]]):
+        """Inserción en lote: agrega todo y reordena una sola vez"""
+        merged = list(zip(self.starts, self.ends, self.payloads)) + items
+        merged.sort(key=lambda item: item[0])
+        self.starts = [item[0] for item in merged]
+        self.ends = [item[1] for item in merged]
+        self.payloads = [item[2] for item in merged]
+        self.max_length = max(self.max_length, max(e - s for s, e, _ in items))
+
+    def _candidates(self, start: int, end: int) -> range:
+        # Un intervalo [s, e) se solapa con [start, end) si s < end y e > start.
+        # Como e - s <= max_length, basta con revisar s > start - max_length.
+        lo = bisect_right(self.starts, start - self.max_length)
+        hi = bisect_left(self.starts, end)
+        return range(lo, hi)
+
+    def overlaps(self, start: int, end: int) -> bool:
+        ends = self.ends
+        return any(ends[i] > start for i in self._candidates(start, end))
+
+    def overlapping(self, start: int, end: int) -> List[Any]:
+        ends = self.ends
+        return [self.payloads[i] for i in self._candidates(start, end) if ends[i] > start]
+
+
+class BusyIntervalIndex:
+    """
+    Índice de ocupación: {recurso: {día: intervalos}}.
+
+    Uso:
+        index = BusyIntervalIndex()
+        index.add(instructor_id, '1010000', 90, 102, payload=class_id)
+        index.is_free(instructor_id, '0010000', 96, 108)   # False (solapa el miércoles)
+    """
+
+    def __init__(self):
+        self._index: Dict[Hashable, Dict[int, _DayIntervals]] = defaultdict(dict)
+        # Cada intervalo agregado recibe un id para no repetirlo entre días
+        self._entry_ids = count()
+
+    def _day(self, key: Hashable, day: int) -> _DayIntervals:
+        days = self._index[key]
+        intervals = days.get(day)
+        if intervals is None:
+            intervals = days[day] = _DayIntervals()
+        return intervals
+
+    def add(self, key: Hashable, days: str, start: int, end: int, payload: Any = None):
+        """Marca al recurso como ocupado en [start, end) los días activos"""
+        entry = (next(self._entry_ids), payload)
+        for day in active_days(days):
+            self._day(key, day).add(start, end, entry)
+
+    def add_many(self, items: Iterable[Tuple[Hashable, str, int, int, Any]]):
+        """
+        Marca muchos intervalos a la vez (key, days, start, end, payload).
+        Cada lista (recurso, día) se ordena una sola vez.
+        """
+        batches = defaultdict(list)
+        for key, days, start, end, payload in items:
+            entry = (next(self._entry_ids), payload)
+            for day in active_days(days):
+                batches[(key, day)].append((start, end, entry))
+        for (key, day), batch in batches.items():
+            self._day(key, day).extend(batch)
+
+    def is_free(self, key: Hashable, days: str, start: int, end: int) -> bool:
+        """True si el recurso no tiene ningún intervalo que se solape"""
+        resource = self._index.get(key)
+        if not resource:
+            return True
+        for day in active_days(days):
+            intervals = resource.get(day)
+            if intervals is not None and intervals.overlaps(start, end):
+                return False
+        return True
+
+    def overlapping(self, key: Hashable, days: str, start: int, end: int) -> List[Any]:
+        """Payloads de los intervalos que se solapan (sin duplicados entre días)"""
+        resource = self._index.get(key)
+        if not resource:
+            return []
+        found = []
+        seen = set()
+        for day in active_days(days):
+            intervals = resource.get(day)
+            if intervals is None:
+                continue
+            for entry_id, payload in intervals.overlapping(start, end):
+                if entry_id not in seen:
+                    seen.add(entry_id)
+                    found.append(payload)
+        return found
+
+
+def _overlap_index_pairs(items: Iterable[Tuple[Hashable, str, int, int, Any]]) -> Tuple[List[Any], Set[Tuple[int, int]]]:
+    """
+    Barrido por (recurso, día): los intervalos se recorren por inicio y se
+    mantiene un heap con los que siguen abiertos (por fin); cada intervalo
+    entra en conflicto con todos los abiertos al llegar su inicio.
+    Retorna (payloads, parejas de índices (i, j) con i < j).
+    """
+    payloads = []
+    by_day = defaultdict(list)
+    for idx, (key, days, start, end, payload) in enumerate(items):
+        payloads.append(payload)
+        for day in active_days(days):
+            by_day[(key, day)].append((start, end, idx))
+
+    pairs = set()
+    for intervals in by_day.values():
+        if len(intervals) < 2:
+            continue
+        intervals.sort()
+        open_intervals = []  # heap de (fin, índice)
+        for start, end, idx in intervals:
+            while open_intervals and open_intervals[0][0] <= start:
+                heappop(open_intervals)
+            for _, other in open_intervals:
+                pairs.add((other, idx) if other < idx else (idx, other))
+            heappush(open_intervals, (end, idx))
+
+    return payloads, pairs
+
+
+def overlapping_pairs(items: Iterable[Tuple[Hashable, str, int, int, Any]]) -> List[Tuple[Any, Any]]:
+    """
+    Parejas de payloads cuyos intervalos se solapan en el mismo recurso y al
+    menos un día común. Cada pareja aparece una vez (aunque compartan varios
+    días), en el orden de entrada.
+
+    Uso:
+        overlapping_pairs([
+            (room_id, ts.days, ts.start_time, ts.start_time + ts.length, assignment)
+            for assignment in assignments
+        ])
+    """
+    payloads, pairs = _overlap_index_pairs(items)
+    return [(payloads[i], payloads[j]) for i, j in sorted(pairs)]
+
+
+def count_overlaps(items: Iterable[Tuple[Hashable, str, int, int, Any]]) -> int:
+    """Número de parejas en conflicto (igual que len(overlapping_pairs(items)))"""
+    return len(_overlap_index_pairs(items)[1])
+
+
+def conflicting_payloads(items: Iterable[Tuple[Hashable, str, int, int, Any]]) -> Set[Any]:
+    """Payloads que participan en al menos un conflicto (deben ser hashables)"""
+    payloads, pairs = _overlap_index_pairs(items)
+    return {payloads[i] for pair in pairs for i in pair}
@@ -0,0 +1,167 @@
+"""
+Problema de horarios como arreglos NumPy y dataclasses.
+
+El solver no conoce Django: recibe un Problem (un dict de arreglos, ver
+PROBLEM_ARRAYS) y trabaja con SolverClass, SolverRoom y SolverTimeSlot. El
+adaptador de Django (problem_snapshot.py) construye los arreglos desde la
+base de datos; un Problem guardado con save() se puede abrir con load() sin
+base de datos (benchmarks, pruebas, otros procesos).
+
+Uso:
+    problem = Problem.load(path)
+    classes, rooms, time_slots_by_class = problem.entities()
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Arreglos de un problema (prefijo = tabla de origen)
+PROBLEM_ARRAYS = (
+    # Clases
+    'class_id', 'class_xml_id', 'class_offering', 'class_department', 'class_limit',
+    # Aulas
+    'room_id', 'room_xml_id', 'room_capacity', 'room_location',
+    # Slots (ordenados por clase)
+    'slot_id', 'slot_class', 'slot_days', 'slot_start', 'slot_length', 'slot_preference',
+    # Instructores y aulas preferidas por clase
+    'ci_class', 'ci_instructor',
+    'cr_class', 'cr_room', 'cr_preference',
+    # Estudiantes por curso (ordenados por curso)
+    'os_offering', 'os_student',
+    # Restricciones de grupo y sus clases
+    'gc_id', 'gc_type', 'gc_preference',
+    'gcc_constraint', 'gcc_class',
+)
+
+
+@dataclass(frozen=True)
+class SolverClass:
+    """Clase a programar"""
+    id: int
+    xml_id: int
+    class_limit: int
+    offering_id: Optional[int] = None
+    department: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class SolverRoom:
+    """Aula disponible"""
+    id: int
+    xml_id: int
+    capacity: int
+    location: str = ''
+
+
+@dataclass(frozen=True)
+class SolverTimeSlot:
+    """Horario posible de una clase"""
+    id: int
+    class_obj_id: int
+    days: str
+    start_time: int
+    length: int
+    preference: float = 0.0
+
+
+def schedulable(classes: List[SolverClass], rooms: List[SolverRoom],
+                time_slots_by_class: Dict[int, List[SolverTimeSlot]]
+                ) -> Tuple[List[SolverClass], List[SolverRoom], Dict[int, List[SolverTimeSlot]]]:
+    """
+    Preprocesamiento del problema: sólo las clases con slots (las demás no se
+    pueden programar) y las aulas con capacidad para al menos una de ellas.
+    """
+    classes = [class_obj for class_obj in classes if time_slots_by_class.get(class_obj.id)]
+    time_slots = {class_obj.id: time_slots_by_class[class_obj.id] for class_obj in classes}
+    min_class_limit = min((class_obj.class_limit for class_obj in classes), default=0)
+    rooms = [room for room in rooms if room.capacity >= min_class_limit]
+    return classes, rooms, time_slots
+
+
+class Problem:
+    """Arreglos del problema y conversión a las estructuras del solver"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Optional[Dict] = None):
+        self.arrays = arrays
+        self.meta = meta or {}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def entities(self) -> Tuple[List[SolverClass], List[SolverRoom], Dict[int, List[SolverTimeSlot]]]:
+        """Clases, aulas y slots por clase"""
+        classes = [
+            SolverClass(pk, xml_id, limit, offering or None, department or None)
+            for pk, xml_id, offering, department, limit in zip(
+                self['class_id'].tolist(), self['class_xml_id'].tolist(),
+                self['class_offering'].tolist(), self['class_department'].tolist(),
+                self['class_limit'].tolist())
+        ]
+        rooms = [
+            SolverRoom(pk, xml_id, capacity, location)
+            for pk, xml_id, capacity, location in zip(
+                self['room_id'].tolist(), self['room_xml_id'].tolist(),
+                self['room_capacity'].tolist(), self['room_location'].tolist())
+        ]
+        time_slots_by_class: Dict[int, List[SolverTimeSlot]] = {}
+        for pk, class_pk, days, start, length, preference in zip(
+                self['slot_id'].tolist(), self['slot_class'].tolist(), self['slot_days'].tolist(),
+                self['slot_start'].tolist(), self['slot_length'].tolist(),
+                self['slot_preference'].tolist()):
+            time_slots_by_class.setdefault(class_pk, []).append(
+                SolverTimeSlot(pk, class_pk, days, start, length, preference)
+            )
+        return classes, rooms, time_slots_by_class
+
+    def class_instructors(self) -> Dict[int, List[int]]:
+        """Instructores de cada clase (en orden de asignación)"""
+        instructors: Dict[int, List[int]] = {}
+        for class_id, instructor_id in zip(self['ci_class'].tolist(), self['ci_instructor'].tolist()):
+            instructors.setdefault(class_id, []).append(instructor_id)
+        return instructors
+
+    def offering_students(self) -> Dict[int, set]:
+        """Conjunto de estudiantes de cada curso"""
+        offerings = self['os_offering']
+        students = self['os_student'].tolist()
+        # Filas ordenadas por curso: cortes donde cambia el offering
+        starts = np.flatnonzero(np.r_[True, offerings[1:] != offerings[:-1]]) if len(offerings) else []
+        bounds = list(starts) + [len(students)]
+        return {
+            int(offerings[begin]): set(students[begin:end])
+            for begin, end in zip(bounds[:-1], bounds[1:])
+        }
+
+    def save(self, directory, **meta) -> Path:
+        """Guarda los arreglos (.npy, sin pickle) y meta.json en un directorio"""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for name, array in self.arrays.items():
+            np.save(path / f'{name}.npy', array, allow_pickle=False)
+        meta = dict(self.meta, **meta)
+        meta['arrays'] = sorted(self.arrays)
+        (path / 'meta.json').write_text(json.dumps(meta), encoding='utf-8')
+        return path
+
+    @classmethod
+    def load(cls, directory) -> 'Problem':
+        """Abre un problema guardado con memory-mapping (OSError/ValueError si no es válido)"""
+        path = Path(directory)
+        try:
+            meta = json.loads((path / 'meta.json').read_text(encoding='utf-8'))
+            names = meta['arrays']
+        except KeyError:
+            raise ValueError(f'{path}: meta.json sin lista de arreglos')
+        missing = set(PROBLEM_ARRAYS) - set(names)
+        if missing:
+            raise ValueError(f'{path}: faltan arreglos {sorted(missing)}')
+        arrays = {
+            name: np.load(path / f'{name}.npy', mmap_mode='r', allow_pickle=False)
+            for name in names
+        }
+        return cls(arrays, meta)
@@ -0,0 +1,82 @@
+"""
+Eventos de progreso del algoritmo genético.
+
+GeneticAlgorithm.evolve publica un evento (dict) por cada etapa en su
+ProgressBus; cualquiera puede suscribirse con un callback:
+
+    ga.progress.subscribe(lambda event: print(event['best_fitness']))
+
+Tipos de evento:
+- 'start':      población inicial evaluada (generation = 0)
+- 'generation': fin de una generación
+- 'stopped':    should_stop pidió detener la evolución
+- 'goal':       se alcanzó el fitness objetivo
+- 'finished':   evolución terminada (siempre es el último)
+
+Campos: type, generation, generations, best_fitness, avg_fitness,
+hard_violations (del mejor individuo), evaluations, evals_per_second,
+elapsed, eta (segundos) y stagnation.
+
+La salida por consola es sólo un suscriptor más (print_progress). Los
+trabajos en segundo plano guardan el último evento en GenerationJob.progress
+(ver jobs.py) y la API lo transmite como Server-Sent Events
+(schedule_app/progress.py).
+"""
+
+import sys
+import traceback
+from typing import Callable, Dict, List
+
+
+ProgressCallback = Callable[[Dict], None]
+
+
+class ProgressBus:
+    """Lista de suscriptores; los errores de un suscriptor no detienen la evolución"""
+
+    def __init__(self):
+        self._subscribers: List[ProgressCallback] = []
+
+    def subscribe(self, callback: ProgressCallback) -> Callable[[], None]:
+        """Registra un callback y retorna la función para darlo de baja"""
+        self._subscribers.append(callback)
+        return lambda: self.unsubscribe(callback)
+
+    def unsubscribe(self, callback: ProgressCallback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def publish(self, event: Dict):
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception:
+                traceback.print_exc()
+
+
+def print_progress(event: Dict):
+    """Suscriptor de consola (formato histórico de evolve)"""
+    kind = event['type']
+    if kind == 'start':
+        print(f"[OK] Población inicial evaluada - Mejor fitness: {event['best_fitness']:.2f}")
+    elif kind == 'generation':
+        # Una línea cada 2 generaciones
+        if event['generation'] % 2 != 0:
+            return
+        stagnation_indicator = ""
+        if event['stagnation'] > 30:
+            stagnation_indicator = " [WARNING]ESTANCADO"
+        elif event['stagnation'] > 20:
+            stagnation_indicator = " ⏸️"
+        print(f"Gen {event['generation']}/{event['generations']} | "
+              f"Mejor: {event['best_fitness']:.0f} | "
+              f"Promedio: {event['avg_fitness']:.0f} | "
+              f"Tiempo: {event['elapsed']:.0f}s | ETA: {event['eta']:.0f}s{stagnation_indicator}")
+    elif kind == 'stopped':
+        print(f"\n[WARNING] Evolución detenida en generación {event['generation']}/{event['generations']}")
+    elif kind == 'goal':
+        print(f"\n[GOAL] ¡Fitness excelente alcanzado! ({event['best_fitness']:.0f})")
+        print(f"   Deteniendo en generación {event['generation']}/{event['generations']}")
+    elif kind == 'finished':
+        print(f"\n[OK] Evolución completada en {event['elapsed']:.1f} segundos")
+    sys.stdout.flush()
@@ -0,0 +1,178 @@
+"""
+Tabla de horario materializada por Schedule.
+
+La vista /api/schedules/<id>/timetable/ arma una grilla {día: {franja: clases}}
+que antes se recalculaba en cada petición (con consultas por asignación). Aquí
+la grilla se construye una vez con consultas agregadas y se guarda comprimida
+en ScheduleTimetable junto con una huella de los datos de los que depende:
+
+- versión del formato de la grilla
+- versión de las asignaciones del horario ('schedule:<id>')
+- versiones de las tablas que se muestran: clases, cursos, aulas, slots,
+  instructores, instructores por clase y matrículas
+
+Las versiones las mantienen triggers de la base de datos (ver
+data_versions.py), así que cualquier cambio (bulk_create del asignador,
+ediciones desde la API o el admin, re-importaciones, intercambios de aula o
+slot entre asignaciones) invalida la grilla sin depender de señales.
+
+Uso:
+    from schedule_app.timetable_cache import get_timetable
+
+    data = get_timetable(schedule)   # {'grid': ..., 'time_slots': ..., 'stats': ...}
+"""
+
+import json
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+from django.db.models import Count
+
+from .models import (
+    Schedule, ScheduleAssignment, ScheduleTimetable,
+    ClassInstructor, StudentClass
+)
+from .data_versions import get_versions, schedule_key, versions_fingerprint
+from .solution_storage import ensure_materialized
+
+
+TIMETABLE_FORMAT_VERSION = 1
+
+DAY_NAMES = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+
+def _format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+# Tablas cuyas columnas aparecen en la grilla
+TIMETABLE_TABLES = (
+    'classes', 'courses', 'rooms', 'time_slots',
+    'instructors', 'class_instructors', 'student_classes',
+)
+
+
+def timetable_fingerprint(schedule: Schedule) -> str:
+    """Huella de los datos de los que depende la grilla (una consulta)"""
+    versions = get_versions(schedule_key(schedule.pk), *TIMETABLE_TABLES)
+    return versions_fingerprint(versions, TIMETABLE_FORMAT_VERSION)
+
+
+def build_timetable(schedule: Schedule) -> Dict:
+    """Construye la grilla con una consulta por tabla (sin consultas por fila)"""
+    rows = list(ScheduleAssignment.objects.filter(
+        schedule=schedule
+    ).order_by('id').values_list(
+        'class_obj_id', 'class_obj__xml_id', 'class_obj__class_limit',
+        'class_obj__offering__name', 'class_obj__offering__code',
+        'room__location', 'room__capacity',
+        'time_slot__days', 'time_slot__start_time', 'time_slot__length'
+    ))
+    class_ids = ScheduleAssignment.objects.filter(schedule=schedule).values('class_obj_id')
+
+    instructor_names = defaultdict(list)
+    for class_id, name in ClassInstructor.objects.filter(
+        class_obj_id__in=class_ids
+    ).order_by('id').values_list('class_obj_id', 'instructor__name'):
+        instructor_names[class_id].append(name)
+
+    enrolled = dict(
+        StudentClass.objects.filter(class_obj_id__in=class_ids)
+        .values('class_obj_id').annotate(n=Count('id')).values_list('class_obj_id', 'n')
+    )
+
+    timetable = {day: {} for day in DAY_NAMES}
+    all_hours = set()
+
+    for (class_id, xml_id, class_limit, course_name, course_code,
+         location, capacity, days, start_slot, length) in rows:
+        if days is None:
+            continue
+
+        # Decodificar días (bit string: "0101000" = Mar/Jue)
+        days_bits = days[:7] if len(days) >= 7 else days.ljust(7, '0')
+
+        start_minutes = start_slot * 5  # slots de 5 minutos
+        duration_minutes = length * 5
+        start_time = _format_minutes(start_minutes)
+        end_time = _format_minutes(start_minutes + duration_minutes)
+        time_label = f"{start_time}-{end_time}"
+        all_hours.add(start_time)
+
+        class_info = {
+            'id': class_id,
+            'xml_id': xml_id,
+            'name': course_name if course_name is not None else f"Clase {xml_id}",
+            'code': course_code if course_code is not None else "N/A",
+            'instructors': instructor_names.get(class_id) or ["Sin instructor"],
+            'room': location,
+            'room_capacity': capacity,
+            'students': enrolled.get(class_id, 0),
+            'limit': class_limit,
+            'time': time_label,
+            'start': start_time,
+            'end': end_time,
+            'duration_min': duration_minutes
+        }
+
+        for day_idx, bit in enumerate(days_bits):
+            if bit == '1':
+                timetable[DAY_NAMES[day_idx]].setdefault(time_label, []).append(class_info)
+
+    max_concurrent = max(
+        (len(classes) for day in timetable.values() for classes in day.values()),
+        default=0
+    )
+
+    return {
+        'grid': timetable,
+        'time_slots': sorted(all_hours),
+        'total_assignments': len(rows),
+        'stats': {
+            'total_classes': len(rows),
+            'classes_by_day': {
+                day: sum(len(classes) for classes in timetable[day].values())
+                for day in DAY_NAMES
+            },
+            'max_concurrent_classes': max_concurrent,
+            'needs_multiple_views': max_concurrent > 10
+        }
+    }
+
+
+def get_timetable(schedule: Schedule) -> Dict:
+    """
+    Devuelve la grilla del horario, reconstruyéndola sólo si los datos
+    cambiaron desde la última vez.
+    """
+    ensure_materialized(schedule)
+    fingerprint = timetable_fingerprint(schedule)
+
+    cached = ScheduleTimetable.objects.filter(schedule=schedule).values_list(
+        'fingerprint', 'payload'
+    ).first()
+    if cached and cached[0] == fingerprint:
+        return json.loads(zlib.decompress(bytes(cached[1])))
+
+    data = build_timetable(schedule)
+    ScheduleTimetable.objects.update_or_create(
+        schedule=schedule,
+        defaults={
+            'fingerprint': fingerprint,
+            'payload': zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        }
+    )
+    return data
+
+
+def invalidate_timetables(schedule_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Borra las grillas guardadas (todas si schedule_ids es None). La huella ya
+    detecta los cambios; esto sólo libera espacio (p. ej. al vaciar los datos).
+    """
+    queryset = ScheduleTimetable.objects.all()
+    if schedule_ids is not None:
+        queryset = queryset.filter(schedule_id__in=list(schedule_ids))
+    deleted, _ = queryset.delete()
+    return deleted
@@ -3,7 +3,8 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     RoomViewSet, InstructorViewSet, CourseViewSet,
     ClassViewSet, StudentViewSet, ScheduleViewSet,
-    TimeSlotViewSet, ClassInstructorViewSet, ClassRoomViewSet
+    TimeSlotViewSet, ClassInstructorViewSet, ClassRoomViewSet,
+    StudentClassViewSet, GenerationJobViewSet
 )
 from . import xml_parser
 from . import api
@@ -18,10 +19,13 @@ router.register(r'schedules', ScheduleViewSet)
 router.register(r'timeslots', TimeSlotViewSet)
 router.register(r'class-instructors', ClassInstructorViewSet)
 router.register(r'class-rooms', ClassRoomViewSet)
+router.register(r'student-classes', StudentClassViewSet)
+router.register(r'generation-jobs', GenerationJobViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
     path('import-xml/', xml_parser.import_xml_view, name='import-xml'),
+    path('import-solution/', xml_parser.import_solution_view, name='import-solution'),
     path('dashboard-stats/', xml_parser.dashboard_stats, name='dashboard-stats'),
     
     # Nuevas APIs para frontend
@@ -30,6 +34,8 @@ urlpatterns = [
     path('schedules/<int:schedule_id>/timetable/', api.get_schedule_timetable, name='schedule-timetable'),
     path('schedules/<int:schedule_id>/conflicts/', api.get_conflict_analysis, name='schedule-conflicts'),
     path('schedules/<int:schedule_id>/rooms/', api.get_room_utilization, name='schedule-rooms'),
+    path('schedules/<int:schedule_id>/rooms/heatmap/', api.get_room_heatmap, name='schedule-rooms-heatmap'),
+    path('schedules/<int:schedule_id>/export/<str:file_format>/', api.export_schedule, name='schedule-export'),
     path('analysis/workload/', api.get_workload_analysis, name='workload-analysis'),
     path('instructors-list/', api.get_instructors_list, name='instructors-list'),
     path('instructors/<int:instructor_id>/schedule/', api.get_instructor_schedule, name='instructor-schedule'),
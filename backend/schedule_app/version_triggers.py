@@ -0,0 +1,179 @@
+"""
+Triggers que mantienen la tabla data_versions (ver data_versions.py).
+
+Los instala la migración 0012, pero en SQLite cualquier migración que
+reconstruya una tabla (AlterField, RemoveField, cambios de restricciones)
+la copia sin sus triggers y sin dar error: desde ahí las cachés que
+dependen de esa tabla no se invalidan nunca. Por eso ensure_triggers() se
+ejecuta también tras cada `migrate` (post_migrate, ver apps.py): crea sólo
+los triggers que faltan y cambia la versión de sus tablas, porque las
+escrituras hechas mientras no estaban no la cambiaron.
+check_db_profile falla si falta alguno.
+
+Este módulo no importa modelos para que las migraciones lo puedan usar.
+"""
+
+import random
+from typing import Iterator, List, Tuple
+
+
+# Tablas cuya versión mantienen los triggers
+TRACKED_TABLES = [
+    'rooms', 'instructors', 'courses', 'classes', 'class_instructors',
+    'instructor_time_slots', 'class_rooms', 'time_slots', 'students',
+    'student_classes', 'group_constraints', 'group_constraint_classes',
+    'schedules', 'schedule_assignments',
+]
+# Tablas que además versionan cada horario ('schedule:<id>'): tabla -> columna
+SCHEDULE_COLUMNS = {'schedules': 'id', 'schedule_assignments': 'schedule_id'}
+OPERATIONS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def _sqlite_bump(key_sql):
+    return (
+        f"INSERT INTO data_versions (key, version) VALUES ({key_sql}, random()) "
+        f"ON CONFLICT(key) DO UPDATE SET version = excluded.version;"
+    )
+
+
+def _sqlite_triggers() -> Iterator[Tuple[str, str, str]]:
+    for table in TRACKED_TABLES:
+        for operation in OPERATIONS:
+            name = f'dv_{table}_{operation.lower()}'
+            body = [_sqlite_bump(f"'{table}'")]
+            column = SCHEDULE_COLUMNS.get(table)
+            if column:
+                rows = {'INSERT': ['NEW'], 'UPDATE': ['NEW', 'OLD'], 'DELETE': ['OLD']}[operation]
+                body.extend(_sqlite_bump(f"'schedule:' || {row}.{column}") for row in rows)
+            yield name, table, (
+                f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {operation} ON {table} "
+                f"BEGIN {' '.join(body)} END"
+            )
+
+
+POSTGRESQL_FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION data_versions_bump() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO data_versions (key, version) VALUES (TG_TABLE_NAME, (random() * 9e18)::bigint)
+        ON CONFLICT (key) DO UPDATE SET version = EXCLUDED.version;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION data_versions_bump_schedule() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO data_versions (key, version)
+            VALUES ('schedule:' || (to_jsonb(NEW) ->> TG_ARGV[0]), (random() * 9e18)::bigint)
+            ON CONFLICT (key) DO UPDATE SET version = EXCLUDED.version;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            INSERT INTO data_versions (key, version)
+            VALUES ('schedule:' || (to_jsonb(OLD) ->> TG_ARGV[0]), (random() * 9e18)::bigint)
+            ON CONFLICT (key) DO UPDATE SET version = EXCLUDED.version;
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+]
+
+
+def _postgresql_triggers() -> Iterator[Tuple[str, str, str]]:
+    for table in TRACKED_TABLES:
+        # Por sentencia: un bulk_create o un DELETE masivo actualizan la versión una vez
+        yield f'dv_{table}', table, (
+            f"CREATE TRIGGER dv_{table} AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION data_versions_bump()"
+        )
+        column = SCHEDULE_COLUMNS.get(table)
+        if column:
+            yield f'dv_{table}_schedule', table, (
+                f"CREATE TRIGGER dv_{table}_schedule AFTER INSERT OR UPDATE OR DELETE ON {table} "
+                f"FOR EACH ROW EXECUTE FUNCTION data_versions_bump_schedule('{column}')"
+            )
+
+
+def trigger_definitions(vendor: str) -> List[Tuple[str, str, str]]:
+    """(nombre, tabla, CREATE TRIGGER) de cada trigger esperado"""
+    if vendor == 'sqlite':
+        return list(_sqlite_triggers())
+    if vendor == 'postgresql':
+        return list(_postgresql_triggers())
+    raise NotImplementedError(f'Triggers de data_versions no disponibles para {vendor}')
+
+
+def _existing_triggers(cursor, vendor: str) -> set:
+    if vendor == 'sqlite':
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+    else:
+        cursor.execute("SELECT tgname FROM pg_trigger WHERE NOT tgisinternal")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def missing_triggers(connection) -> List[str]:
+    """Nombres de los triggers esperados que no existen en la base de datos"""
+    definitions = trigger_definitions(connection.vendor)
+    with connection.cursor() as cursor:
+        existing = _existing_triggers(cursor, connection.vendor)
+    return [name for name, _, _ in definitions if name not in existing]
+
+
+def install_triggers(cursor, vendor: str) -> List[str]:
+    """
+    Crea los triggers que faltan y cambia la versión de sus tablas.
+
+    Returns:
+        Tablas cuyos triggers se (re)crearon
+    """
+    definitions = trigger_definitions(vendor)
+    existing = _existing_triggers(cursor, vendor)
+    missing = [(table, sql) for name, table, sql in definitions if name not in existing]
+    if not missing:
+        return []
+
+    if vendor == 'postgresql':
+        for sql in POSTGRESQL_FUNCTIONS:
+            cursor.execute(sql)
+    for _, sql in missing:
+        cursor.execute(sql)
+
+    tables = sorted({table for table, _ in missing})
+    for table in tables:
+        cursor.execute(
+            "UPDATE data_versions SET version = %s WHERE key = %s",
+            [random.getrandbits(62), table]
+        )
+    if any(table in SCHEDULE_COLUMNS for table in tables):
+        cursor.execute(
+            "UPDATE data_versions SET version = %s WHERE key LIKE %s",
+            [random.getrandbits(62), 'schedule:%']
+        )
+    return tables
+
+
+def drop_triggers(cursor, vendor: str):
+    """Elimina los triggers y funciones de data_versions"""
+    for name, table, _ in trigger_definitions(vendor):
+        if vendor == 'sqlite':
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        else:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+    if vendor == 'postgresql':
+        cursor.execute("DROP FUNCTION IF EXISTS data_versions_bump()")
+        cursor.execute("DROP FUNCTION IF EXISTS data_versions_bump_schedule()")
+
+
+def ensure_triggers(sender=None, using='default', **kwargs):
+    """Receptor de post_migrate: reinstala los triggers que una migración haya borrado"""
+    from django.db import connections
+
+    connection = connections[using]
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        return
+    if 'data_versions' not in connection.introspection.table_names():
+        return  # Migración 0012 aún no aplicada (o revertida)
+    with connection.cursor() as cursor:
+        tables = install_triggers(cursor, connection.vendor)
+    if tables:
+        print(f"[WARNING] Triggers de data_versions reinstalados en: {', '.join(tables)}")
@@ -1,25 +1,39 @@
-from rest_framework import viewsets, status
+import json
+
+from rest_framework import mixins, renderers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.db.models import Count, Q, Prefetch
 from django.db.models import Avg, Max
+from django.http import StreamingHttpResponse
 from .models import (
     Room, Instructor, Course, Class, ClassInstructor,
     ClassRoom, TimeSlot, Student, StudentClass,
-    Schedule, ScheduleAssignment
+    Schedule, ScheduleAssignment, GenerationJob
 )
 from .serializers import (
     RoomSerializer, InstructorSerializer, CourseSerializer,
     ClassSerializer, ClassListSerializer, StudentSerializer,
     StudentClassSerializer, ScheduleSerializer, ScheduleListSerializer,
-    TimeSlotSerializer, ClassInstructorSerializer, ClassRoomSerializer
+    TimeSlotSerializer, ClassInstructorSerializer, ClassRoomSerializer,
+    GenerationJobSerializer
 )
 from .schedule_generator import ScheduleGenerator
+from .solution_storage import compare_schedules, ensure_materialized, with_assignment_count
+from .jobs import parse_generation_params, submit_job, cancel_job, JobQueueFull
+from .progress import sse_stream
+from .pagination import KeysetPagination
+from .analysis import room_conflict_ids
+
+
+def class_list_queryset():
+    """Clases con lo que lee ClassListSerializer (curso e instructores)"""
+    return Class.objects.select_related('offering').prefetch_related('instructors__instructor')
 
 
 class RoomViewSet(viewsets.ModelViewSet):
     """ViewSet para gestionar aulas"""
-    queryset = Room.objects.all()
+    queryset = Room.objects.order_by('id')
     serializer_class = RoomSerializer
     
     @action(detail=True, methods=['get'])
@@ -45,6 +59,8 @@ class RoomViewSet(viewsets.ModelViewSet):
         if not schedule:
             return Response([])
         
+        ensure_materialized(schedule)
+        
         # Obtener todas las asignaciones de esta aula en este horario
         assignments = ScheduleAssignment.objects.filter(
             schedule=schedule,
@@ -56,29 +72,8 @@ class RoomViewSet(viewsets.ModelViewSet):
         
         # Detectar conflictos de solapamiento temporal (igual que SQL)
         # Dos clases en conflicto si: comparten al menos UN día Y horarios se solapan
-        conflict_ids = set()
         assignments_list = list(assignments)
-        
-        def share_days(days1: str, days2: str) -> bool:
-            """Verificar si dos cadenas de días comparten al menos un día activo"""
-            for i in range(min(len(days1), len(days2))):
-                if days1[i] == '1' and days2[i] == '1':
-                    return True
-            return False
-        
-        for i, a1 in enumerate(assignments_list):
-            for a2 in assignments_list[i+1:]:
-                ts1 = a1.time_slot
-                ts2 = a2.time_slot
-                
-                # Verificar si comparten AL MENOS UN día
-                if share_days(ts1.days, ts2.days):
-                    # Verificar solapamiento temporal:
-                    # ts1 empieza antes de que ts2 termine Y ts2 empieza antes de que ts1 termine
-                    if (ts1.start_time < ts2.start_time + ts2.length and 
-                        ts2.start_time < ts1.start_time + ts1.length):
-                        conflict_ids.add(a1.id)
-                        conflict_ids.add(a2.id)
+        conflict_ids = room_conflict_ids(assignments_list)
         
         # Preparar datos para respuesta
         result = []
@@ -131,12 +126,15 @@ class InstructorViewSet(viewsets.ModelViewSet):
     queryset = Instructor.objects.all()
     serializer_class = InstructorSerializer
     
+    def get_queryset(self):
+        # annotate() con GROUP BY ignora Meta.ordering
+        return self.queryset.annotate(class_count=Count('classes')).order_by('id')
+    
     @action(detail=True, methods=['get'])
     def classes(self, request, pk=None):
         """Obtener las clases de un instructor"""
         instructor = self.get_object()
-        class_instructors = ClassInstructor.objects.filter(instructor=instructor)
-        classes = [ci.class_obj for ci in class_instructors]
+        classes = class_list_queryset().filter(instructors__instructor=instructor)
         serializer = ClassListSerializer(classes, many=True)
         return Response(serializer.data)
     
@@ -160,11 +158,14 @@ class CourseViewSet(viewsets.ModelViewSet):
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
     
+    def get_queryset(self):
+        return self.queryset.annotate(class_count=Count('classes')).order_by('id')
+    
     @action(detail=True, methods=['get'])
     def classes(self, request, pk=None):
         """Obtener las clases de un curso"""
         course = self.get_object()
-        classes = course.classes.all()
+        classes = class_list_queryset().filter(offering=course)
         serializer = ClassListSerializer(classes, many=True)
         return Response(serializer.data)
 
@@ -174,9 +175,14 @@ class ClassViewSet(viewsets.ModelViewSet):
     queryset = Class.objects.select_related('offering', 'parent').prefetch_related(
         'instructors__instructor',
         'room_prefs__room',
-        'time_slots',
-        'enrolled_students'
+        'time_slots'
     ).all()
+    pagination_class = KeysetPagination
+    
+    def get_queryset(self):
+        if self.action == 'list':
+            return class_list_queryset()
+        return self.queryset.annotate(student_count=Count('enrolled_students'))
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -187,7 +193,7 @@ class ClassViewSet(viewsets.ModelViewSet):
     def students(self, request, pk=None):
         """Obtener los estudiantes de una clase"""
         class_obj = self.get_object()
-        student_classes = StudentClass.objects.filter(class_obj=class_obj)
+        student_classes = StudentClass.objects.filter(class_obj=class_obj).select_related('student', 'class_obj')
         serializer = StudentClassSerializer(student_classes, many=True)
         return Response(serializer.data)
     
@@ -209,12 +215,16 @@ class StudentViewSet(viewsets.ModelViewSet):
     """ViewSet para gestionar estudiantes"""
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
+    pagination_class = KeysetPagination
+    
+    def get_queryset(self):
+        return self.queryset.annotate(enrolled_classes_count=Count('enrolled_classes'))
     
     @action(detail=True, methods=['get'])
     def classes(self, request, pk=None):
         """Obtener las clases de un estudiante"""
         student = self.get_object()
-        student_classes = StudentClass.objects.filter(student=student)
+        student_classes = StudentClass.objects.filter(student=student).select_related('student', 'class_obj')
         serializer = StudentClassSerializer(student_classes, many=True)
         return Response(serializer.data)
 
@@ -223,55 +233,87 @@ class ScheduleViewSet(viewsets.ModelViewSet):
     """ViewSet para gestionar horarios"""
     queryset = Schedule.objects.all()
     
+    # Acciones que leen filas ScheduleAssignment (requieren horario materializado)
+    ROW_BASED_ACTIONS = ('retrieve', 'summary', 'calendar_view', 'room_assignments')
+    
+    def get_queryset(self):
+        queryset = self.queryset
+        if self.action == 'list':
+            # annotate() con GROUP BY ignora Meta.ordering
+            return with_assignment_count(queryset.defer('genome')).order_by('-created_at')
+        if self.action == 'retrieve':
+            # Asignaciones anidadas con clase, aula, slot e instructores
+            return queryset.prefetch_related(Prefetch(
+                'assignments',
+                queryset=ScheduleAssignment.objects.select_related(
+                    'class_obj__offering', 'room', 'time_slot'
+                ).prefetch_related('class_obj__instructors__instructor')
+            ))
+        return queryset
+    
     def get_serializer_class(self):
         if self.action == 'list':
             return ScheduleListSerializer
         return ScheduleSerializer
     
+    def get_object(self):
+        schedule = super().get_object()
+        if self.action in self.ROW_BASED_ACTIONS and ensure_materialized(schedule):
+            # El prefetch de asignaciones se hizo antes de crear las filas
+            schedule = super().get_object()
+        return schedule
+    
     @action(detail=False, methods=['post'])
     def generate(self, request):
         """Generar un nuevo horario usando algoritmo genético"""
         try:
-            # Obtener parámetros del request
-            name = request.data.get('name', f'Horario Generado')
-            description = request.data.get('description', '')
+            # Obtener y validar parámetros del request
+            params = parse_generation_params(request.data)
+            warm_start_id = params['warm_start_id']
             
-            # Parámetros del algoritmo genético
-            population_size = int(request.data.get('population_size', 100))
-            generations = int(request.data.get('generations', 200))
-            mutation_rate = float(request.data.get('mutation_rate', 0.1))
-            crossover_rate = float(request.data.get('crossover_rate', 0.8))
-            elitism_size = int(request.data.get('elitism_size', 5))
-            tournament_size = int(request.data.get('tournament_size', 5))
+            # Con async=true se encola un trabajo y se responde de inmediato
+            if str(request.data.get('async', 'false')).lower() in ('1', 'true'):
+                job = submit_job(params, request.data.get('time_budget'))
+                return Response(GenerationJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
             
-            # Validar parámetros
-            if not (0 <= mutation_rate <= 1):
-                return Response(
-                    {'error': 'mutation_rate debe estar entre 0 y 1'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            if not (0 <= crossover_rate <= 1):
-                return Response(
-                    {'error': 'crossover_rate debe estar entre 0 y 1'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+            name = params['name']
+            description = params['description']
+            compact = params['compact']
             
             # Crear generador
             generator = ScheduleGenerator(
-                population_size=population_size,
-                generations=generations,
-                mutation_rate=mutation_rate,
-                crossover_rate=crossover_rate,
-                elitism_size=elitism_size,
-                tournament_size=tournament_size
+                population_size=params['population_size'],
+                generations=params['generations'],
+                mutation_rate=params['mutation_rate'],
+                crossover_rate=params['crossover_rate'],
+                elitism_size=params['elitism_size'],
+                tournament_size=params['tournament_size']
             )
             
+            warm_start = None
+            if warm_start_id:
+                warm_start = Schedule.objects.filter(id=warm_start_id).first()
+                if not warm_start:
+                    return Response(
+                        {'error': 'Horario de warm start no encontrado'},
+                        status=status.HTTP_404_NOT_FOUND
+                    )
+            
             # Cargar datos
             generator.load_data()
             
             # Generar horario
-            schedule = generator.generate(name, description)
+            schedule = generator.generate(
+                name, description, compact=compact, warm_start=warm_start
+            )
+            
+            if compact:
+                # Sin filas de asignación: el resumen se calcula al activarlo
+                return Response({
+                    'schedule': ScheduleListSerializer(schedule).data,
+                    'summary': None,
+                    'message': 'Horario generado exitosamente (compacto)'
+                }, status=status.HTTP_201_CREATED)
             
             # Obtener resumen
             summary = generator.get_schedule_summary(schedule)
@@ -290,6 +332,11 @@ class ScheduleViewSet(viewsets.ModelViewSet):
                 'message': 'Horario generado exitosamente'
             }, status=status.HTTP_201_CREATED)
             
+        except JobQueueFull as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_429_TOO_MANY_REQUESTS
+            )
         except ValueError as e:
             return Response(
                 {'error': str(e)},
@@ -305,6 +352,12 @@ class ScheduleViewSet(viewsets.ModelViewSet):
     def activate(self, request, pk=None):
         """Activar un horario y desactivar los demás"""
         schedule = self.get_object()
+        
+        # Los horarios compactos se materializan y reciben instructores al activarse
+        if ensure_materialized(schedule):
+            from .instructor_assigner import assign_instructors_to_schedule
+            assign_instructors_to_schedule(schedule)
+        
         Schedule.objects.all().update(is_active=False)
         schedule.is_active = True
         schedule.save()
@@ -342,6 +395,31 @@ class ScheduleViewSet(viewsets.ModelViewSet):
             ]
         })
     
+    @action(detail=True, methods=['get'])
+    def compare(self, request, pk=None):
+        """Comparar clase por clase con otro horario (?with=<id>), sin materializar filas"""
+        schedule = self.get_object()
+        try:
+            other_id = int(request.query_params['with'])
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'Parámetro with requerido (ID del otro horario)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        other = Schedule.objects.filter(id=other_id).first()
+        if not other:
+            return Response(
+                {'error': 'Horario a comparar no encontrado'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        return Response({
+            'schedule_id': schedule.id,
+            'other_id': other.id,
+            **compare_schedules(schedule, other)
+        })
+    
     @action(detail=True, methods=['get'])
     def calendar_view(self, request, pk=None):
         """Obtener vista de calendario para FullCalendar.js"""
@@ -405,28 +483,8 @@ class ScheduleViewSet(viewsets.ModelViewSet):
         ).prefetch_related('class_obj__instructors__instructor')
         
         # Detectar conflictos de solapamiento temporal (igual que SQL)
-        conflict_ids = set()
         assignments_list = list(assignments)
-        
-        def share_days(days1: str, days2: str) -> bool:
-            """Verificar si dos cadenas de días comparten al menos un día activo"""
-            for i in range(min(len(days1), len(days2))):
-                if days1[i] == '1' and days2[i] == '1':
-                    return True
-            return False
-        
-        for i, a1 in enumerate(assignments_list):
-            for a2 in assignments_list[i+1:]:
-                ts1 = a1.time_slot
-                ts2 = a2.time_slot
-                
-                # Verificar si comparten AL MENOS UN día
-                if share_days(ts1.days, ts2.days):
-                    # Verificar solapamiento temporal
-                    if (ts1.start_time < ts2.start_time + ts2.length and 
-                        ts2.start_time < ts1.start_time + ts1.length):
-                        conflict_ids.add(a1.id)
-                        conflict_ids.add(a2.id)
+        conflict_ids = room_conflict_ids(assignments_list)
         
         result = []
         for assignment in assignments_list:
@@ -463,15 +521,85 @@ class TimeSlotViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet de solo lectura para slots de tiempo"""
     queryset = TimeSlot.objects.all()
     serializer_class = TimeSlotSerializer
+    pagination_class = KeysetPagination
 
 
 class ClassInstructorViewSet(viewsets.ModelViewSet):
     """ViewSet para gestionar relaciones clase-instructor"""
-    queryset = ClassInstructor.objects.all()
+    queryset = ClassInstructor.objects.select_related('instructor').all()
     serializer_class = ClassInstructorSerializer
+    pagination_class = KeysetPagination
+
+
+class StudentClassViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet de solo lectura para inscripciones (para sincronizar en bloque)"""
+    queryset = StudentClass.objects.select_related('student', 'class_obj').all()
+    serializer_class = StudentClassSerializer
+    pagination_class = KeysetPagination
 
 
 class ClassRoomViewSet(viewsets.ModelViewSet):
     """ViewSet para gestionar relaciones clase-aula"""
-    queryset = ClassRoom.objects.all()
+    queryset = ClassRoom.objects.select_related('room').order_by('id')
     serializer_class = ClassRoomSerializer
+
+
+class EventStreamRenderer(renderers.BaseRenderer):
+    """Permite negociar text/event-stream (los errores se envían como JSON)"""
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode(self.charset)
+
+
+class GenerationJobViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Trabajos de generación en segundo plano.
+    
+    POST /api/generation-jobs/               encolar (mismos parámetros que schedules/generate + time_budget)
+    GET  /api/generation-jobs/<id>/          consultar estado
+    GET  /api/generation-jobs/<id>/events/   progreso en vivo (Server-Sent Events)
+    POST /api/generation-jobs/<id>/cancel/   cancelar
+    """
+    queryset = GenerationJob.objects.select_related('schedule').all()
+    serializer_class = GenerationJobSerializer
+    
+    def create(self, request, *args, **kwargs):
+        try:
+            params = parse_generation_params(request.data)
+            if params['warm_start_id'] and not Schedule.objects.filter(id=params['warm_start_id']).exists():
+                return Response(
+                    {'error': 'Horario de warm start no encontrado'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            job = submit_job(params, request.data.get('time_budget'))
+        except JobQueueFull as e:
+            return Response({'error': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancelar un trabajo en cola o en ejecución"""
+        job = self.get_object()
+        if job.status not in GenerationJob.ACTIVE_STATUSES:
+            return Response(
+                {'error': f'El trabajo ya terminó ({job.status})'},
+                status=status.HTTP_409_CONFLICT
+            )
+        job = cancel_job(job)
+        return Response(self.get_serializer(job).data)
+    
+    @action(detail=True, methods=['get'],
+            renderer_classes=[EventStreamRenderer, renderers.JSONRenderer])
+    def events(self, request, pk=None):
+        """Progreso del trabajo como text/event-stream hasta que termina"""
+        job = self.get_object()
+        response = StreamingHttpResponse(sse_stream(job.pk), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Evita el buffer de nginx
+        return response
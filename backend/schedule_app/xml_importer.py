@@ -0,0 +1,741 @@
+"""
+Importador XML en streaming (formato UniTime/Purdue).
+
+Recorre el documento con ElementTree.iterparse y libera cada elemento apenas se
+procesa, de modo que la memoria no crece con el tamaño del archivo. Las
+entidades se acumulan en lotes y se escriben con bulk_create en orden de
+dependencias (cursos/instructores -> clases -> relaciones de cada clase),
+resolviendo las llaves foráneas con mapas xml_id -> pk en memoria.
+
+Uso:
+    from schedule_app.xml_importer import XMLImporter
+
+    importer = XMLImporter(batch_size=1000)
+    stats = importer.run(open('pu-spr07-sa_input_data.xml', 'rb'))
+    importer.phases   # {'rooms': {'rows': 58, 'seconds': 0.01}, ...}
+"""
+
+import hashlib
+import json
+import time
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery
+
+from .models import (
+    Room, Instructor, Course, Class, ClassInstructor, InstructorTimeSlot,
+    ClassRoom, TimeSlot, Student, StudentClass,
+    GroupConstraint, GroupConstraintClass, Schedule, ScheduleAssignment,
+    ScheduleTimetable, StatsSnapshot, GenerationJob
+)
+from .solution_storage import prune_genomes
+from .timetable_cache import invalidate_timetables
+from .dashboard_snapshot import refresh_dashboard
+
+
+# Tablas a vaciar con clear_existing, de las hojas hacia las raíces para que
+# ninguna llave foránea quede apuntando a una fila borrada
+CLEAR_ORDER = [
+    ScheduleAssignment, ScheduleTimetable, StatsSnapshot, Schedule, InstructorTimeSlot,
+    StudentClass, GroupConstraintClass, ClassInstructor, ClassRoom, TimeSlot,
+    GroupConstraint, Class, Course, Instructor, Room, Student,
+]
+
+# Llaves foráneas SET_NULL hacia tablas de CLEAR_ORDER: el DELETE directo no
+# pasa por on_delete, así que se anulan antes (el historial se conserva)
+CLEAR_SET_NULL = [
+    (GenerationJob, 'schedule'),
+]
+
+
+def _int_or_none(value: Optional[str]) -> Optional[int]:
+    return int(value) if value else None
+
+
+def element_hash(data: Dict) -> str:
+    """Hash SHA-1 de los datos canónicos de un elemento (ver _parse)"""
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+class XMLImporter:
+    """
+    Importa rooms, classes, groupConstraints y students de un XML.
+
+    Mantiene la semántica del importador original: las entidades que ya
+    existen (mismo xml_id) no se duplican y las relaciones de una clase o
+    restricción sólo se importan cuando ésta se crea.
+    """
+
+    DEFAULT_BATCH_SIZE = 1000
+
+    # Elementos que se procesan al cerrarse: (sección, elemento)
+    ITEMS = {
+        ('rooms', 'room'): 'rooms',
+        ('classes', 'class'): 'classes',
+        ('groupConstraints', 'constraint'): 'constraints',
+        ('students', 'student'): 'students',
+    }
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE,
+                 progress: Optional[Callable[[str, int, float, bool], None]] = None):
+        """
+        Args:
+            batch_size: elementos por lote de escritura
+            progress: callback opcional progress(sección, filas, segundos, terminada)
+                      llamado en cada lote escrito y al cerrar cada sección
+        """
+        self.batch_size = batch_size
+        self.progress = progress
+
+        self.stats = {
+            'rooms': 0,
+            'instructors': 0,
+            'courses': 0,
+            'classes': 0,
+            'time_slots': 0,
+            'students': 0,
+            'enrollments': 0,
+            'group_constraints': 0
+        }
+
+        # Mapas xml_id -> pk
+        self.room_map: Dict[int, int] = {}
+        self.instructor_map: Dict[int, int] = {}
+        self.course_map: Dict[int, int] = {}
+        self.class_map: Dict[int, int] = {}
+        self.student_map: Dict[int, int] = {}
+        self.constraint_map: Dict[int, int] = {}
+
+        # class_xml_id -> (offering_pk, offering_xml_id), para las inscripciones
+        self.class_offering: Dict[int, Tuple[Optional[int], Optional[int]]] = {}
+
+        # (class_pk, parent_xml_id): los padres pueden aparecer después del hijo
+        self.pending_parents: List[Tuple[int, int]] = []
+
+        # Lotes pendientes de escritura
+        self._buffers = {'rooms': [], 'classes': [], 'constraints': [], 'students': []}
+
+        # Tiempos por sección: {sección: {'rows': n, 'seconds': t}}
+        self.phases: Dict[str, Dict] = {}
+        self._phase_start: Dict[str, float] = {}
+
+    # ------------------------------------------------------------------
+    # Punto de entrada
+    # ------------------------------------------------------------------
+
+    def run(self, source) -> Dict:
+        """
+        Importa el XML desde una ruta o un objeto archivo.
+
+        Returns:
+            Dict con el número de entidades creadas por tipo
+        """
+        start = time.perf_counter()
+
+        with transaction.atomic():
+            self._load_existing()
+
+            stack = []
+            for event, elem in ET.iterparse(source, events=('start', 'end')):
+                if event == 'start':
+                    stack.append(elem)
+                    if len(stack) == 2:
+                        self._start_phase(elem.tag)
+                    continue
+
+                stack.pop()
+                if len(stack) == 2:
+                    kind = self.ITEMS.get((stack[1].tag, elem.tag))
+                    if kind:
+                        self._buffers[kind].append(self._parse(kind, elem))
+                        self.phases[kind]['rows'] += 1
+                        if len(self._buffers[kind]) >= self.batch_size:
+                            self._flush(kind)
+                            self._report(kind, finished=False)
+                    # Liberar el elemento ya procesado
+                    elem.clear()
+                    stack[1].remove(elem)
+                elif len(stack) == 1:
+                    # Fin de una sección: escribir lo pendiente
+                    kind = self.ITEMS.get((elem.tag, self._item_tag(elem.tag)))
+                    if kind:
+                        self._flush(kind)
+                        self._report(kind, finished=True)
+                    elem.clear()
+
+            for kind in self._buffers:
+                self._flush(kind)
+            self._apply_parents()
+            self._finish()
+            # Nombres de cursos y ubicaciones de aulas no entran en la huella
+            invalidate_timetables()
+            refresh_dashboard()
+
+        self.stats['elapsed'] = round(time.perf_counter() - start, 3)
+        return self.stats
+
+    @staticmethod
+    def clear_existing() -> Dict[str, int]:
+        """
+        Vacía las tablas de datos importados con un DELETE por tabla.
+
+        No pasa por el Collector de Django (que carga los pks de cada fila para
+        resolver las cascadas): las tablas se vacían de las hojas a las raíces.
+        Los horarios también se borran, porque sus asignaciones y genomas
+        apuntan a ids que dejan de existir, junto con sus tablas
+        precalculadas y las estadísticas del dashboard; los trabajos de
+        generación se conservan sin horario (CLEAR_SET_NULL).
+
+        Returns:
+            Dict {tabla: filas borradas}
+        """
+        deleted = {}
+        with transaction.atomic(), connection.cursor() as cursor:
+            for model, field_name in CLEAR_SET_NULL:
+                table = connection.ops.quote_name(model._meta.db_table)
+                column = connection.ops.quote_name(model._meta.get_field(field_name).column)
+                cursor.execute(f'UPDATE {table} SET {column} = NULL WHERE {column} IS NOT NULL')
+            for model in CLEAR_ORDER:
+                table = model._meta.db_table
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(table)}')
+                deleted[table] = cursor.rowcount
+        return deleted
+
+    def _start_phase(self, section: str):
+        kind = self.ITEMS.get((section, self._item_tag(section)))
+        if kind:
+            self.phases.setdefault(kind, {'rows': 0, 'seconds': 0.0})
+            self._phase_start[kind] = time.perf_counter()
+
+    def _report(self, kind: str, finished: bool):
+        phase = self.phases[kind]
+        seconds = time.perf_counter() - self._phase_start[kind]
+        if finished:
+            phase['seconds'] = round(phase['seconds'] + seconds, 3)
+        if self.progress:
+            self.progress(kind, phase['rows'], phase['seconds'] if finished else seconds, finished)
+
+    @classmethod
+    def _item_tag(cls, section: str) -> Optional[str]:
+        for sec, item in cls.ITEMS:
+            if sec == section:
+                return item
+        return None
+
+    def _load_existing(self):
+        """Carga los xml_id -> pk que ya están en la base de datos"""
+        self.room_map = dict(Room.objects.values_list('xml_id', 'id'))
+        self.instructor_map = dict(Instructor.objects.values_list('xml_id', 'id'))
+        self.course_map = dict(Course.objects.values_list('xml_id', 'id'))
+        self.student_map = dict(Student.objects.values_list('xml_id', 'id'))
+        self.constraint_map = dict(GroupConstraint.objects.values_list('xml_id', 'id'))
+
+        course_xml = {pk: xml_id for xml_id, pk in self.course_map.items()}
+        for xml_id, pk, offering_id in Class.objects.values_list('xml_id', 'id', 'offering_id'):
+            self.class_map[xml_id] = pk
+            self.class_offering[xml_id] = (offering_id, course_xml.get(offering_id))
+
+    # ------------------------------------------------------------------
+    # Parseo (elemento -> datos planos)
+    # ------------------------------------------------------------------
+
+    def _parse(self, kind: str, elem) -> Dict:
+        parser = {
+            'rooms': self._parse_room,
+            'classes': self._parse_class,
+            'constraints': self._parse_constraint,
+            'students': self._parse_student,
+        }[kind]
+        data = parser(elem)
+        data['xml_hash'] = element_hash(data)
+        return data
+
+    def _parse_room(self, elem) -> Dict:
+        return {
+            'xml_id': int(elem.get('id')),
+            'capacity': int(elem.get('capacity', 0)),
+            'location': elem.get('location', ''),
+            'is_constraint': elem.get('constraint', 'false').lower() == 'true'
+        }
+
+    def _parse_class(self, elem) -> Dict:
+        return {
+            'xml_id': int(elem.get('id')),
+            'offering': _int_or_none(elem.get('offering')),
+            'parent': _int_or_none(elem.get('parent')),
+            'fields': {
+                'config': _int_or_none(elem.get('config')),
+                'subpart': _int_or_none(elem.get('subpart')),
+                'class_limit': int(elem.get('classLimit', 0)),
+                'committed': elem.get('committed', 'false').lower() == 'true',
+                'scheduler': _int_or_none(elem.get('scheduler')),
+                'department': _int_or_none(elem.get('department')),
+                'dates': elem.get('dates', '')
+            },
+            'instructors': [int(e.get('id')) for e in elem.findall('instructor')],
+            'rooms': [(int(e.get('id')), float(e.get('pref', 0))) for e in elem.findall('room')],
+            'times': [
+                {
+                    'days': e.get('days', '0000000'),
+                    'start_time': int(e.get('start', 0)),
+                    'length': int(e.get('length', 0)),
+                    'break_time': int(e.get('breakTime', 10)),
+                    'preference': float(e.get('pref', 0))
+                }
+                for e in elem.findall('time')
+            ]
+        }
+
+    def _parse_constraint(self, elem) -> Dict:
+        return {
+            'xml_id': int(elem.get('id')),
+            'constraint_type': elem.get('type', ''),
+            'preference': elem.get('pref', 'R'),
+            'course_limit': _int_or_none(elem.get('courseLimit')),
+            'delta': _int_or_none(elem.get('delta')),
+            'classes': [int(e.get('id')) for e in elem.findall('class')]
+        }
+
+    def _parse_student(self, elem) -> Dict:
+        return {
+            'xml_id': int(elem.get('id')),
+            'weights': {
+                int(e.get('id')): float(e.get('weight', 1.0))
+                for e in elem.findall('offering')
+            },
+            'classes': [int(e.get('id')) for e in elem.findall('class')]
+        }
+
+    # ------------------------------------------------------------------
+    # Escritura por lotes
+    # ------------------------------------------------------------------
+
+    def _flush(self, kind: str):
+        batch = self._buffers[kind]
+        if not batch:
+            return
+        self._buffers[kind] = []
+        getattr(self, f'_write_{kind}')(batch)
+
+    def _insert(self, model, objects: List, id_map: Dict[int, int]):
+        """
+        bulk_create de entidades con xml_id y registro de sus pks en id_map.
+        Si el backend no devuelve pks, se consultan por xml_id.
+        """
+        if not objects:
+            return
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+        if all(obj.pk for obj in objects):
+            id_map.update((obj.xml_id, obj.pk) for obj in objects)
+        else:
+            id_map.update(model.objects.filter(
+                xml_id__in=[obj.xml_id for obj in objects]
+            ).values_list('xml_id', 'id'))
+
+    def _write_rooms(self, batch: List[Dict]):
+        new_rooms = {}
+        for data in batch:
+            if data['xml_id'] not in self.room_map:
+                new_rooms.setdefault(data['xml_id'], Room(**data))
+        self._insert(Room, list(new_rooms.values()), self.room_map)
+        self.stats['rooms'] += len(new_rooms)
+
+    def _write_classes(self, batch: List[Dict]):
+        # 1. Cursos e instructores referenciados por el lote
+        self._ensure_references(batch)
+
+        # 2. Clases nuevas
+        created = {}
+        for data in batch:
+            xml_id = data['xml_id']
+            if xml_id in self.class_map or xml_id in created:
+                continue
+            offering_pk = self.course_map.get(data['offering']) if data['offering'] else None
+            created[xml_id] = (
+                Class(xml_id=xml_id, offering_id=offering_pk, xml_hash=data['xml_hash'], **data['fields']),
+                data
+            )
+            self.class_offering[xml_id] = (offering_pk, data['offering'])
+        self._insert(Class, [obj for obj, _ in created.values()], self.class_map)
+        self.stats['classes'] += len(created)
+
+        # 3. Relaciones de las clases creadas
+        class_instructors, class_rooms = self._class_relations(created.values())
+        time_slots = [
+            TimeSlot(class_obj_id=self.class_map[xml_id], **time_data)
+            for xml_id, (_, data) in created.items()
+            for time_data in data['times']
+        ]
+        ClassInstructor.objects.bulk_create(class_instructors, batch_size=self.batch_size)
+        ClassRoom.objects.bulk_create(class_rooms, batch_size=self.batch_size)
+        TimeSlot.objects.bulk_create(time_slots, batch_size=self.batch_size)
+        self.stats['time_slots'] += len(time_slots)
+
+        # 4. Padres (se resuelven al final)
+        for data in batch:
+            if data['parent']:
+                self.pending_parents.append((self.class_map[data['xml_id']], data['parent']))
+
+    def _ensure_references(self, batch: List[Dict]):
+        """Crea los cursos e instructores que el lote referencia y aún no existen"""
+        new_courses = {}
+        new_instructors = {}
+        for data in batch:
+            offering = data['offering']
+            if offering and offering not in self.course_map:
+                new_courses.setdefault(offering, Course(
+                    xml_id=offering,
+                    name=f'Course {offering}',
+                    code=f'COURSE-{offering}'
+                ))
+            for instructor in data['instructors']:
+                if instructor not in self.instructor_map:
+                    new_instructors.setdefault(instructor, Instructor(
+                        xml_id=instructor,
+                        name=f'Instructor {instructor}'
+                    ))
+        self._insert(Course, list(new_courses.values()), self.course_map)
+        self._insert(Instructor, list(new_instructors.values()), self.instructor_map)
+        self.stats['courses'] += len(new_courses)
+        self.stats['instructors'] += len(new_instructors)
+
+    def _class_relations(self, items) -> Tuple[List[ClassInstructor], List[ClassRoom]]:
+        """Filas ClassInstructor y ClassRoom de los pares (clase, datos) dados"""
+        class_instructors = []
+        class_rooms = []
+        for obj, data in items:
+            class_pk = self.class_map[data['xml_id']]
+            for instructor in dict.fromkeys(data['instructors']):
+                class_instructors.append(ClassInstructor(
+                    class_obj_id=class_pk,
+                    instructor_id=self.instructor_map[instructor]
+                ))
+            seen_rooms = set()
+            for room, pref in data['rooms']:
+                room_pk = self.room_map.get(room)
+                if room_pk and room_pk not in seen_rooms:
+                    seen_rooms.add(room_pk)
+                    class_rooms.append(ClassRoom(class_obj_id=class_pk, room_id=room_pk, preference=pref))
+        return class_instructors, class_rooms
+
+    def _write_constraints(self, batch: List[Dict]):
+        created = {}
+        for data in batch:
+            if data['xml_id'] in self.constraint_map or data['xml_id'] in created:
+                continue
+            fields = {k: v for k, v in data.items() if k != 'classes'}
+            created[data['xml_id']] = (GroupConstraint(**fields), data['classes'])
+        self._insert(GroupConstraint, [obj for obj, _ in created.values()], self.constraint_map)
+        self.stats['group_constraints'] += len(created)
+
+        self._write_constraint_links(
+            (xml_id, class_ids) for xml_id, (_, class_ids) in created.items()
+        )
+
+    def _write_constraint_links(self, items):
+        links = []
+        for xml_id, class_ids in items:
+            constraint_pk = self.constraint_map[xml_id]
+            for class_xml in dict.fromkeys(class_ids):
+                if class_xml in self.class_map:
+                    links.append(GroupConstraintClass(
+                        constraint_id=constraint_pk,
+                        class_obj_id=self.class_map[class_xml]
+                    ))
+        GroupConstraintClass.objects.bulk_create(links, batch_size=self.batch_size)
+
+    def _write_students(self, batch: List[Dict]):
+        new_students = {}
+        for data in batch:
+            if data['xml_id'] not in self.student_map:
+                new_students.setdefault(data['xml_id'], Student(
+                    xml_id=data['xml_id'],
+                    name=f"Student {data['xml_id']}",
+                    xml_hash=data['xml_hash']
+                ))
+        self._insert(Student, list(new_students.values()), self.student_map)
+        self.stats['students'] += len(new_students)
+        self._write_enrollments(batch)
+
+    def _write_enrollments(self, batch: List[Dict]):
+        enrollments = []
+        for data in batch:
+            student_pk = self.student_map[data['xml_id']]
+            for class_xml in data['classes']:
+                if class_xml not in self.class_map:
+                    continue
+                offering_pk, offering_xml = self.class_offering.get(class_xml, (None, None))
+                enrollments.append(StudentClass(
+                    student_id=student_pk,
+                    class_obj_id=self.class_map[class_xml],
+                    offering_id=offering_pk,
+                    weight=data['weights'].get(offering_xml, 1.0) if offering_xml else 1.0
+                ))
+        StudentClass.objects.bulk_create(enrollments, batch_size=self.batch_size, ignore_conflicts=True)
+        self.stats['enrollments'] += len(enrollments)
+
+    def _finish(self):
+        """Punto de extensión al terminar el documento (dentro de la transacción)"""
+
+    def _apply_parents(self):
+        updates = [
+            Class(pk=class_pk, parent_id=self.class_map[parent_xml])
+            for class_pk, parent_xml in self.pending_parents
+            if parent_xml in self.class_map
+        ]
+        Class.objects.bulk_update(updates, ['parent'], batch_size=self.batch_size)
+        self.pending_parents = []
+
+
+class IncrementalXMLImporter(XMLImporter):
+    """
+    Re-importación por diferencias.
+
+    Cada elemento se compara por su hash (element_hash) con el guardado en
+    xml_hash: los elementos iguales se ignoran, los nuevos se insertan, los
+    modificados se actualizan en bloque y los que ya no aparecen en el XML se
+    borran. Sólo se borran entidades de las secciones presentes en el archivo.
+
+    Los horarios se conservan: las asignaciones de clases sin cambios quedan
+    intactas y los TimeSlot de una clase modificada se reutilizan cuando su
+    (días, inicio, duración) no cambia. De los instructores de una clase
+    modificada sólo se sustituyen los que vienen del XML
+    (ClassInstructor.source): los asignados por el sistema se conservan.
+
+    Uso:
+        stats = IncrementalXMLImporter().run(xml_file)
+        stats['changes']   # {'classes': {'created': 2, 'updated': 5, ...}, ...}
+    """
+
+    MODELS = {
+        'rooms': Room,
+        'classes': Class,
+        'constraints': GroupConstraint,
+        'students': Student,
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.known_hashes: Dict[str, Dict[int, Optional[str]]] = {}
+        self.seen: Dict[str, set] = {kind: set() for kind in self.MODELS}
+        self.changes = {
+            kind: {'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+            for kind in self.MODELS
+        }
+        self.stats['changes'] = self.changes
+        self.deleted_time_slots: List[int] = []
+
+    def _load_existing(self):
+        super()._load_existing()
+        self.known_hashes = {
+            kind: dict(model.objects.values_list('xml_id', 'xml_hash'))
+            for kind, model in self.MODELS.items()
+        }
+
+    def _split(self, kind: str, batch: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Separa el lote en (nuevos, modificados); los iguales se descartan"""
+        known = self.known_hashes[kind]
+        seen = self.seen[kind]
+        new, changed = [], []
+        for data in batch:
+            xml_id = data['xml_id']
+            if xml_id in seen:
+                continue
+            seen.add(xml_id)
+            if xml_id not in known:
+                new.append(data)
+            elif known[xml_id] != data['xml_hash']:
+                changed.append(data)
+            else:
+                self.changes[kind]['unchanged'] += 1
+        self.changes[kind]['created'] += len(new)
+        self.changes[kind]['updated'] += len(changed)
+        return new, changed
+
+    # ------------------------------------------------------------------
+    # Escritura por lotes
+    # ------------------------------------------------------------------
+
+    def _write_rooms(self, batch: List[Dict]):
+        new, changed = self._split('rooms', batch)
+        super()._write_rooms(new)
+        Room.objects.bulk_update(
+            [Room(pk=self.room_map[data['xml_id']], **data) for data in changed],
+            ['capacity', 'location', 'is_constraint', 'xml_hash'],
+            batch_size=self.batch_size
+        )
+
+    def _write_classes(self, batch: List[Dict]):
+        new, changed = self._split('classes', batch)
+        super()._write_classes(new)
+        if not changed:
+            return
+
+        self._ensure_references(changed)
+        updates = []
+        for data in changed:
+            offering_pk = self.course_map.get(data['offering']) if data['offering'] else None
+            self.class_offering[data['xml_id']] = (offering_pk, data['offering'])
+            updates.append(Class(
+                pk=self.class_map[data['xml_id']],
+                offering_id=offering_pk,
+                parent_id=None,
+                xml_hash=data['xml_hash'],
+                **data['fields']
+            ))
+            if data['parent']:
+                self.pending_parents.append((self.class_map[data['xml_id']], data['parent']))
+        Class.objects.bulk_update(
+            updates,
+            ['offering', 'parent', 'xml_hash', *changed[0]['fields']],
+            batch_size=self.batch_size
+        )
+        class_pks = [obj.pk for obj in updates]
+
+        # StudentClass.offering copia el curso de la clase (agrupación de
+        # estudiantes por curso): se actualiza también en las inscripciones de
+        # estudiantes que no cambiaron, en un solo UPDATE
+        StudentClass.objects.filter(class_obj_id__in=class_pks).update(
+            offering_id=Subquery(Class.objects.filter(pk=OuterRef('class_obj_id')).values('offering_id')[:1])
+        )
+
+        class_instructors, class_rooms = self._class_relations((None, data) for data in changed)
+        self._sync_class_instructors(class_pks, class_instructors)
+
+        # Las aulas permitidas sólo vienen del XML: se reemplazan completas
+        ClassRoom.objects.filter(class_obj_id__in=class_pks).delete()
+        ClassRoom.objects.bulk_create(class_rooms, batch_size=self.batch_size)
+
+        self._sync_time_slots(changed)
+
+    def _sync_class_instructors(self, class_pks: List[int], wanted: List[ClassInstructor]):
+        """
+        Aplica los instructores del XML a las clases modificadas por diferencias.
+
+        Sólo se borran filas con source=xml que el XML ya no incluye; las
+        creadas por InstructorAssigner o por los instructores sintéticos
+        (source=assigned) se conservan, y si el XML pasa a incluirlas se
+        marcan como del XML.
+        """
+        wanted_pairs = {(obj.class_obj_id, obj.instructor_id) for obj in wanted}
+        stale, promoted, existing = [], [], set()
+        for pk, class_pk, instructor_pk, source in ClassInstructor.objects.filter(
+            class_obj_id__in=class_pks
+        ).values_list('id', 'class_obj_id', 'instructor_id', 'source'):
+            pair = (class_pk, instructor_pk)
+            existing.add(pair)
+            if pair not in wanted_pairs:
+                if source == ClassInstructor.SOURCE_XML:
+                    stale.append(pk)
+            elif source != ClassInstructor.SOURCE_XML:
+                promoted.append(pk)
+
+        ClassInstructor.objects.filter(pk__in=stale).delete()
+        ClassInstructor.objects.filter(pk__in=promoted).update(source=ClassInstructor.SOURCE_XML)
+        ClassInstructor.objects.bulk_create(
+            [obj for obj in wanted if (obj.class_obj_id, obj.instructor_id) not in existing],
+            batch_size=self.batch_size
+        )
+
+    def _sync_time_slots(self, changed: List[Dict]):
+        """
+        Actualiza los TimeSlot de clases modificadas conservando los que siguen
+        en el XML, para no perder las asignaciones de horarios que los usan.
+        """
+        existing = {}
+        for pk, class_pk, days, start, length in TimeSlot.objects.filter(
+            class_obj_id__in=[self.class_map[data['xml_id']] for data in changed]
+        ).values_list('id', 'class_obj_id', 'days', 'start_time', 'length'):
+            existing[(class_pk, days, start, length)] = pk
+
+        updates, creates = [], []
+        for data in changed:
+            class_pk = self.class_map[data['xml_id']]
+            for time_data in data['times']:
+                key = (class_pk, time_data['days'], time_data['start_time'], time_data['length'])
+                pk = existing.pop(key, None)
+                if pk is None:
+                    creates.append(TimeSlot(class_obj_id=class_pk, **time_data))
+                else:
+                    updates.append(TimeSlot(pk=pk, class_obj_id=class_pk, **time_data))
+
+        TimeSlot.objects.bulk_update(updates, ['break_time', 'preference'], batch_size=self.batch_size)
+        TimeSlot.objects.bulk_create(creates, batch_size=self.batch_size)
+        self.stats['time_slots'] += len(creates)
+        if existing:
+            self.deleted_time_slots.extend(existing.values())
+            TimeSlot.objects.filter(id__in=list(existing.values())).delete()
+
+    def _write_constraints(self, batch: List[Dict]):
+        new, changed = self._split('constraints', batch)
+        super()._write_constraints(new)
+        if not changed:
+            return
+
+        GroupConstraint.objects.bulk_update(
+            [
+                GroupConstraint(
+                    pk=self.constraint_map[data['xml_id']],
+                    **{k: v for k, v in data.items() if k != 'classes'}
+                )
+                for data in changed
+            ],
+            ['constraint_type', 'preference', 'course_limit', 'delta', 'xml_hash'],
+            batch_size=self.batch_size
+        )
+        GroupConstraintClass.objects.filter(
+            constraint_id__in=[self.constraint_map[data['xml_id']] for data in changed]
+        ).delete()
+        self._write_constraint_links((data['xml_id'], data['classes']) for data in changed)
+
+    def _write_students(self, batch: List[Dict]):
+        new, changed = self._split('students', batch)
+        super()._write_students(new)
+        if not changed:
+            return
+
+        Student.objects.bulk_update(
+            [Student(pk=self.student_map[data['xml_id']], xml_hash=data['xml_hash']) for data in changed],
+            ['xml_hash'],
+            batch_size=self.batch_size
+        )
+        StudentClass.objects.filter(
+            student_id__in=[self.student_map[data['xml_id']] for data in changed]
+        ).delete()
+        self._write_enrollments(changed)
+
+    # ------------------------------------------------------------------
+    # Borrados
+    # ------------------------------------------------------------------
+
+    def _finish(self):
+        """Borra las entidades que ya no están en el XML"""
+        deleted_ids = {'classes': [], 'rooms': []}
+        maps = {
+            'rooms': self.room_map,
+            'classes': self.class_map,
+            'constraints': self.constraint_map,
+            'students': self.student_map,
+        }
+        for kind, model in self.MODELS.items():
+            if kind not in self.phases:
+                continue
+            stale = [xml_id for xml_id in self.known_hashes[kind] if xml_id not in self.seen[kind]]
+            if not stale:
+                continue
+            pks = [maps[kind].pop(xml_id) for xml_id in stale]
+            if kind in deleted_ids:
+                deleted_ids[kind] = pks
+            if kind == 'classes':
+                self.deleted_time_slots.extend(
+                    TimeSlot.objects.filter(class_obj_id__in=pks).values_list('id', flat=True)
+                )
+            model.objects.filter(pk__in=pks).delete()
+            self.changes[kind]['deleted'] += len(pks)
+
+        if deleted_ids['classes'] or deleted_ids['rooms'] or self.deleted_time_slots:
+            pruned = prune_genomes(deleted_ids['classes'], deleted_ids['rooms'], self.deleted_time_slots)
+            self.stats['schedules_pruned'] = pruned
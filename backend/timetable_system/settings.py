@@ -2,8 +2,13 @@
 Django settings for timetable_system project.
 """
 
+import os
+import tempfile
 from pathlib import Path
 
+import django
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -69,12 +74,58 @@ WSGI_APPLICATION = 'timetable_system.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_ENGINE: 'sqlite' (default) o 'postgresql'
+# - SQLite: al abrir cada conexión se aplican WAL, synchronous=NORMAL,
+#   mmap_size y busy_timeout (ver schedule_app/db_profile.py), así los
+#   lectores no se bloquean durante una escritura larga.
+# - PostgreSQL: conexiones persistentes (DATABASE_CONN_MAX_AGE) o un pool de
+#   psycopg 3 (DATABASE_POOL=true, Django >= 5.1, requiere psycopg[pool]).
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite').lower()
+
+SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20))  # Segundos
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # Bytes
+SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -64000))  # Negativo = KiB
+
+if DATABASE_ENGINE == 'postgresql':
+    DATABASE_POOL = os.environ.get('DATABASE_POOL', 'false').lower() == 'true'
+    _options = {}
+    if DATABASE_POOL:
+        _options['pool'] = {
+            'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('DATABASE_POOL_TIMEOUT', 30)),
+        }
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DATABASE_NAME', 'timetable'),
+            'USER': os.environ.get('DATABASE_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+            'HOST': os.environ.get('DATABASE_HOST', 'localhost'),
+            'PORT': os.environ.get('DATABASE_PORT', '5432'),
+            # El pool y las conexiones persistentes son excluyentes
+            'CONN_MAX_AGE': 0 if DATABASE_POOL else int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': _options,
+        }
     }
-}
+elif DATABASE_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': SQLITE_BUSY_TIMEOUT,
+            },
+        }
+    }
+    if django.VERSION >= (5, 1):
+        # Toma el bloqueo de escritura al iniciar la transacción: evita el
+        # 'database is locked' inmediato al pasar de lectura a escritura
+        DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+else:
+    raise ImproperlyConfigured(f"DATABASE_ENGINE desconocido: {DATABASE_ENGINE!r} (use 'sqlite' o 'postgresql')")
 
 
 # Password validation
@@ -131,3 +182,52 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 }
+
+# Caché de vistas de horarios (ETag / Last-Modified, ver schedule_app/http_cache.py)
+# SCHEDULE_CACHE_BACKEND: 'locmem' (por proceso, default) o 'file' (compartida
+# entre procesos en SCHEDULE_CACHE_DIR)
+SCHEDULE_CACHE_BACKEND = os.environ.get('SCHEDULE_CACHE_BACKEND', 'locmem')
+SCHEDULE_CACHE_TIMEOUT = int(os.environ.get('SCHEDULE_CACHE_TIMEOUT', 3600))
+
+_SCHEDULE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'schedule-views',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'SCHEDULE_CACHE_DIR',
+            os.path.join(tempfile.gettempdir(), 'timetable_schedule_cache')
+        ),
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'schedules': {
+        **_SCHEDULE_CACHE_BACKENDS[SCHEDULE_CACHE_BACKEND],
+        'TIMEOUT': SCHEDULE_CACHE_TIMEOUT,
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+# Generación de horarios en segundo plano (ver schedule_app/jobs.py)
+# Con GENERATION_RUN_IN_PROCESS=False el servidor web sólo encola y los
+# trabajos se ejecutan con `python manage.py run_generation_worker`
+GENERATION_RUN_IN_PROCESS = os.environ.get('GENERATION_RUN_IN_PROCESS', 'true').lower() == 'true'
+GENERATION_MAX_WORKERS = int(os.environ.get('GENERATION_MAX_WORKERS', 2))
+GENERATION_MAX_PENDING = int(os.environ.get('GENERATION_MAX_PENDING', 10))
+GENERATION_DEFAULT_TIME_BUDGET = int(os.environ.get('GENERATION_DEFAULT_TIME_BUDGET', 600))
+GENERATION_MAX_TIME_BUDGET = int(os.environ.get('GENERATION_MAX_TIME_BUDGET', 3600))
+GENERATION_KILL_GRACE = int(os.environ.get('GENERATION_KILL_GRACE', 60))
+
+# Snapshot del problema en disco (ver schedule_app/problem_snapshot.py)
+PROBLEM_SNAPSHOT_ENABLED = os.environ.get('PROBLEM_SNAPSHOT_ENABLED', 'true').lower() == 'true'
+PROBLEM_SNAPSHOT_DIR = os.environ.get(
+    'PROBLEM_SNAPSHOT_DIR',
+    os.path.join(tempfile.gettempdir(), 'timetable_problem_snapshots')
+)
+PROBLEM_SNAPSHOT_KEEP = int(os.environ.get('PROBLEM_SNAPSHOT_KEEP', 3))
@@ -84,7 +84,7 @@ case $option in
         echo -e "${YELLOW}Analizando horarios existentes...${NC}"
         python manage.py shell << EOF
 from schedule_app.models import Schedule
-from schedule_app.constraints import ConstraintValidator
+from schedule_app.solver import ConstraintValidator
 
 schedules = Schedule.objects.all().order_by('-created_at')[:5]
 print("\n" + "="*60)